@@ -0,0 +1,92 @@
+"""Compares the ingest modes of WeatherDatabaseRepository.
+
+Every run adds the rows in one session and rolls it back, so the database is
+left unchanged. The database is the one configured in .env.
+
+    python benchmarks/bench_ingest.py --rows 1000 5000 20000 --repeat 3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time as timer
+from datetime import datetime, time, timedelta
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+sys.path.insert(0, SRC_DIR)
+
+from database.db import Database  # noqa
+from exceptions import DatabaseError  # noqa
+from main import get_config_dict  # noqa
+from mappers.realisations import WeatherDatabaseMapper  # noqa
+from models.domains import WeatherDomain, WeatherTypeOpenweathermap  # noqa
+from repositories.realisations import WeatherDatabaseRepository  # noqa
+
+WEATHER_TYPES = list(WeatherTypeOpenweathermap)
+
+
+def make_weather_list(count: int) -> list[WeatherDomain]:
+    start = datetime(2000, 1, 1)
+    return [
+        WeatherDomain(
+            timestamp=start + timedelta(minutes=i // 1000),
+            city=f"BenchCity{i % 1000}",
+            temperature=i % 60 - 20,
+            weather_type=WEATHER_TYPES[i % len(WEATHER_TYPES)],
+            sunrise=time(6, 30),
+            sunset=time(18, 45),
+        )
+        for i in range(count)
+    ]
+
+
+async def measure(
+    database: Database, ingest_mode: str, weather_list: list[WeatherDomain]
+) -> float:
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(), ingest_mode=ingest_mode
+    )
+    async with database.get_session_factory() as session:
+        repository.set_session(session)
+        try:
+            started_at = timer.perf_counter()
+            await repository.add_all(data_list=weather_list)
+            return timer.perf_counter() - started_at
+        finally:
+            await session.rollback()
+            repository.clear_session()
+
+
+async def main(rows: list[int], repeat: int) -> None:
+    database = Database(db_url=get_config_dict()["database"]["dsn"])
+    try:
+        print(f"{'rows':>8} {'mode':>7} {'best, s':>9} {'rows/s':>10}")
+        for count in rows:
+            weather_list = make_weather_list(count)
+            for ingest_mode in ("insert", "copy"):
+                try:
+                    best = min(
+                        [
+                            await measure(database, ingest_mode, weather_list)
+                            for _ in range(repeat)
+                        ]
+                    )
+                except DatabaseError as e:
+                    print(f"{count:>8} {ingest_mode:>7} failed: {str(e)[:60]}")
+                    continue
+                print(f"{count:>8} {ingest_mode:>7} {best:>9.4f} {count / best:>10.0f}")
+    finally:
+        await database.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # A failed INSERT logs the whole statement, the printed reason is enough
+    logging.disable(logging.CRITICAL)
+
+    asyncio.run(main(rows=args.rows, repeat=args.repeat))
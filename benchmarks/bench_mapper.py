@@ -0,0 +1,78 @@
+"""Compares the per-row and the batch mapping of OpenWeatherMap DTOs.
+
+The batch mapping is measured with and without NumPy, and into a columnar
+WeatherBatch.
+
+    python benchmarks/bench_mapper.py --rows 1000 100000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time as timer
+from datetime import datetime
+from typing import Callable
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+sys.path.insert(0, SRC_DIR)
+
+from mappers.realisations import OpenweathermapWeatherMapper  # noqa
+
+WEATHER_MAINS = list(OpenweathermapWeatherMapper.translation)
+
+
+def make_dto_list(count: int) -> list[dict]:
+    timestamp = datetime(2024, 2, 6, 21, 11, 30, 677037)
+    return [
+        {
+            "weather": [{"main": WEATHER_MAINS[i % len(WEATHER_MAINS)].title()}],
+            "main": {"temp": 250 + (i % 600) / 10},
+            "sys": {"sunrise": 1707261198 + i % 3600, "sunset": 1707298648 - i % 3600},
+            "name": f"BenchCity{i}",
+            "timestamp": timestamp,
+        }
+        for i in range(count)
+    ]
+
+
+def measure(func: Callable[[], list], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started_at = timer.perf_counter()
+        func()
+        timings.append(timer.perf_counter() - started_at)
+    return min(timings)
+
+
+def main(rows: list[int], repeat: int) -> None:
+    mapper = OpenweathermapWeatherMapper(use_numpy=False)
+    numpy_mapper = OpenweathermapWeatherMapper(use_numpy=True)
+    modes = {
+        "per-row": lambda dto_list: [mapper.to_target(dto) for dto in dto_list],
+        "batch": mapper.to_target_many,
+        "columns": mapper.to_batch,
+    }
+    if numpy_mapper._np is not None:
+        modes["numpy"] = numpy_mapper.to_target_many
+    else:
+        print("NumPy is not installed, the numpy mode is skipped")
+
+    print(f"{'rows':>8} {'mode':>8} {'best, s':>9} {'rows/s':>10} {'speedup':>8}")
+    for count in rows:
+        dto_list = make_dto_list(count)
+        baseline = None
+        for mode, func in modes.items():
+            best = measure(lambda: func(dto_list), repeat)
+            baseline = baseline or best
+            print(
+                f"{count:>8} {mode:>8} {best:>9.4f} {count / best:>10.0f} "
+                f"{baseline / best:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    main(rows=args.rows, repeat=args.repeat)
@@ -44,3 +44,25 @@ class APIClientService(ABC, Generic[DTO]):
             Any specific exceptions that might occur during the interaction with the external service.
         """
         pass
+
+    async def close(self) -> None:
+        """
+        Releases the resources held by the client, such as open HTTP connections.
+
+        Clients that keep nothing open between requests don't need to override it.
+        """
+        pass
+
+    def is_available(self) -> bool:
+        """
+        Tells whether the external service is worth calling right now, e.g. False
+        while the circuit breaker of the client is open.
+        """
+        return True
+
+    def metrics(self) -> dict:
+        """
+        Returns the current state of the client as a flat dictionary, e.g. how full
+        its rate limiter is. Clients without such state return an empty dictionary.
+        """
+        return {}
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Any
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from exceptions import WeatherParsingError  # noqa
+
+logger = logging.getLogger("app.api_clients")
+
+
+class AbstractJsonDecoder(ABC):
+    """
+    AbstractJsonDecoder turns the raw bytes of an API response into Python
+    objects without decoding the body to str first.
+    """
+
+    name: str = None
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Decodes a JSON document into builtin Python objects."""
+        pass
+
+    def decode_weather(self, data: bytes) -> Any:
+        """Decodes the response of the current weather endpoint."""
+        return self.decode(data)
+
+    def decode_group(self, data: bytes) -> Any:
+        """Decodes the response of the group endpoint."""
+        return self.decode(data)
+
+    def _raise_parsing_error(self, e: Exception):
+        error_message = f"An error occurred while parsing weather data: {e}"
+        logger.error(error_message)
+        raise WeatherParsingError(error_message)
+
+
+class StdlibJsonDecoder(AbstractJsonDecoder):
+    name = "stdlib"
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._raise_parsing_error(e)
+
+
+class OrjsonDecoder(AbstractJsonDecoder):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._loads = orjson.loads
+        self._error = orjson.JSONDecodeError
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return self._loads(data)
+        except self._error as e:
+            self._raise_parsing_error(e)
+
+
+class MsgspecJsonDecoder(AbstractJsonDecoder):
+    """
+    MsgspecJsonDecoder decodes with msgspec. With `typed`, the weather and the
+    group responses are decoded straight into the structs of models.structs,
+    which skips building the dictionaries of the fields nobody reads.
+    """
+
+    name = "msgspec"
+
+    def __init__(self, typed: bool = False):
+        import msgspec
+
+        self.typed = typed
+        self._error = msgspec.DecodeError
+        self._decoder = msgspec.json.Decoder()
+        if typed:
+            from models.structs import (
+                OpenweathermapGroupStruct,
+                OpenweathermapWeatherStruct,
+            )
+
+            self._weather_decoder = msgspec.json.Decoder(OpenweathermapWeatherStruct)
+            self._group_decoder = msgspec.json.Decoder(OpenweathermapGroupStruct)
+        else:
+            self._weather_decoder = self._group_decoder = self._decoder
+
+    def decode(self, data: bytes) -> Any:
+        return self._decode(self._decoder, data)
+
+    def decode_weather(self, data: bytes) -> Any:
+        return self._decode(self._weather_decoder, data)
+
+    def decode_group(self, data: bytes) -> Any:
+        return self._decode(self._group_decoder, data)
+
+    def _decode(self, decoder, data: bytes) -> Any:
+        try:
+            return decoder.decode(data)
+        except self._error as e:
+            self._raise_parsing_error(e)
+
+
+JSON_DECODERS = {
+    "msgspec": MsgspecJsonDecoder,
+    "orjson": OrjsonDecoder,
+    "stdlib": StdlibJsonDecoder,
+}
+
+
+def create_json_decoder(
+    backend: str = "auto", typed: bool = False
+) -> AbstractJsonDecoder:
+    """
+    Creates the JSON decoder of the given backend. "auto" picks the fastest
+    backend that is installed: msgspec, then orjson, then the standard library.
+    `typed` only applies to msgspec.
+    """
+    if backend == "auto":
+        for name, decoder_class in JSON_DECODERS.items():
+            try:
+                decoder = (
+                    decoder_class(typed=typed)
+                    if decoder_class is MsgspecJsonDecoder
+                    else decoder_class()
+                )
+            except ImportError:
+                continue
+            logger.debug(f"Using the {name} JSON decoder")
+            return decoder
+
+    if backend not in JSON_DECODERS:
+        raise ValueError(
+            f"Unknown JSON decoder '{backend}', "
+            f"expected auto or one of {', '.join(JSON_DECODERS)}"
+        )
+    if backend == "msgspec":
+        return MsgspecJsonDecoder(typed=typed)
+    return JSON_DECODERS[backend]()
@@ -1,8 +1,12 @@
+import asyncio
+import copy
 import json
 import logging
 import os
 import sys
+import time
 from datetime import datetime
+from typing import Any, Callable, List, Optional, Set, Tuple
 
 import aiohttp
 
@@ -10,44 +14,206 @@ parent_directory = os.path.join(os.getcwd(), "..")
 sys.path.append(parent_directory)
 
 from apiclients.abstractions import APIClientService  # noqa
+from apiclients.decoders import AbstractJsonDecoder  # noqa
+from apiclients.decoders import StdlibJsonDecoder  # noqa
+from apiclients.retry import RetryPolicy  # noqa
+from circuit_breakers.abstractions import AbstractCircuitBreaker  # noqa
+from city_resolvers.abstractions import AbstractCityResolutionCache  # noqa
+from city_resolvers.realisations import InMemoryCityResolutionCache  # noqa
 from exceptions import ApiClientError  # noqa
+from exceptions import RetryableStatusError  # noqa
 from exceptions import WeatherDataError  # noqa
 from exceptions import WeatherFetchingError  # noqa
 from exceptions import WeatherParsingError  # noqa
+from models.domains import CityLocation  # noqa
 from models.dto import JsonOpenweathermapResponseDTO  # noqa
+from rate_limiters.abstractions import AbstractRateLimiter  # noqa
+from response_caches.abstractions import AbstractResponseCache  # noqa
 
 logger = logging.getLogger("app.api_clients")
 
 
-class OpenweathermapByCityAPIClient(APIClientService[JsonOpenweathermapResponseDTO]):
+class BaseOpenweathermapAPIClient(APIClientService[JsonOpenweathermapResponseDTO]):
     """
-    OpenweathermapByCityAPIClient is a concrete client implementation
-    for retrieving weather data from the OpenWeatherMap API based on the city name.
+    BaseOpenweathermapAPIClient holds what the OpenWeatherMap clients share:
+    a pooled HTTP session, an optional rate limiter, the retry policy
+    applied to every request, an optional circuit breaker guarding the API host,
+    an optional cache of resolved city IDs and the JSON decoder of the response
+    bodies.
     """
 
     URL = "https://api.openweathermap.org/data/2.5/weather"
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = 100,
+        pool_size_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: int = 10,
+        total_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        rate_limiter: Optional[AbstractRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        city_resolver: Optional[AbstractCityResolutionCache] = None,
+        circuit_breaker: Optional[AbstractCircuitBreaker] = None,
+        json_decoder: Optional[AbstractJsonDecoder] = None,
+    ):
         self.api_key = api_key
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        self.rate_limiter = rate_limiter
+        self.retry_policy = (
+            retry_policy if retry_policy is not None else RetryPolicy(max_attempts=1)
+        )
+        self.city_resolver = city_resolver
+        self.circuit_breaker = circuit_breaker
+        self.json_decoder = (
+            json_decoder if json_decoder is not None else StdlibJsonDecoder()
+        )
 
-    async def get(
-        self, session: aiohttp.ClientSession, city: str, timestamp: datetime
-    ) -> JsonOpenweathermapResponseDTO:
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._requests_total = 0
+        self._retries_total = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
         """
-        Fetches weather data for a specified city from the OpenWeatherMap API.
+        Returns the pooled HTTP session of the client, creating it on first use.
 
-        This method sends an asynchronous GET request to the OpenWeatherMap API
-        with the provided city name and API key, retrieves the response,
-        and processes it into a JsonOpenweathermapResponseDTO.
+        The session and its connector stay open between calls, so keep-alive
+        connections, TLS sessions and resolved DNS entries are reused by every
+        request until close() is called.
         """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout
+            )
+            logger.debug("HTTP session created")
+
+        return self._session
+
+    async def close(self) -> None:
+        """Closes the pooled HTTP session and all its connections and saves the
+        resolved city IDs."""
+        if self.city_resolver is not None:
+            self.city_resolver.save()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.debug("HTTP session closed")
+        self._session = None
+
+    def is_available(self) -> bool:
+        if self.circuit_breaker is None:
+            return True
+        return self.circuit_breaker.is_available()
+
+    def metrics(self) -> dict:
+        res = {
+            "requests_total": self._requests_total,
+            "retries_total": self._retries_total,
+        }
+        if self.circuit_breaker is not None:
+            res.update(
+                {
+                    f"circuit_{key}": value
+                    for key, value in self.circuit_breaker.metrics().items()
+                }
+            )
+        if self.rate_limiter is not None:
+            res.update(
+                {
+                    f"rate_limiter_{key}": value
+                    for key, value in self.rate_limiter.metrics().items()
+                }
+            )
+        return res
+
+    async def _get_json(
+        self,
+        url: str,
+        subject: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        decode: Optional[Callable[[bytes], Any]] = None,
+    ) -> Any:
+        """
+        Sends a GET request to the OpenWeatherMap API and returns the body
+        decoded by `decode`, the generic decode of the JSON decoder by default.
+
+        The pooled session of the client is used unless a session is passed.
+        When a rate limiter is set, every attempt waits for it first.
+
+        Connection errors, timeouts and the statuses of the retry policy are
+        retried with exponential backoff and jitter, honouring Retry-After,
+        until the attempts or the deadline of the policy are exhausted.
+
+        When a circuit breaker is set, every attempt is reported to it, and
+        attempts are rejected with CircuitOpenError while it is open.
+        """
+        attempt = 0
         try:
-            url = f"{self.URL}?q={city}&appid={self.api_key}"
-            async with session.get(url) as response:
-                res = await response.text()
-                res = json.loads(res)
-                res["timestamp"] = timestamp
+            session = session if session is not None else self._get_session()
+            decode = decode if decode is not None else self.json_decoder.decode
+            loop = asyncio.get_running_loop()
+            deadline_at = (
+                loop.time() + self.retry_policy.deadline
+                if self.retry_policy.deadline is not None
+                else None
+            )
 
-            return JsonOpenweathermapResponseDTO(**res)
+            while True:
+                attempt += 1
+                try:
+                    return await self._attempt(
+                        session=session,
+                        url=url,
+                        subject=subject,
+                        decode=decode,
+                        deadline_at=deadline_at,
+                    )
+                except (
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    RetryableStatusError,
+                ) as e:
+                    delay = self.retry_policy.get_delay(
+                        attempt=attempt, retry_after=getattr(e, "retry_after", None)
+                    )
+                    if attempt >= self.retry_policy.max_attempts or (
+                        deadline_at is not None and loop.time() + delay >= deadline_at
+                    ):
+                        raise
+
+                    self._retries_total += 1
+                    logger.warning(
+                        f"Attempt {attempt} for {subject} failed "
+                        f"({type(e).__name__}: {e}), retrying in {delay:.2f}s"
+                    )
+                    await asyncio.sleep(delay)
+        except RetryableStatusError as e:
+            error_message = f"An error occurred while fetching weather data: {e}"
+            logger.error(error_message)
+            raise WeatherFetchingError(error_message)
+        except asyncio.TimeoutError:
+            error_message = (
+                f"Timed out while fetching weather data for {subject} "
+                f"after {attempt} attempt(s)"
+            )
+            logger.error(error_message)
+            raise WeatherFetchingError(error_message)
+        except ApiClientError:
+            raise
         except aiohttp.ClientError as e:
             error_message = f"An error occurred while fetching weather data: {e}"
             logger.error(error_message)
@@ -66,3 +232,359 @@ class OpenweathermapByCityAPIClient(APIClientService[JsonOpenweathermapResponseD
             )
             logger.error(error_message)
             raise ApiClientError(error_message)
+
+    async def _attempt(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        subject: str,
+        decode: Callable[[bytes], Any],
+        deadline_at: Optional[float],
+    ) -> Any:
+        """Makes one attempt before the deadline and reports its outcome to the
+        circuit breaker. Only connection errors, timeouts and retryable statuses
+        count as failures of the host."""
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.acquire()
+
+        outcome = None
+        started_at = time.monotonic()
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+
+            loop = asyncio.get_running_loop()
+            timeout = (
+                max(deadline_at - loop.time(), 0.0) if deadline_at is not None else None
+            )
+            self._requests_total += 1
+            started_at = time.monotonic()
+            res = await asyncio.wait_for(
+                self._request(session=session, url=url, subject=subject, decode=decode),
+                timeout=timeout,
+            )
+            outcome = True
+            return res
+        except (aiohttp.ClientError, asyncio.TimeoutError, RetryableStatusError):
+            outcome = False
+            raise
+        except Exception:
+            outcome = True
+            raise
+        finally:
+            if self.circuit_breaker is not None:
+                duration = time.monotonic() - started_at
+                if outcome is None:
+                    self.circuit_breaker.release()
+                elif outcome:
+                    self.circuit_breaker.record_success(duration=duration)
+                else:
+                    self.circuit_breaker.record_failure(duration=duration)
+
+    async def _request(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        subject: str,
+        decode: Callable[[bytes], Any],
+    ) -> Any:
+        """Makes one attempt of a GET request and decodes the raw body bytes."""
+
+        async with session.get(url) as response:
+            if self.retry_policy.is_retryable_status(response.status):
+                raise RetryableStatusError(
+                    status=response.status,
+                    retry_after=self.retry_policy.parse_retry_after(
+                        response.headers.get("Retry-After")
+                    ),
+                )
+            if not response.ok:
+                raise WeatherDataError(
+                    f"Weather data for {subject} is unavailable, "
+                    f"service responded with status {response.status}"
+                )
+
+            res = await response.read()
+            return decode(res)
+
+    def _get_location(self, city: str) -> Optional[CityLocation]:
+        """Returns the cached location of the city, if any."""
+        if self.city_resolver is None:
+            return None
+        return self.city_resolver.get(city)
+
+    def _forget_location(self, city: str) -> None:
+        """Drops the cached location of the city, e.g. when its ID is rejected."""
+        if self.city_resolver is not None:
+            self.city_resolver.invalidate(city)
+
+    async def _get_by_name(
+        self,
+        city: str,
+        timestamp: datetime,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> JsonOpenweathermapResponseDTO:
+        """Fetches one city by name and remembers the ID and coordinates the
+        provider resolved it to."""
+
+        url = f"{self.URL}?q={city}&appid={self.api_key}"
+        res = await self._get_json(
+            url=url,
+            subject=f"city {city}",
+            session=session,
+            decode=self.json_decoder.decode_weather,
+        )
+        dto = self._to_dto(payload=res, timestamp=timestamp)
+
+        city_id = dto.get("id")
+        if self.city_resolver is not None and city_id is not None:
+            coord = dto.get("coord") or {}
+            self.city_resolver.put(
+                city,
+                CityLocation(
+                    id=city_id,
+                    lat=coord.get("lat"),
+                    lon=coord.get("lon"),
+                    resolved_at=time.time(),
+                    name=dto.get("name"),
+                ),
+            )
+            logger.debug(f"City {city} resolved to ID {city_id}")
+        return dto
+
+    @staticmethod
+    def _to_dto(payload: Any, timestamp: datetime) -> JsonOpenweathermapResponseDTO:
+        """Stamps a decoded response with the run timestamp.
+
+        The decoded response is used as the DTO itself rather than copied into
+        a new dictionary; it can also be a typed struct of the msgspec decoder.
+        """
+        try:
+            payload["timestamp"] = timestamp
+            return payload
+        except (TypeError, KeyError, ValueError) as e:
+            error_message = f"An error occurred while processing weather data: {e}"
+            logger.error(error_message)
+            raise WeatherDataError(error_message)
+
+
+class OpenweathermapByCityAPIClient(BaseOpenweathermapAPIClient):
+    """
+    OpenweathermapByCityAPIClient is a concrete client implementation
+    for retrieving weather data from the OpenWeatherMap API based on the city name.
+
+    Cities found in the city resolver are queried by their ID, which pins
+    ambiguous names to the city resolved the first time.
+    """
+
+    async def get(
+        self,
+        city: str,
+        timestamp: datetime,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> JsonOpenweathermapResponseDTO:
+        """
+        Fetches weather data for a specified city from the OpenWeatherMap API.
+
+        This method sends an asynchronous GET request to the OpenWeatherMap API
+        with the provided city name and API key, retrieves the response,
+        and processes it into a JsonOpenweathermapResponseDTO.
+        """
+        location = self._get_location(city)
+        if location is None:
+            return await self._get_by_name(
+                city=city, timestamp=timestamp, session=session
+            )
+
+        url = f"{self.URL}?id={location.id}&appid={self.api_key}"
+        try:
+            res = await self._get_json(
+                url=url,
+                subject=f"city {city} (ID {location.id})",
+                session=session,
+                decode=self.json_decoder.decode_weather,
+            )
+        except WeatherDataError:
+            logger.warning(
+                f"Cached ID {location.id} of city {city} was rejected, "
+                f"resolving it by name"
+            )
+            self._forget_location(city)
+            return await self._get_by_name(
+                city=city, timestamp=timestamp, session=session
+            )
+
+        return self._to_dto(payload=res, timestamp=timestamp)
+
+
+class OpenweathermapGroupAPIClient(BaseOpenweathermapAPIClient):
+    """
+    OpenweathermapGroupAPIClient retrieves weather data from the group endpoint
+    of the OpenWeatherMap API, up to GROUP_SIZE cities per HTTP request.
+
+    The first request for a city goes to the by-name endpoint and remembers the
+    city ID from the response. Later requests for known cities are collected
+    for up to `batch_window` seconds, or until GROUP_SIZE of them are waiting,
+    and sent as one group request. Each caller still gets the DTO of its own
+    city, so the client is a drop-in replacement for the by-city client.
+    """
+
+    GROUP_URL = "https://api.openweathermap.org/data/2.5/group"
+    GROUP_SIZE = 20
+
+    def __init__(self, api_key: str, batch_window: float = 0.05, **kwargs):
+        super().__init__(api_key=api_key, **kwargs)
+        self.batch_window = batch_window
+        if self.city_resolver is None:
+            self.city_resolver = InMemoryCityResolutionCache()
+
+        self._pending: List[Tuple[int, str, datetime, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def get(
+        self,
+        city: str,
+        timestamp: datetime,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> JsonOpenweathermapResponseDTO:
+        """
+        Fetches weather data for a specified city, through a group request when
+        the ID of the city is already known.
+        """
+        location = self._get_location(city)
+        if location is None:
+            return await self._get_by_name(
+                city=city, timestamp=timestamp, session=session
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((location.id, city, timestamp, future))
+
+        if len(self._pending) >= self.GROUP_SIZE:
+            self._flush(session=session)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.batch_window, self._flush, session
+            )
+
+        return await future
+
+    async def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await super().close()
+
+    def _flush(self, session: Optional[aiohttp.ClientSession] = None) -> None:
+        """Sends the waiting requests, GROUP_SIZE cities per group request."""
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[: self.GROUP_SIZE]
+            self._pending = self._pending[self.GROUP_SIZE :]
+            task = asyncio.create_task(self._get_group(batch=batch, session=session))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _get_group(
+        self,
+        batch: List[Tuple[int, str, datetime, asyncio.Future]],
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        """Fetches a group of cities and resolves the futures of their callers."""
+
+        ids = ",".join(str(city_id) for city_id in dict.fromkeys(b[0] for b in batch))
+        url = f"{self.GROUP_URL}?id={ids}&appid={self.api_key}"
+        try:
+            res = await self._get_json(
+                url=url,
+                subject=f"group of {len(batch)} cities",
+                session=session,
+                decode=self.json_decoder.decode_group,
+            )
+            items = {item["id"]: item for item in res["list"]}
+        except ApiClientError as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except (TypeError, KeyError) as e:
+            error_message = f"An error occurred while processing group data: {e}"
+            logger.error(error_message)
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(WeatherDataError(error_message))
+            return
+
+        for city_id, city, timestamp, future in batch:
+            if future.done():
+                continue
+
+            item = items.get(city_id)
+            if item is None:
+                self._forget_location(city)
+                future.set_exception(
+                    WeatherDataError(
+                        f"No weather data for city {city} (ID {city_id}) "
+                        f"in the group response"
+                    )
+                )
+                continue
+
+            try:
+                future.set_result(
+                    self._to_dto(payload=copy.copy(item), timestamp=timestamp)
+                )
+            except WeatherDataError as e:
+                future.set_exception(e)
+
+
+class CachingAPIClient(APIClientService[JsonOpenweathermapResponseDTO]):
+    """
+    CachingAPIClient wraps a weather client and serves repeated requests for a
+    city from a response cache until the cached response expires.
+
+    OpenWeatherMap updates the current weather about every 10 minutes, so runs
+    closer together than the TTL reuse the earlier response instead of paying
+    for an identical one. A cached response is returned with the timestamp of
+    the current run.
+    """
+
+    def __init__(self, client: APIClientService, cache: AbstractResponseCache):
+        self.client = client
+        self.cache = cache
+
+    async def get(
+        self, city: str, timestamp: datetime, **kwargs
+    ) -> JsonOpenweathermapResponseDTO:
+        payload = self.cache.get(city)
+        if payload is not None:
+            return JsonOpenweathermapResponseDTO(**payload, timestamp=timestamp)
+
+        dto = await self.client.get(city, timestamp, **kwargs)
+        self.cache.put(
+            city, {key: value for key, value in dto.items() if key != "timestamp"}
+        )
+        return dto
+
+    async def close(self) -> None:
+        await self.client.close()
+        self.cache.close()
+
+    def is_available(self) -> bool:
+        return self.client.is_available()
+
+    def metrics(self) -> dict:
+        res = self.client.metrics()
+        res.update(
+            {f"cache_{key}": value for key, value in self.cache.metrics().items()}
+        )
+        return res
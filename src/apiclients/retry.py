@@ -0,0 +1,60 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+
+class RetryPolicy:
+    """
+    RetryPolicy describes how a failed request to an external service is retried.
+
+    Delays grow exponentially from `base_delay` and are capped by `max_delay`.
+    Full jitter is applied, so concurrent requests that failed together don't
+    retry together. A `Retry-After` value sent by the service takes precedence
+    over the computed delay. `deadline` bounds the total time spent on one
+    request including all its retries; None means no deadline.
+    """
+
+    RETRY_STATUSES: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        deadline: Optional[float] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.RETRY_STATUSES
+
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Returns the delay in seconds before the attempt following `attempt`."""
+        if retry_after is not None:
+            return max(retry_after, 0.0)
+
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, cap)
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parses a Retry-After header given either in seconds or as an HTTP-date."""
+        if not value:
+            return None
+
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return (retry_at - datetime.now(timezone.utc)).total_seconds()
@@ -0,0 +1,57 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class AbstractCircuitBreaker(ABC):
+    """AbstractCircuitBreaker is an abstract class providing a base interface for
+    breakers that stop calling an unhealthy external service for a while."""
+
+    @property
+    @abstractmethod
+    def state(self) -> CircuitState:
+        """Abstract property returning the current state of the breaker."""
+        pass
+
+    @abstractmethod
+    def acquire(self) -> None:
+        """Abstract method reserving one call through the breaker.
+
+        Raises:
+            CircuitOpenError: If the breaker doesn't let the call through.
+        """
+        pass
+
+    @abstractmethod
+    def record_success(self, duration: float) -> None:
+        """Abstract method reporting that a reserved call succeeded after
+        `duration` seconds."""
+        pass
+
+    @abstractmethod
+    def record_failure(self, duration: float) -> None:
+        """Abstract method reporting that a reserved call failed after
+        `duration` seconds."""
+        pass
+
+    @abstractmethod
+    def release(self) -> None:
+        """Abstract method giving back a reserved call that ended without an
+        outcome, e.g. because it was cancelled."""
+        pass
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Abstract method telling whether a call would be let through now."""
+        pass
+
+    @abstractmethod
+    def metrics(self) -> dict:
+        """Abstract method returning the current state of the breaker as a flat
+        dictionary suitable for logging or exporting."""
+        pass
@@ -0,0 +1,169 @@
+import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Tuple
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from circuit_breakers.abstractions import AbstractCircuitBreaker  # noqa
+from circuit_breakers.abstractions import CircuitState  # noqa
+from exceptions import CircuitOpenError  # noqa
+
+logger = logging.getLogger("app.circuit_breakers")
+
+
+class SlidingWindowCircuitBreaker(AbstractCircuitBreaker):
+    """
+    SlidingWindowCircuitBreaker judges the health of an upstream host by the
+    outcomes of its last `window_size` calls.
+
+    Once at least `min_calls` calls are in the window and either the share of
+    failed calls reaches `failure_rate_threshold` or the share of calls slower
+    than `slow_call_duration` seconds reaches `slow_call_rate_threshold`, the
+    breaker opens and rejects every call for `open_timeout` seconds. Then it
+    becomes half-open and lets `half_open_probes` probe calls through: if all of
+    them succeed the breaker closes, and the first failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_timeout: float = 30.0,
+        half_open_probes: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= min_calls <= window_size:
+            raise ValueError(
+                f"min_calls of the '{name}' circuit breaker must be between 1 and "
+                f"window_size {window_size}, got {min_calls}"
+            )
+        if half_open_probes < 1:
+            raise ValueError(
+                f"half_open_probes of the '{name}' circuit breaker must be "
+                f"positive, got {half_open_probes}"
+            )
+
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_timeout = open_timeout
+        self.half_open_probes = half_open_probes
+
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self._opened_total = 0
+        self._rejected_total = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.open_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probes_started = 0
+            self._probes_succeeded = 0
+            logger.info(f"Circuit '{self.name}' is half-open, probing the service")
+        return self._state
+
+    def acquire(self) -> None:
+        state = self.state
+        if state is CircuitState.OPEN or (
+            state is CircuitState.HALF_OPEN
+            and self._probes_started >= self.half_open_probes
+        ):
+            self._rejected_total += 1
+            raise CircuitOpenError(
+                f"Circuit '{self.name}' is {state.value}, the call is rejected"
+            )
+
+        if state is CircuitState.HALF_OPEN:
+            self._probes_started += 1
+
+    def record_success(self, duration: float) -> None:
+        self._record(failed=False, duration=duration)
+
+    def record_failure(self, duration: float) -> None:
+        self._record(failed=True, duration=duration)
+
+    def release(self) -> None:
+        if self._state is CircuitState.HALF_OPEN and self._probes_started:
+            self._probes_started -= 1
+
+    def is_available(self) -> bool:
+        state = self.state
+        return state is CircuitState.CLOSED or (
+            state is CircuitState.HALF_OPEN
+            and self._probes_started < self.half_open_probes
+        )
+
+    def metrics(self) -> dict:
+        failure_rate, slow_call_rate = self._get_rates()
+        return {
+            "state": self.state.value,
+            "failure_rate": failure_rate,
+            "slow_call_rate": slow_call_rate,
+            "opened_total": self._opened_total,
+            "rejected_total": self._rejected_total,
+        }
+
+    def _record(self, failed: bool, duration: float) -> None:
+        slow = duration >= self.slow_call_duration
+
+        if self._state is CircuitState.HALF_OPEN:
+            if failed or slow:
+                self._open()
+                return
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self.half_open_probes:
+                self._state = CircuitState.CLOSED
+                self._window.clear()
+                logger.info(f"Circuit '{self.name}' is closed again")
+            return
+
+        if self._state is CircuitState.OPEN:
+            # A call started before the breaker opened
+            return
+
+        self._window.append((failed, slow))
+        if len(self._window) < self.min_calls:
+            return
+
+        failure_rate, slow_call_rate = self._get_rates()
+        if (
+            failure_rate >= self.failure_rate_threshold
+            or slow_call_rate >= self.slow_call_rate_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        failure_rate, slow_call_rate = self._get_rates()
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._opened_total += 1
+        self._window.clear()
+        logger.warning(
+            f"Circuit '{self.name}' is open for {self.open_timeout}s "
+            f"(failure rate {failure_rate:.0%}, slow call rate {slow_call_rate:.0%})"
+        )
+
+    def _get_rates(self) -> Tuple[float, float]:
+        if not self._window:
+            return 0.0, 0.0
+        failed = sum(1 for failed, _ in self._window if failed)
+        slow = sum(1 for _, slow in self._window if slow)
+        return failed / len(self._window), slow / len(self._window)
@@ -0,0 +1,46 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Optional
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from models.domains import CityLocation  # noqa
+
+
+class AbstractCityResolutionCache(ABC):
+    """AbstractCityResolutionCache is an abstract class providing a base
+    interface for caches mapping city names to their provider-side IDs and
+    coordinates."""
+
+    @abstractmethod
+    def get(self, city: str) -> Optional[CityLocation]:
+        """Abstract method returning the location of the city, or None when the
+        city is unknown or its entry has expired.
+
+        Args:
+            city (str): The city name as it is queried.
+        """
+        pass
+
+    @abstractmethod
+    def put(self, city: str, location: CityLocation) -> None:
+        """Abstract method remembering the location of the city.
+
+        Args:
+            city (str): The city name as it is queried.
+            location (CityLocation): The resolved location.
+        """
+        pass
+
+    @abstractmethod
+    def invalidate(self, city: Optional[str] = None) -> None:
+        """Abstract method forgetting the location of the city, or of every city
+        when no city is given."""
+        pass
+
+    def save(self) -> None:
+        """Persists the cache. Caches that live in memory only don't need to
+        override it."""
+        pass
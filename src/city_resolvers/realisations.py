@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Optional, Set
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from city_resolvers.abstractions import AbstractCityResolutionCache  # noqa
+from exceptions import FileReadError  # noqa
+from exceptions import FileWriteError  # noqa
+from models.domains import CityLocation  # noqa
+
+logger = logging.getLogger("app.city_resolvers")
+
+
+class InMemoryCityResolutionCache(AbstractCityResolutionCache):
+    """
+    InMemoryCityResolutionCache keeps the resolved cities for the lifetime of
+    the process. Entries older than `ttl` seconds are treated as unknown, so the
+    city is resolved by name again; None disables the expiry.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._locations: Dict[str, CityLocation] = {}
+
+    def get(self, city: str) -> Optional[CityLocation]:
+        location = self._locations.get(city)
+        if location is None:
+            return None
+        if self.ttl is not None and time.time() - location.resolved_at > self.ttl:
+            return None
+        return location
+
+    def put(self, city: str, location: CityLocation) -> None:
+        self._locations[city] = location
+
+    def invalidate(self, city: Optional[str] = None) -> None:
+        if city is None:
+            self._locations.clear()
+        else:
+            self._locations.pop(city, None)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+
+class JsonFileCityResolutionCache(InMemoryCityResolutionCache):
+    """
+    JsonFileCityResolutionCache is an InMemoryCityResolutionCache persisted to
+    a JSON file, so later runs query cities by ID from the very first request.
+
+    The file is loaded on creation. Changes are written back at most once per
+    `save_interval` seconds while the cache is being filled, and on save().
+    Cities saved meanwhile by other processes, e.g. other shards of the same
+    run, are merged in rather than overwritten.
+    """
+
+    def __init__(
+        self, filepath: str, ttl: Optional[float] = None, save_interval: float = 30.0
+    ):
+        super().__init__(ttl=ttl)
+        self.filepath = filepath
+        self.save_interval = save_interval
+
+        self._is_dirty = False
+        self._is_cleared = False
+        self._invalidated: Set[str] = set()
+        self._saved_at = time.monotonic()
+        self._locations = self._read()
+        logger.debug(f"Loaded {len(self._locations)} cities from {self.filepath}")
+
+    def _read(self) -> Dict[str, CityLocation]:
+        if not os.path.exists(self.filepath):
+            return {}
+
+        try:
+            with open(self.filepath, mode="r", encoding="utf-8") as file:
+                payload = json.load(file)
+            return {
+                city: CityLocation(**location) for city, location in payload.items()
+            }
+        except (PermissionError, IOError, json.JSONDecodeError, TypeError) as e:
+            error_message = f"An error occurred while reading the city cache: {e}"
+            logger.error(error_message)
+            raise FileReadError(error_message)
+
+    def put(self, city: str, location: CityLocation) -> None:
+        if self._locations.get(city) == location:
+            return
+
+        super().put(city=city, location=location)
+        self._is_dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def invalidate(self, city: Optional[str] = None) -> None:
+        super().invalidate(city=city)
+        if city is None:
+            self._is_cleared = True
+            self._invalidated.clear()
+        else:
+            self._invalidated.add(city)
+        self._is_dirty = True
+
+    def save(self) -> None:
+        if not self._is_dirty:
+            return
+
+        directory = os.path.dirname(self.filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        if not self._is_cleared:
+            locations = self._read()
+            for city in self._invalidated:
+                locations.pop(city, None)
+            locations.update(self._locations)
+            self._locations = locations
+
+        tmp_filepath = f"{self.filepath}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_filepath, mode="w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        city: location._asdict()
+                        for city, location in self._locations.items()
+                    },
+                    file,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_filepath, self.filepath)
+        except (PermissionError, IOError) as e:
+            error_message = f"An error occurred while writing the city cache: {e}"
+            logger.error(error_message)
+            raise FileWriteError(error_message)
+
+        self._is_dirty = False
+        self._is_cleared = False
+        self._invalidated.clear()
+        self._saved_at = time.monotonic()
+        logger.debug(f"Saved {len(self._locations)} cities to {self.filepath}")
@@ -0,0 +1,26 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from models.domains import CityRecord  # noqa
+
+
+class AbstractCitySource(ABC):
+    """AbstractCitySource is an abstract class providing a base interface for
+    the sources of the list of cities to collect."""
+
+    @abstractmethod
+    def iter_cities(self) -> AsyncIterator[CityRecord]:
+        """Abstract method streaming the enabled cities of the list.
+
+        Sources backed by files or tables read them lazily in chunks, so the
+        whole list never sits in memory.
+
+        Raises:
+            CitiesRetrievalError: If the list cannot be read.
+        """
+        pass
@@ -0,0 +1,223 @@
+import asyncio
+import csv
+import importlib
+import itertools
+import json
+import logging
+import os
+import sys
+from abc import abstractmethod
+from typing import AsyncIterator, Iterator, TextIO
+
+from sqlalchemy import Row, Select, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from city_sources.abstractions import AbstractCitySource  # noqa
+from configurations.ini_file import str_to_bool  # noqa
+from exceptions import CitiesRetrievalError  # noqa
+from models.domains import CityRecord  # noqa
+from models.entities import CityORMModel  # noqa
+
+logger = logging.getLogger("app.city_sources")
+
+
+class ModuleCitySource(AbstractCitySource):
+    """
+    ModuleCitySource reads the cities from a tuple of names in a Python module,
+    `cities_tuple` of the top_cities module by default.
+    """
+
+    def __init__(
+        self, module_name: str = "top_cities", attribute: str = "cities_tuple"
+    ):
+        self.module_name = module_name
+        self.attribute = attribute
+
+    async def iter_cities(self) -> AsyncIterator[CityRecord]:
+        try:
+            module = importlib.import_module(self.module_name)
+            cities = getattr(module, self.attribute)
+        except ImportError as e:
+            error_message = f"Error importing module: {e}"
+            logger.error(error_message)
+            raise CitiesRetrievalError(error_message)
+        except AttributeError as e:
+            error_message = f"Error accessing attribute '{self.attribute}': {e}"
+            logger.error(error_message)
+            raise CitiesRetrievalError(error_message)
+
+        for city in cities:
+            yield CityRecord(name=city)
+
+
+class BaseFileCitySource(AbstractCitySource):
+    """
+    BaseFileCitySource streams the cities from a text file, reading
+    `chunk_size` records at a time in a worker thread so the event loop is not
+    blocked by the file I/O. The cities come in the order of the file.
+    """
+
+    def __init__(self, filepath: str, chunk_size: int = 1000):
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+
+    async def iter_cities(self) -> AsyncIterator[CityRecord]:
+        try:
+            file = await asyncio.to_thread(
+                open, self.filepath, mode="r", encoding="utf-8", newline=""
+            )
+        except OSError as e:
+            error_message = f"An error occurred while opening the city list: {e}"
+            logger.error(error_message)
+            raise CitiesRetrievalError(error_message)
+
+        try:
+            records = self._parse(file)
+            while True:
+                try:
+                    chunk = await asyncio.to_thread(
+                        list, itertools.islice(records, self.chunk_size)
+                    )
+                except (OSError, ValueError, KeyError, TypeError, csv.Error) as e:
+                    error_message = (
+                        f"An error occurred while reading the city list "
+                        f"{self.filepath}: {e}"
+                    )
+                    logger.error(error_message)
+                    raise CitiesRetrievalError(error_message)
+
+                if not chunk:
+                    break
+                for record in chunk:
+                    if record.enabled:
+                        yield record
+        finally:
+            file.close()
+
+    @abstractmethod
+    def _parse(self, file: TextIO) -> Iterator[CityRecord]:
+        """Parses the records of the file one by one."""
+        pass
+
+    @staticmethod
+    def _to_record(row: dict, line_number: int) -> CityRecord:
+        """Builds a record from the fields of a row. Only `name` is required."""
+        name = row.get("name")
+        if not name:
+            raise ValueError(f"line {line_number} has no city name")
+
+        enabled = row.get("enabled")
+        if isinstance(enabled, str):
+            enabled = str_to_bool(enabled) if enabled.strip() else True
+        poll_interval = row.get("poll_interval")
+        return CityRecord(
+            name=name,
+            enabled=True if enabled is None else bool(enabled),
+            priority=int(row.get("priority") or 0),
+            poll_interval=(
+                float(poll_interval) if poll_interval not in (None, "") else None
+            ),
+        )
+
+
+class CsvFileCitySource(BaseFileCitySource):
+    """
+    CsvFileCitySource streams the cities from a CSV file with a header row.
+    The `name` column is required; `enabled`, `priority` and `poll_interval`
+    are optional.
+    """
+
+    def _parse(self, file: TextIO) -> Iterator[CityRecord]:
+        for line_number, row in enumerate(csv.DictReader(file), start=2):
+            yield self._to_record(row=row, line_number=line_number)
+
+
+class JsonlFileCitySource(BaseFileCitySource):
+    """
+    JsonlFileCitySource streams the cities from a JSON Lines file, one object
+    per line with the same fields as the CSV columns. Blank lines are skipped.
+    """
+
+    def _parse(self, file: TextIO) -> Iterator[CityRecord]:
+        for line_number, line in enumerate(file, start=1):
+            if line.strip():
+                yield self._to_record(row=json.loads(line), line_number=line_number)
+
+
+class DatabaseCitySource(AbstractCitySource):
+    """
+    DatabaseCitySource streams the enabled cities of the `cities` table in
+    chunks of `chunk_size`, highest priority first.
+
+    Every chunk is a separate short query continuing after the last row of the
+    previous one (keyset pagination on priority and id), so no transaction is
+    kept open while the cities are collected.
+    """
+
+    def __init__(
+        self, async_session_factory: async_sessionmaker, chunk_size: int = 1000
+    ):
+        self.async_session_factory = async_session_factory
+        self.chunk_size = chunk_size
+
+    async def iter_cities(self) -> AsyncIterator[CityRecord]:
+        query = (
+            select(
+                CityORMModel.id,
+                CityORMModel.name,
+                CityORMModel.priority,
+                CityORMModel.poll_interval,
+            )
+            .where(CityORMModel.enabled.is_(True))
+            .order_by(CityORMModel.priority.desc(), CityORMModel.id)
+            .limit(self.chunk_size)
+        )
+
+        last_row = None
+        while True:
+            stmt = (
+                query
+                if last_row is None
+                else self._build_next_chunk_query(query=query, last_row=last_row)
+            )
+
+            try:
+                async with self.async_session_factory() as session:
+                    rows = (await session.execute(stmt)).all()
+            except SQLAlchemyError as e:
+                error_message = f"An error occurred while reading the cities: {e}"
+                logger.error(error_message)
+                raise CitiesRetrievalError(error_message)
+
+            for row in rows:
+                yield CityRecord(
+                    name=row.name,
+                    priority=row.priority,
+                    poll_interval=row.poll_interval,
+                )
+            if len(rows) < self.chunk_size:
+                break
+            last_row = rows[-1]
+
+    def _build_next_chunk_query(self, query: Select, last_row: Row) -> Select:
+        """Builds the query of the chunk after last_row.
+
+        The rest of the cities of the same priority and the cities of lower
+        priority are read by two branches, each of them a single range of the
+        (priority DESC, id) index, so a chunk never sorts the table.
+        """
+        same_priority = query.where(
+            CityORMModel.priority == last_row.priority,
+            CityORMModel.id > last_row.id,
+        )
+        lower_priority = query.where(CityORMModel.priority < last_row.priority)
+        chunk = union_all(same_priority, lower_priority).subquery()
+        return (
+            select(chunk)
+            .order_by(chunk.c.priority.desc(), chunk.c.id)
+            .limit(self.chunk_size)
+        )
@@ -5,6 +5,11 @@ from pprint import pprint
 from typing import Dict, List, Literal
 
 
+def str_to_bool(value: str) -> bool:
+    """Converts a boolean option of an ini file to bool."""
+    return str(value).strip().lower() in ("1", "yes", "true", "on")
+
+
 class IniSettings(Dict):
     def __new__(cls, ini_file: str, nested_delimiter: str = "__", *args, **kwargs):
         instance = super().__new__(cls, *args, **kwargs)
@@ -64,6 +69,22 @@ class IniConfigSettings(IniSettings):
             extension="txt",
         )
 
+        self["api_clients"]["city_resolver"]["filepath"] = os.path.join(
+            root_dir, self["api_clients"]["city_resolver"]["filepath"]
+        )
+
+        self["api_clients"]["response_cache"]["filepath"] = os.path.join(
+            root_dir, self["api_clients"]["response_cache"]["filepath"]
+        )
+
+        self["city_source"]["filepath"] = os.path.join(
+            root_dir, self["city_source"]["filepath"]
+        )
+
+        self["observation_index"]["filepath"] = os.path.join(
+            root_dir, self["observation_index"]["filepath"]
+        )
+
     @staticmethod
     def _get_filepath(
         directory: str, root_dir: str, extension: Literal["txt", "json"]
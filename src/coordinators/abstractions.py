@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from contextlib import AbstractAsyncContextManager
+from typing import Collection, Optional
+
+
+class AbstractShardCoordinator(ABC):
+    """
+    AbstractShardCoordinator is an abstract class providing a base interface for
+    distributing the shards of the city list between several collector nodes.
+
+    The city list is split into `shard_count` shards: shard i holds every
+    shard_count-th city starting from city i.
+    """
+
+    shard_count: int = 1
+
+    @abstractmethod
+    async def claim(self, exclude: Collection[int] = ()) -> Optional[int]:
+        """Abstract method claiming a shard that is due for collection and not
+        held by another node. Returns its index, or None when no shard is left.
+
+        Args:
+            exclude (Collection[int]): The indexes of the shards not to claim,
+            e.g. the ones that already failed on this node in this run.
+
+        Raises:
+            CoordinationError: If the claim cannot be made.
+        """
+        pass
+
+    @abstractmethod
+    def lease(self, shard_index: int) -> AbstractAsyncContextManager:
+        """Abstract method returning a context manager that keeps the lease of a
+        claimed shard while the shard is collected. The shard is marked as
+        collected when the block succeeds and released for other nodes when it
+        fails."""
+        pass
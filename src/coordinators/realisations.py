@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import os
+import socket
+import sys
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
+from typing import AsyncIterator, Collection, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from coordinators.abstractions import AbstractShardCoordinator  # noqa
+from exceptions import CoordinationError  # noqa
+from models.entities import ShardLeaseORMModel  # noqa
+
+logger = logging.getLogger("app.coordinators")
+
+
+class PostgresLeaseCoordinator(AbstractShardCoordinator):
+    """
+    PostgresLeaseCoordinator distributes the shards of the city list between
+    collector nodes through leases in the shard_leases table.
+
+    A node claims one due shard at a time with SELECT ... FOR UPDATE SKIP
+    LOCKED, so concurrent nodes never claim the same shard, and renews the
+    lease every third of `lease_ttl` while it collects the shard. A shard is
+    due when it was not collected during the last `recollect_after` seconds.
+    The shard of a node that died is claimed again once its lease expires.
+    All times come from the database clock, so the clocks of the nodes don't
+    need to agree.
+    """
+
+    def __init__(
+        self,
+        async_session_factory: async_sessionmaker,
+        shard_count: int,
+        lease_ttl: float = 60.0,
+        recollect_after: float = 540.0,
+        node_id: Optional[str] = None,
+    ):
+        if shard_count < 1:
+            raise ValueError(f"shard_count must be positive, got {shard_count}")
+
+        self.async_session_factory = async_session_factory
+        self.shard_count = shard_count
+        self.lease_ttl = lease_ttl
+        self.recollect_after = recollect_after
+        self.node_id = (
+            node_id if node_id is not None else f"{socket.gethostname()}:{os.getpid()}"
+        )
+
+        self._table = ShardLeaseORMModel.__table__
+        self._is_prepared = False
+
+    async def claim(self, exclude: Collection[int] = ()) -> Optional[int]:
+        table = self._table
+        try:
+            await self._prepare()
+
+            candidate = (
+                select(table.c.shard_index)
+                .where(
+                    table.c.shard_index < self.shard_count,
+                    table.c.shard_index.not_in(list(exclude)),
+                    or_(table.c.expires_at.is_(None), table.c.expires_at < func.now()),
+                    or_(
+                        table.c.completed_at.is_(None),
+                        table.c.completed_at
+                        < func.now() - timedelta(seconds=self.recollect_after),
+                    ),
+                )
+                .order_by(table.c.completed_at.asc().nulls_first(), table.c.shard_index)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            stmt = (
+                update(table)
+                .where(table.c.shard_index == candidate)
+                .values(
+                    owner=self.node_id,
+                    expires_at=func.now() + timedelta(seconds=self.lease_ttl),
+                )
+                .returning(table.c.shard_index)
+            )
+            async with self.async_session_factory() as session:
+                async with session.begin():
+                    shard_index = (await session.execute(stmt)).scalar_one_or_none()
+        except SQLAlchemyError as e:
+            error_message = f"An error occurred while claiming a shard: {e}"
+            logger.error(error_message)
+            raise CoordinationError(error_message)
+
+        if shard_index is not None:
+            logger.info(
+                f"Node {self.node_id} claimed shard "
+                f"{shard_index + 1}/{self.shard_count}"
+            )
+        return shard_index
+
+    @asynccontextmanager
+    async def lease(self, shard_index: int) -> AsyncIterator[None]:
+        renew_task = asyncio.create_task(self._keep_renewed(shard_index))
+        try:
+            yield
+        except BaseException:
+            await self._stop(renew_task)
+            with suppress(CoordinationError):
+                await self._finish(shard_index=shard_index, completed=False)
+            raise
+
+        await self._stop(renew_task)
+        await self._finish(shard_index=shard_index, completed=True)
+
+    async def _prepare(self) -> None:
+        """Creates the rows of the shards that are missing from the table."""
+        if self._is_prepared:
+            return
+
+        stmt = (
+            insert(self._table)
+            .values([{"shard_index": index} for index in range(self.shard_count)])
+            .on_conflict_do_nothing(index_elements=["shard_index"])
+        )
+        async with self.async_session_factory() as session:
+            async with session.begin():
+                await session.execute(stmt)
+        self._is_prepared = True
+
+    async def _keep_renewed(self, shard_index: int) -> None:
+        table = self._table
+        stmt = (
+            update(table)
+            .where(table.c.shard_index == shard_index, table.c.owner == self.node_id)
+            .values(expires_at=func.now() + timedelta(seconds=self.lease_ttl))
+            .returning(table.c.shard_index)
+        )
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            try:
+                async with self.async_session_factory() as session:
+                    async with session.begin():
+                        renewed = (await session.execute(stmt)).scalar_one_or_none()
+            except SQLAlchemyError as e:
+                logger.warning(f"Renewing the lease of shard {shard_index} failed: {e}")
+                continue
+
+            if renewed is None:
+                logger.warning(
+                    f"Node {self.node_id} lost the lease of shard {shard_index}, "
+                    f"another node may collect it too"
+                )
+                return
+
+    async def _finish(self, shard_index: int, completed: bool) -> None:
+        """Gives the lease up, marking the shard as collected if `completed`."""
+        table = self._table
+        values = {"owner": None, "expires_at": None}
+        if completed:
+            values["completed_at"] = func.now()
+
+        stmt = (
+            update(table)
+            .where(table.c.shard_index == shard_index, table.c.owner == self.node_id)
+            .values(**values)
+        )
+        try:
+            async with self.async_session_factory() as session:
+                async with session.begin():
+                    await session.execute(stmt)
+        except SQLAlchemyError as e:
+            error_message = (
+                f"An error occurred while releasing the lease of shard "
+                f"{shard_index}: {e}"
+            )
+            logger.error(error_message)
+            raise CoordinationError(error_message)
+
+    @staticmethod
+    async def _stop(task: asyncio.Task) -> None:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
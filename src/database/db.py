@@ -29,6 +29,10 @@ class Database:
             await conn.run_sync(Base.metadata.drop_all)
             await conn.run_sync(Base.metadata.create_all)
 
+    async def dispose(self) -> None:
+        """Closes all the connections of the engine pool."""
+        await self._async_engine.dispose()
+
     @property
     def get_session_factory(self):
         """Getter for the asynchronous session factory."""
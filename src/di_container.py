@@ -4,12 +4,28 @@ from pprint import pprint
 
 from dependency_injector import containers, providers
 
-from apiclients.realisations import OpenweathermapByCityAPIClient
+from apiclients.decoders import create_json_decoder
+from apiclients.realisations import (
+    CachingAPIClient,
+    OpenweathermapByCityAPIClient,
+    OpenweathermapGroupAPIClient,
+)
+from apiclients.retry import RetryPolicy
+from circuit_breakers.realisations import SlidingWindowCircuitBreaker
+from city_resolvers.realisations import JsonFileCityResolutionCache
+from city_sources.realisations import (
+    CsvFileCitySource,
+    DatabaseCitySource,
+    JsonlFileCitySource,
+    ModuleCitySource,
+)
 from configurations.dotenv_file import DotenvSettings
-from configurations.ini_file import IniConfigSettings
+from configurations.ini_file import IniConfigSettings, str_to_bool
 from configurations.merged_config import merge_dicts
 from configurations.yaml_file import YamlLoggingSettings
+from coordinators.realisations import PostgresLeaseCoordinator
 from database.db import Database
+from fetch_engines.realisations import QueueFetchEngine
 from mappers.realisations import (
     JsonMapper,
     OpenweathermapWeatherMapper,
@@ -17,12 +33,20 @@ from mappers.realisations import (
     WeatherDatabaseMapper,
 )
 from master import MasterService
+from observation_indexes.realisations import (
+    InMemoryObservationIndex,
+    JsonFileObservationIndex,
+)
+from pipelines.realisations import StreamingPipeline
+from rate_limiters.realisations import create_quota_rate_limiter
 from repositories.manager import DatabaseRepositoriesManager
 from repositories.realisations import (
     JsonRepository,
     TextfileRepository,
     WeatherDatabaseRepository,
 )
+from response_caches.realisations import InMemoryResponseCache, SqliteResponseCache
+from schedulers.realisations import AdaptivePollingScheduler, DatabaseChangeHistory
 from storage_services.manager import StorageServiceManager
 from storage_services.realisations import DatabaseService, FileService
 from units_of_work.realisations import WeatherUnitOfWork
@@ -66,7 +90,13 @@ class Repositories(containers.DeclarativeContainer):
 
     database_repositories_list_provider = providers.List(
         providers.Singleton(
-            WeatherDatabaseRepository, mapper=mappers.weather_database_mapper_provider
+            WeatherDatabaseRepository,
+            mapper=mappers.weather_database_mapper_provider,
+            ingest_mode=config.db_repo.ingest_mode,
+            conflict_policy=config.db_repo.conflict_policy,
+            chunk_size=config.db_repo.chunk_size.as_int(),
+            page_size=config.db_repo.page_size.as_int(),
+            fetch_size=config.db_repo.fetch_size.as_int(),
         )
     )
 
@@ -106,6 +136,7 @@ class StorageServices(containers.DeclarativeContainer):
             DatabaseService,
             uow=units_of_work.weather_uow_provider,
             service_designation="db",
+            transaction_size=config.db_service.transaction_size.as_int(),
         ),
         providers.Singleton(
             FileService,
@@ -129,23 +160,267 @@ class StorageServices(containers.DeclarativeContainer):
 class ApiClients(containers.DeclarativeContainer):
     config = providers.Configuration()
 
-    weather_client_provider = providers.Factory(
-        OpenweathermapByCityAPIClient, api_key=config.weather_client.api_key
+    weather_rate_limiter_provider = providers.Singleton(
+        create_quota_rate_limiter,
+        calls_per_minute=config.weather_client.calls_per_minute.as_int(),
+        calls_per_day=config.weather_client.calls_per_day.as_int(),
+        burst=config.weather_client.burst.as_int(),
+    )
+
+    weather_retry_policy_provider = providers.Singleton(
+        RetryPolicy,
+        max_attempts=config.weather_client.max_attempts.as_int(),
+        base_delay=config.weather_client.backoff_base_delay.as_float(),
+        max_delay=config.weather_client.backoff_max_delay.as_float(),
+        deadline=config.weather_client.request_deadline.as_float(),
+    )
+
+    weather_json_decoder_provider = providers.Singleton(
+        create_json_decoder,
+        backend=config.weather_client.json_decoder,
+        typed=config.weather_client.typed_responses.as_(str_to_bool),
+    )
+
+    weather_circuit_breaker_provider = providers.Singleton(
+        SlidingWindowCircuitBreaker,
+        name="api.openweathermap.org",
+        window_size=config.circuit_breaker.window_size.as_int(),
+        min_calls=config.circuit_breaker.min_calls.as_int(),
+        failure_rate_threshold=config.circuit_breaker.failure_rate_threshold.as_float(),
+        slow_call_duration=config.circuit_breaker.slow_call_duration.as_float(),
+        slow_call_rate_threshold=(
+            config.circuit_breaker.slow_call_rate_threshold.as_float()
+        ),
+        open_timeout=config.circuit_breaker.open_timeout.as_float(),
+        half_open_probes=config.circuit_breaker.half_open_probes.as_int(),
+    )
+
+    city_resolver_provider = providers.Singleton(
+        JsonFileCityResolutionCache,
+        filepath=config.city_resolver.filepath,
+        ttl=config.city_resolver.ttl.as_float(),
+        save_interval=config.city_resolver.save_interval.as_float(),
+    )
+
+    weather_base_client_provider = providers.Selector(
+        config.weather_client.endpoint,
+        city=providers.Singleton(
+            OpenweathermapByCityAPIClient,
+            api_key=config.weather_client.api_key,
+            pool_size=config.weather_client.pool_size.as_int(),
+            pool_size_per_host=config.weather_client.pool_size_per_host.as_int(),
+            keepalive_timeout=config.weather_client.keepalive_timeout.as_float(),
+            ttl_dns_cache=config.weather_client.ttl_dns_cache.as_int(),
+            total_timeout=config.weather_client.total_timeout.as_float(),
+            connect_timeout=config.weather_client.connect_timeout.as_float(),
+            read_timeout=config.weather_client.read_timeout.as_float(),
+            rate_limiter=weather_rate_limiter_provider,
+            retry_policy=weather_retry_policy_provider,
+            city_resolver=city_resolver_provider,
+            circuit_breaker=weather_circuit_breaker_provider,
+            json_decoder=weather_json_decoder_provider,
+        ),
+        group=providers.Singleton(
+            OpenweathermapGroupAPIClient,
+            api_key=config.weather_client.api_key,
+            batch_window=config.weather_client.group_batch_window.as_float(),
+            pool_size=config.weather_client.pool_size.as_int(),
+            pool_size_per_host=config.weather_client.pool_size_per_host.as_int(),
+            keepalive_timeout=config.weather_client.keepalive_timeout.as_float(),
+            ttl_dns_cache=config.weather_client.ttl_dns_cache.as_int(),
+            total_timeout=config.weather_client.total_timeout.as_float(),
+            connect_timeout=config.weather_client.connect_timeout.as_float(),
+            read_timeout=config.weather_client.read_timeout.as_float(),
+            rate_limiter=weather_rate_limiter_provider,
+            retry_policy=weather_retry_policy_provider,
+            city_resolver=city_resolver_provider,
+            circuit_breaker=weather_circuit_breaker_provider,
+            json_decoder=weather_json_decoder_provider,
+        ),
+    )
+
+    weather_client_provider = providers.Selector(
+        config.response_cache.backend,
+        none=weather_base_client_provider,
+        memory=providers.Singleton(
+            CachingAPIClient,
+            client=weather_base_client_provider,
+            cache=providers.Singleton(
+                InMemoryResponseCache,
+                ttl=config.response_cache.ttl.as_float(),
+                max_size=config.response_cache.max_size.as_int(),
+            ),
+        ),
+        sqlite=providers.Singleton(
+            CachingAPIClient,
+            client=weather_base_client_provider,
+            cache=providers.Singleton(
+                SqliteResponseCache,
+                filepath=config.response_cache.filepath,
+                ttl=config.response_cache.ttl.as_float(),
+                max_size=config.response_cache.max_size.as_int(),
+            ),
+        ),
+    )
+
+
+class FetchEngines(containers.DeclarativeContainer):
+    config = providers.Configuration()
+
+    api_clients = providers.DependenciesContainer()
+
+    fetch_engine_provider = providers.Factory(
+        QueueFetchEngine,
+        weather_client=api_clients.weather_client_provider,
+        workers=config.workers.as_int(),
+        queue_size=config.queue_size.as_int(),
+    )
+
+
+class Pipelines(containers.DeclarativeContainer):
+    config = providers.Configuration()
+
+    fetch_engines = providers.DependenciesContainer()
+
+    mappers = providers.DependenciesContainer()
+
+    streaming_pipeline_provider = providers.Factory(
+        StreamingPipeline,
+        fetch_engine=fetch_engines.fetch_engine_provider,
+        client_storage_mapper=mappers.client_storage_mapper_provider,
+        mapper_workers=config.mapper_workers.as_int(),
+        queue_size=config.queue_size.as_int(),
+        batch_size=config.batch_size.as_int(),
+        flush_interval=config.flush_interval.as_float(),
+    )
+
+
+class Coordinators(containers.DeclarativeContainer):
+    config = providers.Configuration()
+
+    database = providers.DependenciesContainer()
+
+    lease_coordinator_provider = providers.Singleton(
+        PostgresLeaseCoordinator,
+        async_session_factory=database.database_provider.provided.get_session_factory,
+        shard_count=config.shard_count.as_int(),
+        lease_ttl=config.lease_ttl.as_float(),
+        recollect_after=config.recollect_after.as_float(),
+    )
+
+
+class CitySources(containers.DeclarativeContainer):
+    config = providers.Configuration()
+
+    database = providers.DependenciesContainer()
+
+    city_source_provider = providers.Selector(
+        config.type,
+        module=providers.Singleton(ModuleCitySource, module_name=config.module),
+        csv=providers.Singleton(
+            CsvFileCitySource,
+            filepath=config.filepath,
+            chunk_size=config.chunk_size.as_int(),
+        ),
+        jsonl=providers.Singleton(
+            JsonlFileCitySource,
+            filepath=config.filepath,
+            chunk_size=config.chunk_size.as_int(),
+        ),
+        database=providers.Singleton(
+            DatabaseCitySource,
+            async_session_factory=(
+                database.database_provider.provided.get_session_factory
+            ),
+            chunk_size=config.chunk_size.as_int(),
+        ),
+    )
+
+
+class Schedulers(containers.DeclarativeContainer):
+    config = providers.Configuration()
+
+    database = providers.DependenciesContainer()
+
+    api_clients = providers.DependenciesContainer()
+
+    adaptive_scheduler_provider = providers.Singleton(
+        AdaptivePollingScheduler,
+        change_history=providers.Singleton(
+            DatabaseChangeHistory,
+            async_session_factory=(
+                database.database_provider.provided.get_session_factory
+            ),
+            history_size=config.history_size.as_int(),
+            city_resolver=api_clients.city_resolver_provider,
+        ),
+        min_interval=config.min_interval.as_float(),
+        max_interval=config.max_interval.as_float(),
+        tick=config.tick.as_float(),
+    )
+
+
+class ObservationIndexes(containers.DeclarativeContainer):
+    config = providers.Configuration()
+
+    observation_index_provider = providers.Selector(
+        config.backend,
+        none=providers.Object(None),
+        memory=providers.Singleton(InMemoryObservationIndex),
+        file=providers.Singleton(
+            JsonFileObservationIndex,
+            filepath=config.filepath,
+            save_interval=config.save_interval.as_float(),
+        ),
     )
 
 
 class Master(containers.DeclarativeContainer):
+    config = providers.Configuration()
+
     storage_services = providers.DependenciesContainer()
 
     api_clients = providers.DependenciesContainer()
 
+    fetch_engines = providers.DependenciesContainer()
+
+    pipelines = providers.DependenciesContainer()
+
+    coordinators = providers.DependenciesContainer()
+
+    city_sources = providers.DependenciesContainer()
+
+    schedulers = providers.DependenciesContainer()
+
+    observation_indexes = providers.DependenciesContainer()
+
     mappers = providers.DependenciesContainer()
 
     master_service_provider = providers.Factory(
         MasterService,
         weather_client=api_clients.weather_client_provider,
+        fetch_engine=fetch_engines.fetch_engine_provider,
         client_storage_mapper=mappers.client_storage_mapper_provider,
         storage_services_manager=storage_services.storage_services_manager_provider,
+        interval=config.interval.as_float(),
+        partial_success=config.partial_success.as_(str_to_bool),
+        streaming_pipeline=providers.Selector(
+            config.mode,
+            sequential=providers.Object(None),
+            streaming=pipelines.streaming_pipeline_provider,
+        ),
+        coordinator=providers.Selector(
+            config.coordination,
+            none=providers.Object(None),
+            lease=coordinators.lease_coordinator_provider,
+        ),
+        city_source=city_sources.city_source_provider,
+        scheduler=providers.Selector(
+            config.scheduling,
+            fixed=providers.Object(None),
+            adaptive=schedulers.adaptive_scheduler_provider,
+        ),
+        observation_index=observation_indexes.observation_index_provider,
     )
 
 
@@ -175,10 +450,47 @@ class Application(containers.DeclarativeContainer):
 
     api_clients = providers.Container(ApiClients, config=config.api_clients)
 
+    fetch_engines = providers.Container(
+        FetchEngines, config=config.fetch_engine, api_clients=api_clients
+    )
+
+    pipelines = providers.Container(
+        Pipelines,
+        config=config.pipeline,
+        fetch_engines=fetch_engines,
+        mappers=mappers,
+    )
+
+    coordinators = providers.Container(
+        Coordinators, config=config.coordinator, database=database
+    )
+
+    city_sources = providers.Container(
+        CitySources, config=config.city_source, database=database
+    )
+
+    schedulers = providers.Container(
+        Schedulers,
+        config=config.scheduler,
+        database=database,
+        api_clients=api_clients,
+    )
+
+    observation_indexes = providers.Container(
+        ObservationIndexes, config=config.observation_index
+    )
+
     master = providers.Container(
         Master,
+        config=config.master,
         storage_services=storage_services,
         api_clients=api_clients,
+        fetch_engines=fetch_engines,
+        pipelines=pipelines,
+        coordinators=coordinators,
+        city_sources=city_sources,
+        schedulers=schedulers,
+        observation_indexes=observation_indexes,
         mappers=mappers,
     )
 
@@ -75,3 +75,38 @@ class WeatherParsingError(ApiClientError):
 
 class WeatherFetchingError(ApiClientError):
     pass
+
+
+class RetryableStatusError(ApiClientError):
+    """Exception raised when the service responds with a status worth retrying."""
+
+    def __init__(self, status: int, retry_after=None):
+        self.status = status
+        self.retry_after = retry_after
+        super().__init__(f"Service responded with status {status}")
+
+
+class CircuitOpenError(ApiClientError):
+    """Exception raised when a request is rejected by an open circuit breaker."""
+
+    pass
+
+
+# Coordinators
+class CoordinationError(Exception):
+    """Exception raised when the shards of the city list cannot be claimed or
+    renewed."""
+
+    pass
+
+
+# Schedulers
+class SchedulingError(Exception):
+    """Exception raised when the change history of the cities cannot be read."""
+
+    pass
+
+
+# MasterService
+class CollectionCycleError(Exception):
+    """Exception raised when a collection cycle cannot be completed."""
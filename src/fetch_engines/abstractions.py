@@ -0,0 +1,34 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Iterable, Union
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from models.results import FetchResult  # noqa
+
+
+class AbstractFetchEngine(ABC):
+    """AbstractFetchEngine is an abstract class providing a base interface for
+    engines that fetch the weather data for many cities through an API client."""
+
+    @abstractmethod
+    def fetch(
+        self, cities: Union[Iterable[str], AsyncIterable[str]], timestamp: datetime
+    ) -> AsyncIterator[FetchResult]:
+        """Abstract method for fetching the weather data for the given cities.
+
+        Results are yielded as soon as they are ready, in completion order.
+        A failure for one city is reported in its FetchResult and doesn't stop
+        the others.
+
+        Args:
+            cities: The cities to fetch (sync or async iterable), consumed lazily.
+            timestamp (datetime): The timestamp of the current run.
+
+        Returns:
+            AsyncIterator[FetchResult]: The per-city results.
+        """
+        pass
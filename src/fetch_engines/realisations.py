@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from apiclients.abstractions import APIClientService  # noqa
+from fetch_engines.abstractions import AbstractFetchEngine  # noqa
+from models.results import FetchResult  # noqa
+
+logger = logging.getLogger("app.fetch_engines")
+
+_STOP = object()
+
+
+class QueueFetchEngine(AbstractFetchEngine):
+    """
+    QueueFetchEngine fetches the weather data with a fixed pool of workers
+    reading cities from a bounded work queue.
+
+    The number of in-flight requests never exceeds `workers`, and both the
+    work queue and the result queue are bounded by `queue_size`, so memory
+    stays flat however many cities are fed in. Only the worker tasks and the
+    producer task exist for the whole run, no task is created per city.
+    """
+
+    def __init__(self, weather_client: APIClientService, workers: int, queue_size: int):
+        self.weather_client = weather_client
+        self.workers = workers
+        self.queue_size = queue_size
+
+    async def fetch(
+        self, cities: Union[Iterable[str], AsyncIterable[str]], timestamp: datetime
+    ) -> AsyncIterator[FetchResult]:
+        city_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        result_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        producer_error: Optional[Exception] = None
+
+        async def produce() -> None:
+            nonlocal producer_error
+            try:
+                if isinstance(cities, AsyncIterable):
+                    async for city in cities:
+                        await city_queue.put(city)
+                else:
+                    for city in cities:
+                        await city_queue.put(city)
+            except Exception as e:
+                producer_error = e
+            for _ in range(self.workers):
+                await city_queue.put(_STOP)
+
+        async def work() -> None:
+            while True:
+                city = await city_queue.get()
+                if city is _STOP:
+                    break
+                await result_queue.put(await self._fetch_one(city, timestamp))
+            await result_queue.put(_STOP)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks.extend(asyncio.create_task(work()) for _ in range(self.workers))
+        logger.debug(f"Started {self.workers} fetch workers")
+
+        try:
+            finished_workers = 0
+            while finished_workers < self.workers:
+                result = await result_queue.get()
+                if result is _STOP:
+                    finished_workers += 1
+                    continue
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.debug("All fetch workers finished!")
+
+        if producer_error is not None:
+            raise producer_error
+
+    async def _fetch_one(self, city: str, timestamp: datetime) -> FetchResult:
+        """Fetches one city and wraps the outcome into a FetchResult."""
+
+        started = time.perf_counter()
+        try:
+            dto = await self.weather_client.get(city=city, timestamp=timestamp)
+        except Exception as e:
+            latency = time.perf_counter() - started
+            logger.debug(f"Fetching {city} failed after {latency * 1000:.1f} ms")
+            return FetchResult(city=city, error=e, latency=latency)
+
+        latency = time.perf_counter() - started
+        logger.debug(f"Fetched {city} in {latency * 1000:.1f} ms")
+        return FetchResult(city=city, dto=dto, latency=latency)
@@ -1,5 +1,12 @@
+import argparse
 import asyncio
+import copy
+import logging
+import multiprocessing
 import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict
 
 from dependency_injector import containers
@@ -8,11 +15,14 @@ from configurations.dotenv_file import DotenvSettings
 from configurations.ini_file import IniConfigSettings
 from configurations.merged_config import merge_dicts
 from configurations.yaml_file import YamlLoggingSettings
-from di_container import Application
+from di_container import Application, Core
 from master import MasterService
+from models.results import RunSummary
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
 
+logger = logging.getLogger("app.main")
+
 
 def get_config_dict() -> Dict:
     """
@@ -39,6 +49,57 @@ def get_config_dict() -> Dict:
     return settings_dict
 
 
+def get_shard_config_dict(
+    config_dict: Dict, shard_index: int, shard_count: int
+) -> Dict:
+    """
+    Adjusts the configuration settings for one of shard_count worker processes.
+
+    The per-key quotas of the weather API are divided between the shards, so
+    their combined rate stays within the quota, and every shard writes its own
+    output files. The burst of a shard is kept below its minute quota.
+
+    Raises:
+        ValueError: If the quotas are too small to be divided between
+        shard_count shards.
+    """
+
+    config_dict = copy.deepcopy(config_dict)
+
+    weather_client = config_dict["api_clients"]["weather_client"]
+    calls_per_minute = int(weather_client["calls_per_minute"]) // shard_count
+    calls_per_day = int(weather_client["calls_per_day"]) // shard_count
+    if calls_per_minute < 2 or calls_per_day < 1:
+        raise ValueError(
+            f"The weather API quotas of {weather_client['calls_per_minute']} "
+            f"calls per minute and {weather_client['calls_per_day']} calls per "
+            f"day cannot be divided between {shard_count} workers, every worker "
+            f"needs at least 2 calls per minute and 1 call per day"
+        )
+    burst = min(
+        max(1, int(weather_client["burst"]) // shard_count), calls_per_minute - 1
+    )
+    weather_client["calls_per_minute"] = str(calls_per_minute)
+    weather_client["calls_per_day"] = str(calls_per_day)
+    weather_client["burst"] = str(burst)
+
+    for repository in ("json_repo", "text_repo"):
+        repository_config = config_dict["repositories"][repository]
+        root, extension = os.path.splitext(repository_config["filepath"])
+        repository_config["filepath"] = f"{root}_{shard_index}{extension}"
+
+    return config_dict
+
+
+def configure_logging(config_dict: Dict) -> None:
+    """Configures logging without building the application container, for the
+    parent process of the worker processes."""
+
+    core = Core()
+    core.config.from_dict(config_dict["logging"])
+    core.init_resources()
+
+
 def create_app_container(config_dict: Dict) -> containers.DeclarativeContainer:
     """This function initializes an instance of the Application class,
     which is a container provided by the Dependency Injector framework.
@@ -63,12 +124,209 @@ def create_master_service(
     return master_service
 
 
+async def shutdown_app_container(
+    app_container: containers.DeclarativeContainer,
+) -> None:
+    """Releases the long-lived resources held by the container singletons."""
+
+    weather_client = app_container.api_clients.weather_client_provider()
+    await weather_client.close()
+
+    observation_index = app_container.observation_indexes.observation_index_provider()
+    if observation_index is not None:
+        observation_index.save()
+
+    database = app_container.database.database_provider()
+    await database.dispose()
+
+
 async def main(app_container: containers.DeclarativeContainer) -> None:
     master_service = create_master_service(app_container=app_container)
-    await master_service.start()
+    try:
+        await master_service.start()
+    finally:
+        await shutdown_app_container(app_container=app_container)
+
+
+def run_shard(shard_index: int, shard_count: int) -> RunSummary:
+    """
+    Runs one collection cycle over a shard of the cities in a worker process.
+
+    Every worker builds its own container, so it has its own event loop, HTTP
+    connector and database engine.
+    """
+
+    config_dict = get_shard_config_dict(
+        config_dict=get_config_dict(), shard_index=shard_index, shard_count=shard_count
+    )
+    app_container = create_app_container(config_dict=config_dict)
+    return asyncio.run(
+        run_shard_cycle(
+            app_container=app_container,
+            shard_index=shard_index,
+            shard_count=shard_count,
+        )
+    )
+
+
+async def run_shard_cycle(
+    app_container: containers.DeclarativeContainer, shard_index: int, shard_count: int
+) -> RunSummary:
+    master_service = app_container.master.master_service_provider(
+        shard_index=shard_index, shard_count=shard_count
+    )
+    try:
+        return await master_service.run_cycle()
+    finally:
+        await shutdown_app_container(app_container=app_container)
+
+
+def main_sharded(config_dict: Dict, shard_count: int) -> None:
+    """Runs one collection cycle sharded across worker processes, aggregates the
+    summaries of the shards and exits with status 1 if any shard failed.
+
+    The quotas are checked to be divisible between the shards before any
+    worker is started."""
+
+    try:
+        get_shard_config_dict(
+            config_dict=config_dict, shard_index=0, shard_count=shard_count
+        )
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    summary = RunSummary()
+    failed_shards = 0
+
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=shard_count, mp_context=mp_context) as pool:
+        futures = {
+            pool.submit(run_shard, shard_index, shard_count): shard_index
+            for shard_index in range(shard_count)
+        }
+        for future in as_completed(futures):
+            shard_index = futures[future]
+            try:
+                summary.merge(future.result())
+            except Exception as e:
+                failed_shards += 1
+                logger.error(f"Shard {shard_index + 1}/{shard_count} failed: {e}")
+
+    logger.info(
+        f"Sharded collection finished: {summary}, "
+        f"{failed_shards} of {shard_count} shard(s) failed"
+    )
+    if failed_shards:
+        sys.exit(1)
+
+
+async def main_daemon(app_container: containers.DeclarativeContainer) -> None:
+    """Runs the master service as a long-living daemon.
+
+    The container, the database engine and the mappers are created once and
+    reused by every collection cycle. SIGTERM and SIGINT stop the daemon after
+    the current cycle is finished.
+    """
+
+    master_service = create_master_service(app_container=app_container)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, master_service.stop)
+
+    try:
+        logger.info(
+            f"Collector daemon started with interval {master_service.interval}s"
+        )
+        await master_service.run_forever()
+    finally:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(sig)
+        await shutdown_app_container(app_container=app_container)
+
+
+async def warm_up_cities(
+    app_container: containers.DeclarativeContainer, refresh: bool = False
+) -> None:
+    """Resolves the IDs of the cities missing from the city cache.
+
+    The weather of the missing cities is requested by name once, which fills
+    the cache, and nothing is stored. With refresh the cache is cleared first,
+    so every city is resolved again.
+    """
+
+    city_resolver = app_container.api_clients.city_resolver_provider()
+    master_service = create_master_service(app_container=app_container)
+    try:
+        if refresh:
+            city_resolver.invalidate()
+
+        cities = [
+            city
+            async for city in master_service.iter_cities()
+            if city_resolver.get(city) is None
+        ]
+        logger.info(f"Resolving {len(cities)} cities missing from the city cache...")
+
+        summary = RunSummary()
+        await master_service.get_weather_data(cities=cities, summary=summary)
+        for city, error in summary.failures.items():
+            logger.warning(f"City {city} was not resolved: {error}")
+        logger.info(
+            f"City cache warmed up: {len(cities) - summary.failed} resolved, "
+            f"{summary.failed} failed"
+        )
+    finally:
+        await shutdown_app_container(app_container=app_container)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Weather collector")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="run collection cycles on the interval from config.ini until SIGTERM",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="shard the cities across this many worker processes",
+    )
+    parser.add_argument(
+        "--warm-up-cities",
+        action="store_true",
+        help="resolve the IDs of the cities missing from the city cache and exit",
+    )
+    parser.add_argument(
+        "--refresh-cities",
+        action="store_true",
+        help="with --warm-up-cities, clear the city cache and resolve every city",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and (args.daemon or args.warm_up_cities):
+        parser.error("--workers can only be used for a single collection cycle")
+    return args
 
 
 if __name__ == "__main__":
+    args = parse_args()
     settings_dict = get_config_dict()
-    application_container = create_app_container(config_dict=settings_dict)
-    asyncio.run(main(app_container=application_container))
+    if args.workers > 1:
+        configure_logging(config_dict=settings_dict)
+        main_sharded(config_dict=settings_dict, shard_count=args.workers)
+    else:
+        application_container = create_app_container(config_dict=settings_dict)
+        if args.warm_up_cities:
+            asyncio.run(
+                warm_up_cities(
+                    app_container=application_container, refresh=args.refresh_cities
+                )
+            )
+        elif args.daemon:
+            asyncio.run(main_daemon(app_container=application_container))
+        else:
+            asyncio.run(main(app_container=application_container))
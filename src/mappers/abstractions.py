@@ -1,12 +1,15 @@
 import os
 import sys
 from abc import ABC, abstractmethod
-from typing import Generic
+from typing import Callable, Generic, Iterable, Optional
 
 parent_directory = os.path.join(os.getcwd(), "..")
 sys.path.append(parent_directory)
 
 from app_types import D, E, S, T  # noqa
+from exceptions import MappingError  # noqa
+from models.batches import WeatherBatch  # noqa
+from models.domains import WeatherDomain  # noqa
 
 
 class AbstractDTOMapper(ABC, Generic[S, T]):
@@ -27,6 +30,51 @@ class AbstractDTOMapper(ABC, Generic[S, T]):
         """
         pass
 
+    def to_target_many(
+        self,
+        source_objs: Iterable[S],
+        on_error: Optional[Callable[[S, MappingError], None]] = None,
+    ) -> list[T]:
+        """Maps a batch of source DTO objects to target domain model objects.
+
+        The default implementation maps them one by one with to_target.
+
+        Args:
+            source_objs (Iterable[S]): The source Data Transfer Objects.
+            on_error (Optional[Callable]): When given, it is called with every
+            DTO that cannot be mapped and its error, and the DTO is skipped.
+            Otherwise the first MappingError is raised.
+
+        Returns:
+            list[T]: The target domain model objects, in the order of the DTOs.
+        """
+        target_objs = []
+        for source_obj in source_objs:
+            try:
+                target_objs.append(self.to_target(source_obj=source_obj))
+            except MappingError as e:
+                if on_error is None:
+                    raise
+                on_error(source_obj, e)
+        return target_objs
+
+
+class AbstractWeatherDTOMapper(AbstractDTOMapper[S, WeatherDomain]):
+    """AbstractWeatherDTOMapper is an abstract class for the mappers of
+    weather DTOs, which can also map a batch into a columnar WeatherBatch."""
+
+    def to_batch(
+        self,
+        source_objs: Iterable[S],
+        on_error: Optional[Callable[[S, MappingError], None]] = None,
+    ) -> WeatherBatch:
+        """Maps a batch of source DTO objects to a WeatherBatch, handling the
+        errors like to_target_many.
+
+        The default implementation encodes the objects of to_target_many.
+        """
+        return WeatherBatch(self.to_target_many(source_objs, on_error=on_error))
+
 
 class AbstractDomainEntityMapper(ABC, Generic[D, E]):
     """AbstractDomainEntityMapper is an abstract class providing a base
@@ -2,14 +2,19 @@ import logging
 import os
 import sys
 from datetime import date, datetime, time
-from typing import NoReturn, Union
+from math import isfinite
+from time import localtime
+from typing import Callable, Iterable, NoReturn, Optional, Sequence, Union
 
 parent_directory = os.path.join(os.getcwd(), "..")
 sys.path.append(parent_directory)
 
 from exceptions import MappingError  # noqa
-from mappers.abstractions import AbstractDomainEntityMapper, AbstractDTOMapper  # noqa
-from models.domains import Celsius, WeatherDomain, WeatherTypeOpenweathermap  # noqa
+from mappers.abstractions import AbstractDomainEntityMapper  # noqa
+from mappers.abstractions import AbstractWeatherDTOMapper  # noqa
+from models.batches import WeatherBatch  # noqa
+from models.domains import WeatherTypeOpenweathermap  # noqa
+from models.domains import Celsius, WeatherDomain, WeatherRecord  # noqa
 from models.dto import JsonOpenweathermapResponseDTO  # noqa
 from models.entities import JsonEntity, TextfileEntity, WeatherORMModel  # noqa
 
@@ -17,11 +22,59 @@ logger = logging.getLogger("app.mappers")
 
 
 class OpenweathermapWeatherMapper(
-    AbstractDTOMapper[JsonOpenweathermapResponseDTO, WeatherDomain]
+    AbstractWeatherDTOMapper[JsonOpenweathermapResponseDTO]
 ):
-    """OpenweathermapWeatherMapper implements the AbstractDTOMapper interface
-    for transforming OpenWeatherMap weather data from DTO to the domain
-    model."""
+    """OpenweathermapWeatherMapper implements the AbstractWeatherDTOMapper
+    interface for transforming OpenWeatherMap weather data from DTO to the
+    domain model.
+
+    to_target_many and to_batch map a batch column by column: the
+    temperatures and the sunrise and sunset times are converted in bulk, with
+    NumPy when it is installed and `use_numpy` is set. The rows whose fields
+    have the expected types are not validated again, the others are mapped
+    one by one with to_target.
+    """
+
+    translation = {
+        "THUNDERSTORM": "Гроза",
+        "DRIZZLE": "Изморось",
+        "RAIN": "Дождь",
+        "SNOW": "Снег",
+        "MIST": "Туманная дымка",
+        "SMOKE": "Копоть",
+        "HAZE": "Мгла",
+        "DUST": "Пыль",
+        "FOG": "Туман",
+        "SAND": "Песок",
+        "ASH": "Пепел",
+        "SQUALL": "Шквал",
+        "TORNADO": "Торнадо",
+        "CLEAR": "Ясно",
+        "CLOUDS": "Облачно",
+    }
+
+    weather_types = {
+        main: WeatherTypeOpenweathermap(value) for main, value in translation.items()
+    }
+
+    # Longest span of the sunrise and sunset times of a batch converted with
+    # a single UTC offset
+    max_offset_span = 2 * 86400
+    # Sunrise and sunset times converted in bulk are below it, well within the
+    # range of datetime
+    max_epoch = 2**37
+
+    def __init__(self, use_numpy: bool = True):
+        self._np = None
+        if use_numpy:
+            try:
+                import numpy
+
+                self._np = numpy
+            except ImportError:
+                logger.debug("NumPy is not installed, batches are mapped without it")
+
+        self._times_of_day: dict[int, time] = {}
 
     def to_target(
         self, source_obj: JsonOpenweathermapResponseDTO
@@ -29,79 +82,304 @@ class OpenweathermapWeatherMapper(
         """Maps data from a JsonOpenweathermapResponseDTO to a WeatherDomain
         object."""
 
-        translation = {
-            "THUNDERSTORM": "Гроза",
-            "DRIZZLE": "Изморось",
-            "RAIN": "Дождь",
-            "SNOW": "Снег",
-            "MIST": "Туманная дымка",
-            "SMOKE": "Копоть",
-            "HAZE": "Мгла",
-            "DUST": "Пыль",
-            "FOG": "Туман",
-            "SAND": "Песок",
-            "ASH": "Пепел",
-            "SQUALL": "Шквал",
-            "TORNADO": "Торнадо",
-            "CLEAR": "Ясно",
-            "CLOUDS": "Облачно",
-        }
-
         try:
             return WeatherDomain(
                 timestamp=source_obj["timestamp"].replace(microsecond=0),
                 city=source_obj["name"],
                 temperature=Celsius(source_obj["main"]["temp"] - 273),
-                weather_type=WeatherTypeOpenweathermap(
-                    translation[source_obj["weather"][0]["main"].upper()]
-                ),
+                weather_type=self.weather_types[
+                    source_obj["weather"][0]["main"].upper()
+                ],
                 sunrise=datetime.fromtimestamp(source_obj["sys"]["sunrise"]).time(),
                 sunset=datetime.fromtimestamp(source_obj["sys"]["sunset"]).time(),
             )
-        except KeyError as e:
+        except Exception as e:
+            raise self._get_mapping_error(e=e, source_obj=source_obj)
+
+    def to_target_many(
+        self,
+        source_objs: Iterable[JsonOpenweathermapResponseDTO],
+        on_error: Optional[
+            Callable[[JsonOpenweathermapResponseDTO, MappingError], None]
+        ] = None,
+    ) -> list[WeatherDomain]:
+        construct = WeatherDomain.model_construct
+        return [
+            construct(
+                timestamp=timestamp,
+                city=city,
+                temperature=temperature,
+                weather_type=weather_type,
+                sunrise=sunrise,
+                sunset=sunset,
+            )
+            for timestamp, city, temperature, weather_type, sunrise, sunset in zip(
+                *self._convert_columns(source_objs=source_objs, on_error=on_error)
+            )
+        ]
+
+    def to_batch(
+        self,
+        source_objs: Iterable[JsonOpenweathermapResponseDTO],
+        on_error: Optional[
+            Callable[[JsonOpenweathermapResponseDTO, MappingError], None]
+        ] = None,
+    ) -> WeatherBatch:
+        return WeatherBatch.from_columns(
+            *self._convert_columns(source_objs=source_objs, on_error=on_error)
+        )
+
+    def _convert_columns(
+        self,
+        source_objs: Iterable[JsonOpenweathermapResponseDTO],
+        on_error: Optional[Callable],
+    ) -> tuple[list, ...]:
+        """Converts the DTOs to the columns of the WeatherDomain fields,
+        skipping or raising on the DTOs that cannot be mapped.
+
+        The DTOs whose fields have the expected types are converted in bulk
+        and not validated again. The others are mapped and validated one by
+        one with to_target, so each DTO with a bad value is reported once, on
+        its own.
+        """
+        columns, mapped = self._get_columns(source_objs=source_objs, on_error=on_error)
+        timestamps, cities, kelvins, weather_types, sunrises, sunsets = columns
+        if kelvins:
+            columns = (
+                timestamps,
+                cities,
+                self._to_celsius(kelvins=kelvins),
+                weather_types,
+                self._to_times_of_day(epochs=sunrises),
+                self._to_times_of_day(epochs=sunsets),
+            )
+
+        for position, weather in mapped:
+            for column, value in zip(columns, WeatherRecord.from_domain(weather)):
+                column.insert(position, value)
+        return columns
+
+    def _get_columns(
+        self,
+        source_objs: Iterable[JsonOpenweathermapResponseDTO],
+        on_error: Optional[Callable],
+    ) -> tuple[tuple[list, ...], list[tuple[int, WeatherDomain]]]:
+        """Extracts the fields of the DTOs to be converted in bulk into
+        columns, skipping or raising on the DTOs that cannot be mapped.
+
+        Returns the columns and the objects mapped with to_target instead,
+        each with its position among the objects of the batch."""
+
+        columns: tuple[list, ...] = ([], [], [], [], [], [])
+        timestamps, cities, kelvins, weather_types, sunrises, sunsets = columns
+        mapped: list[tuple[int, WeatherDomain]] = []
+        rounded_timestamps: dict[datetime, datetime] = {}
+
+        for source_obj in source_objs:
+            try:
+                timestamp = source_obj["timestamp"]
+                city = source_obj["name"]
+                kelvin = source_obj["main"]["temp"]
+                weather_type = self.weather_types[
+                    source_obj["weather"][0]["main"].upper()
+                ]
+                sunrise = source_obj["sys"]["sunrise"]
+                sunset = source_obj["sys"]["sunset"]
+                if not self._has_expected_types(
+                    timestamp=timestamp,
+                    city=city,
+                    kelvin=kelvin,
+                    sunrise=sunrise,
+                    sunset=sunset,
+                ):
+                    weather = self.to_target(source_obj=source_obj)
+                    mapped.append((len(timestamps) + len(mapped), weather))
+                    continue
+            except Exception as e:
+                error = self._get_mapping_error(e=e, source_obj=source_obj)
+                if on_error is None:
+                    raise error
+                on_error(source_obj, error)
+                continue
+
+            rounded_timestamp = rounded_timestamps.get(timestamp)
+            if rounded_timestamp is None:
+                rounded_timestamp = timestamp.replace(microsecond=0)
+                rounded_timestamps[timestamp] = rounded_timestamp
+            timestamps.append(rounded_timestamp)
+            cities.append(city)
+            kelvins.append(kelvin)
+            weather_types.append(weather_type)
+            sunrises.append(sunrise)
+            sunsets.append(sunset)
+
+        return columns, mapped
+
+    def _has_expected_types(
+        self,
+        timestamp: object,
+        city: object,
+        kelvin: object,
+        sunrise: object,
+        sunset: object,
+    ) -> bool:
+        """Tells whether the fields of a DTO can be converted in bulk into
+        values that pass the validation of the domain model."""
+        return (
+            isinstance(timestamp, datetime)
+            and type(city) is str
+            and (type(kelvin) is int or (type(kelvin) is float and isfinite(kelvin)))
+            and type(sunrise) is int
+            and type(sunset) is int
+            and 0 <= sunrise < self.max_epoch
+            and 0 <= sunset < self.max_epoch
+        )
+
+    def _to_celsius(self, kelvins: list) -> list[int]:
+        """Converts the temperatures like Celsius(kelvin - 273) does."""
+        if self._np is not None:
+            celsius = self._np.trunc(self._np.asarray(kelvins, dtype=float) - 273)
+            return celsius.astype(self._np.int64).tolist()
+        return [Celsius(kelvin - 273) for kelvin in kelvins]
+
+    def _to_times_of_day(self, epochs: list) -> list[time]:
+        """Converts Unix timestamps to local times of day like
+        datetime.fromtimestamp(epoch).time() does.
+
+        Within a short span of time the UTC offset of the local timezone is
+        the same for every timestamp unless a DST change falls into it, so the
+        seconds of the day are computed with one offset. Otherwise, or for
+        non-integer timestamps, each timestamp is converted on its own.
+        """
+        first, last = min(epochs), max(epochs)
+        offset = localtime(first).tm_gmtoff
+        if (
+            last - first > self.max_offset_span
+            or localtime(last).tm_gmtoff != offset
+            or not all(type(epoch) is int for epoch in epochs)
+        ):
+            return [datetime.fromtimestamp(epoch).time() for epoch in epochs]
+
+        if self._np is not None:
+            seconds = (
+                (self._np.asarray(epochs, dtype=self._np.int64) + offset) % 86400
+            ).tolist()
+        else:
+            seconds = [(epoch + offset) % 86400 for epoch in epochs]
+
+        times_of_day = self._times_of_day
+        result = []
+        for second in seconds:
+            time_of_day = times_of_day.get(second)
+            if time_of_day is None:
+                hours, rest = divmod(second, 3600)
+                time_of_day = time(hours, *divmod(rest, 60))
+                times_of_day[second] = time_of_day
+            result.append(time_of_day)
+        return result
+
+    @staticmethod
+    def _get_mapping_error(
+        e: Exception, source_obj: JsonOpenweathermapResponseDTO
+    ) -> MappingError:
+        if isinstance(e, MappingError):
+            return e
+        if isinstance(e, KeyError):
             error_message = (
                 f"Error mapping weather data: Missing key {str(e)} "
                 f"in source object {type(source_obj)}."
             )
-            logger.error(error_message)
-            raise MappingError(error_message)
-        except Exception as e:
+        else:
             error_message = (
                 f"Unexpected error occurred during weather mapping: {str(e)}"
             )
-            logger.error(error_message)
-            raise MappingError(error_message)
+        logger.error(error_message)
+        return MappingError(error_message)
 
 
 class WeatherDatabaseMapper(AbstractDomainEntityMapper[WeatherDomain, WeatherORMModel]):
     """WeatherDatabaseMapper implements the AbstractDomainEntityMapper
     interface for transforming weather data between the domain model and the
-    database entity."""
+    database entity.
+
+    Like the other entity mappers, it reads the attributes of the domain
+    object directly, so it maps WeatherRecord rows as well. to_row maps to a
+    plain dict for the inserts, the ORM entities are used for reading."""
 
-    def to_entity(self, domain_obj: WeatherDomain) -> Union[WeatherORMModel, NoReturn]:
+    columns = ("timestamp", "city", "temperature", "weather_type", "sunrise", "sunset")
+
+    def to_entity(
+        self, domain_obj: Union[WeatherDomain, WeatherRecord]
+    ) -> Union[WeatherORMModel, NoReturn]:
         """Maps data from a WeatherDomain object to a WeatherORMModel entity."""
 
         try:
-            return WeatherORMModel(**domain_obj.model_dump())
+            return WeatherORMModel(
+                timestamp=domain_obj.timestamp,
+                city=domain_obj.city,
+                temperature=domain_obj.temperature,
+                weather_type=domain_obj.weather_type,
+                sunrise=domain_obj.sunrise,
+                sunset=domain_obj.sunset,
+            )
         except Exception as e:
             error_message = f"Error mapping WeatherDomain to WeatherORMModel: {str(e)}"
             logger.error(error_message)
             raise MappingError(error_message)
 
+    def to_row(self, domain_obj: Union[WeatherDomain, WeatherRecord]) -> dict:
+        """Maps data from a WeatherDomain object to a plain row of the weather
+        table, for the inserts that need no ORM entity."""
+
+        try:
+            return {
+                "timestamp": domain_obj.timestamp,
+                "city": domain_obj.city,
+                "temperature": domain_obj.temperature,
+                "weather_type": domain_obj.weather_type,
+                "sunrise": domain_obj.sunrise,
+                "sunset": domain_obj.sunset,
+            }
+        except AttributeError as e:
+            error_message = f"Error mapping WeatherDomain to a row: {str(e)}"
+            logger.error(error_message)
+            raise MappingError(error_message)
+
     def to_domain(self, entity_obj: WeatherORMModel) -> Union[WeatherDomain, NoReturn]:
         """Maps data from a WeatherORMModel entity to a WeatherDomain object."""
 
         try:
-            payload = {
-                column: getattr(entity_obj, column)
-                for column in entity_obj.__table__.c.keys()
-            }
-            return WeatherDomain(**payload)
+            return WeatherDomain(
+                **{column: getattr(entity_obj, column) for column in self.columns}
+            )
         except Exception as e:
             error_message = f"Error mapping WeatherORMModel to WeatherDomain: {str(e)}"
             logger.error(error_message)
             raise MappingError(error_message)
 
+    def to_domain_many(self, rows: Iterable[Sequence]) -> list[WeatherDomain]:
+        """Maps rows read from the weather table, with the values of `columns`
+        first and in their order, to WeatherDomain objects without validating
+        the values again."""
+
+        construct = WeatherDomain.model_construct
+        try:
+            return [
+                construct(
+                    timestamp=row[0],
+                    city=row[1],
+                    temperature=row[2],
+                    weather_type=row[3],
+                    sunrise=row[4],
+                    sunset=row[5],
+                )
+                for row in rows
+            ]
+        except (IndexError, TypeError) as e:
+            error_message = f"Error mapping rows to WeatherDomain: {str(e)}"
+            logger.error(error_message)
+            raise MappingError(error_message)
+
 
 class TextfileMapper(AbstractDomainEntityMapper[WeatherDomain, TextfileEntity]):
     """TextfileMapper implements the AbstractDomainEntityMapper interface for
@@ -115,20 +393,21 @@ class TextfileMapper(AbstractDomainEntityMapper[WeatherDomain, TextfileEntity]):
     DATE_FORMAT = "%d.%m.%Y"
     TIME_FORMAT = "%H:%M"
 
-    def to_entity(self, domain_obj: WeatherDomain) -> TextfileEntity:
+    def to_entity(
+        self, domain_obj: Union[WeatherDomain, WeatherRecord]
+    ) -> TextfileEntity:
         """Maps data from a WeatherDomain object to a TextfileEntity."""
 
         try:
-            domain_dict = domain_obj.model_dump()
+            timestamp = domain_obj.timestamp
             formatted_string = (
-                f"Date: {domain_dict['timestamp'].date().strftime(self.DATE_FORMAT)}\n"
-                f"Time: {domain_dict['timestamp'].time().strftime(self.TIME_FORMAT)}"
-                f" UTC\n"
-                f"City: {domain_dict['city']}\n"
-                f"Temperature: {domain_dict['temperature']} °C\n"
-                f"Weather type: {domain_dict['weather_type'].value}\n"
-                f"Sunrise: {domain_dict['sunrise'].strftime(self.TIME_FORMAT)} UTC\n"
-                f"Sunset: {domain_dict['sunset'].strftime(self.TIME_FORMAT)} UTC"
+                f"Date: {timestamp.date().strftime(self.DATE_FORMAT)}\n"
+                f"Time: {timestamp.time().strftime(self.TIME_FORMAT)} UTC\n"
+                f"City: {domain_obj.city}\n"
+                f"Temperature: {domain_obj.temperature} °C\n"
+                f"Weather type: {domain_obj.weather_type.value}\n"
+                f"Sunrise: {domain_obj.sunrise.strftime(self.TIME_FORMAT)} UTC\n"
+                f"Sunset: {domain_obj.sunset.strftime(self.TIME_FORMAT)} UTC"
             )
             return TextfileEntity(formatted_string)
         except Exception as e:
@@ -189,20 +468,18 @@ class JsonMapper(AbstractDomainEntityMapper[WeatherDomain, JsonEntity]):
     transforming weather data between the domain model and a JSON file
     entity."""
 
-    def to_entity(self, domain_obj: WeatherDomain) -> JsonEntity:
+    def to_entity(self, domain_obj: Union[WeatherDomain, WeatherRecord]) -> JsonEntity:
         """Maps data from a WeatherDomain object to a JsonEntity."""
 
         try:
-            payload = domain_obj.model_dump()
-
-            formatted_time = payload["timestamp"].isoformat()
-            formatted_sunrise = payload["sunrise"].isoformat()
-            formatted_sunset = payload["sunset"].isoformat()
-            payload["timestamp"] = formatted_time
-            payload["sunrise"] = formatted_sunrise
-            payload["sunset"] = formatted_sunset
-
-            return JsonEntity(payload)
+            return JsonEntity(
+                timestamp=domain_obj.timestamp.isoformat(),
+                city=domain_obj.city,
+                temperature=domain_obj.temperature,
+                weather_type=domain_obj.weather_type,
+                sunrise=domain_obj.sunrise.isoformat(),
+                sunset=domain_obj.sunset.isoformat(),
+            )
         except Exception as e:
             error_message = f"Error mapping WeatherDomain to JsonEntity: {str(e)}"
             logger.error(error_message)
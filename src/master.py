@@ -1,28 +1,41 @@
 import asyncio
-import importlib
+import functools
 import logging
 import sys
+from contextlib import aclosing
 from datetime import datetime
-
-import aiohttp
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, TypeVar, Union
 
 from apiclients.abstractions import APIClientService
+from city_sources.abstractions import AbstractCitySource
+from city_sources.realisations import ModuleCitySource
+from coordinators.abstractions import AbstractShardCoordinator
 from exceptions import (
     ApiClientError,
     CitiesRetrievalError,
+    CollectionCycleError,
+    CoordinationError,
     InvalidDesignationError,
     MappingError,
     WeatherDataError,
     WeatherFetchingError,
     WeatherParsingError,
 )
-from mappers.abstractions import AbstractDTOMapper
-from models.domains import WeatherDomain
+from fetch_engines.abstractions import AbstractFetchEngine
+from mappers.abstractions import AbstractWeatherDTOMapper
+from models.batches import WeatherBatch
+from models.domains import CityRecord
 from models.dto import JsonOpenweathermapResponseDTO
+from models.results import RunSummary
+from observation_indexes.abstractions import AbstractObservationIndex
+from pipelines.abstractions import AbstractPipeline
+from schedulers.abstractions import AbstractPollingScheduler
 from storage_services.manager import StorageServiceManager
 
 logger = logging.getLogger("app.master")
 
+T = TypeVar("T")
+
 
 class MasterService:
     """MasterService coordinates the weather data retrieval and storage process."""
@@ -30,56 +43,316 @@ class MasterService:
     def __init__(
         self,
         weather_client: APIClientService,
-        client_storage_mapper: AbstractDTOMapper,
+        fetch_engine: AbstractFetchEngine,
+        client_storage_mapper: AbstractWeatherDTOMapper,
         storage_services_manager: StorageServiceManager,
+        interval: float = 600.0,
+        partial_success: bool = False,
+        streaming_pipeline: Optional[AbstractPipeline] = None,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        coordinator: Optional[AbstractShardCoordinator] = None,
+        city_source: Optional[AbstractCitySource] = None,
+        scheduler: Optional[AbstractPollingScheduler] = None,
+        observation_index: Optional[AbstractObservationIndex] = None,
     ):
         self.weather_client = weather_client
+        self.fetch_engine = fetch_engine
         self.client_storage_mapper = client_storage_mapper
         self.storage_services_manager = storage_services_manager
+        self.interval = interval
+        self.partial_success = partial_success
+        self.streaming_pipeline = streaming_pipeline
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.coordinator = coordinator
+        self.city_source = (
+            city_source if city_source is not None else ModuleCitySource()
+        )
+        self.scheduler = scheduler
+        self.observation_index = observation_index
+
+        self._stop_event = asyncio.Event()
 
     async def start(self) -> None:
         """Initiates the weather data retrieval and storage process."""
 
         try:
-            logger.info("Fetching top cities...")
-            cities = self.get_top_cities()
-        except CitiesRetrievalError as e:
-            logger.error(f"Error retrieving top cities: {e}")
+            await self.run_cycle()
+        except CollectionCycleError:
             sys.exit(1)
-        except Exception as e:
-            logger.error(
-                f"An unexpected error occurred while retrieving top cities: {e}"
+
+    async def run_forever(self) -> None:
+        """Runs collection cycles on a fixed interval until stop() is called.
+
+        Ticks are scheduled against the loop clock, so the interval does not
+        drift by the duration of each cycle. When a cycle overruns one or more
+        ticks, the missed ticks are skipped instead of being run back-to-back.
+        When a scheduler is set, each city is polled on its own interval
+        instead.
+        """
+
+        if self.scheduler is not None:
+            await self._run_scheduled_forever()
+            return
+
+        self._stop_event.clear()
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+
+        while not self._stop_event.is_set():
+            try:
+                await self.run_cycle()
+            except CollectionCycleError as e:
+                logger.error(f"Collection cycle failed: {e}")
+
+            now = loop.time()
+            next_tick += self.interval
+            if now > next_tick:
+                skipped = int((now - next_tick) // self.interval) + 1
+                next_tick += skipped * self.interval
+                logger.warning(
+                    f"Collection cycle overran the interval, "
+                    f"skipping {skipped} tick(s)"
+                )
+
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=next_tick - now)
+            except asyncio.TimeoutError:
+                pass
+
+        logger.info("Collector daemon stopped.")
+
+    async def _run_scheduled_forever(self) -> None:
+        """Every scheduler tick, collects the cities that are due and schedules
+        their next poll. The city list is read again every interval seconds."""
+
+        if self.coordinator is not None:
+            logger.warning(
+                "Shard coordination is not used when the cities are scheduled"
+            )
+
+        self._stop_event.clear()
+        loop = asyncio.get_running_loop()
+        next_sync = loop.time()
+
+        while not self._stop_event.is_set():
+            if loop.time() >= next_sync:
+                try:
+                    await self.scheduler.sync(self.iter_city_records())
+                except CitiesRetrievalError as e:
+                    logger.error(f"Error retrieving the cities: {e}")
+                next_sync = loop.time() + self.interval
+
+            cities = self.scheduler.pop_due()
+            if cities:
+                try:
+                    await self.run_cycle(cities=cities)
+                except CollectionCycleError as e:
+                    logger.error(f"Collection cycle failed: {e}")
+                await self.scheduler.reschedule(cities)
+
+            try:
+                await asyncio.wait_for(
+                    self._stop_event.wait(), timeout=self.scheduler.tick
+                )
+            except asyncio.TimeoutError:
+                pass
+
+        logger.info("Collector daemon stopped.")
+
+    def stop(self) -> None:
+        """Requests the daemon loop to stop after the current cycle."""
+        logger.info("Stop requested, finishing the current cycle...")
+        self._stop_event.set()
+
+    async def run_cycle(self, cities: Optional[Iterable[str]] = None) -> RunSummary:
+        """Runs one weather data retrieval and storage cycle.
+
+        In partial success mode the cities that failed to be fetched or mapped
+        are recorded in the summary and the rest of them are still stored.
+        Otherwise the first failure aborts the cycle. When a streaming pipeline
+        is set, the stages run concurrently through it. When a coordinator is
+        set, only the shards claimed from it are collected. While the weather
+        client reports the API as unavailable, the cycle is skipped. When an
+        observation index is set, the cities whose observation was already
+        stored are skipped and counted as suppressed in the summary.
+
+        Args:
+            cities: The cities to collect instead of the ones of the city
+            source. The coordinator is not used for them.
+
+        Raises:
+            CollectionCycleError: If any stage of the cycle fails, or, in
+            partial success mode, if no city succeeded.
+        """
+
+        summary = RunSummary()
+        collected_summary = summary if self.partial_success else None
+
+        if not self.weather_client.is_available():
+            logger.warning(
+                "Weather API is unavailable (circuit breaker is open), "
+                "skipping the cycle"
+            )
+            return summary
+
+        if cities is None:
+            logger.info(
+                f"Streaming cities from {self.city_source.__class__.__name__}..."
+            )
+        else:
+            cities = list(cities)
+            logger.info(f"Collecting {len(cities)} scheduled cities...")
+
+        retries_before = self.weather_client.metrics().get("retries_total", 0)
+        try:
+            if cities is None and self.coordinator is not None:
+                await self._run_coordinated_stages(summary=summary)
+            else:
+                await self._run_stages(
+                    cities=self.iter_cities() if cities is None else cities,
+                    summary=summary,
+                    collected_summary=collected_summary,
+                )
+        finally:
+            summary.retried = (
+                self.weather_client.metrics().get("retries_total", 0) - retries_before
+            )
+            if summary.failed:
+                logger.warning(f"Failed cities: {summary.failures}")
+
+        logger.info(f"Run summary: {summary}")
+        return summary
+
+    async def _run_stages(
+        self,
+        cities: Union[Iterable[str], AsyncIterable[str]],
+        summary: RunSummary,
+        collected_summary: Optional[RunSummary],
+    ) -> None:
+        if self.streaming_pipeline is not None:
+            await self._run_streaming_stages(
+                cities=cities, summary=summary, collected_summary=collected_summary
             )
-            sys.exit(1)
         else:
-            logger.info("Top cities fetched successfully!")
+            await self._run_sequential_stages(
+                cities=cities, summary=summary, collected_summary=collected_summary
+            )
+
+    async def _run_coordinated_stages(self, summary: RunSummary) -> None:
+        """Claims due shards of the cities from the coordinator one at a time
+        and runs the stages for each of them, until no shard is left.
+
+        The coordinator shards the whole city source, so the shard_index and
+        shard_count of this service, e.g. of a worker process, are not applied
+        on top of it: every node collects every city of the shards it claims.
+
+        The lease of a shard is kept while the shard is collected. A shard that
+        fails is released, so another node can collect it, counted in the
+        summary and not claimed again by this node in this run.
+
+        Raises:
+            CollectionCycleError: If the shards cannot be coordinated, or if
+            every claimed shard failed.
+        """
+
+        shard_count = self.coordinator.shard_count
+        failed_shards: list[int] = []
+        collected_shards = 0
+        try:
+            while (
+                shard_index := await self.coordinator.claim(exclude=failed_shards)
+            ) is not None:
+                shard_summary = RunSummary()
+                try:
+                    async with self.coordinator.lease(shard_index):
+                        await self._run_stages(
+                            cities=self.select_shard(
+                                cities=self.iter_source_cities(),
+                                shard_index=shard_index,
+                                shard_count=shard_count,
+                            ),
+                            summary=shard_summary,
+                            collected_summary=(
+                                shard_summary if self.partial_success else None
+                            ),
+                        )
+                except CollectionCycleError as e:
+                    logger.error(
+                        f"Shard {shard_index + 1}/{shard_count} failed "
+                        f"and was released: {e}"
+                    )
+                    failed_shards.append(shard_index)
+                    shard_summary.failed_shards += 1
+                else:
+                    collected_shards += 1
+                summary.merge(shard_summary)
+        except CoordinationError as e:
+            logger.error(f"An error occurred while coordinating the shards: {e}")
+            raise CollectionCycleError(str(e)) from e
+
+        if failed_shards and not collected_shards:
+            error_message = f"No shard succeeded in this cycle: {summary}"
+            logger.error(error_message)
+            raise CollectionCycleError(error_message)
+
+    async def _run_sequential_stages(
+        self,
+        cities: Union[Iterable[str], AsyncIterable[str]],
+        summary: RunSummary,
+        collected_summary: Optional[RunSummary],
+    ) -> None:
+        """Fetches, converts and saves the data of all the cities, each stage
+        starting when the previous one has finished."""
 
         try:
             logger.info("Retrieving weather data...")
-            dto_list = await self.get_weather_data(cities)
+            dto_list = await self.get_weather_data(cities, summary=collected_summary)
+        except CitiesRetrievalError as e:
+            logger.error(f"Error retrieving the cities: {e}")
+            raise CollectionCycleError(str(e)) from e
         except (WeatherFetchingError, WeatherParsingError, WeatherDataError) as e:
             logger.error(f"An error occurred while retrieving weather data: {e}")
-            sys.exit(1)
+            raise CollectionCycleError(str(e)) from e
         except ApiClientError as e:
             logger.error(
                 f"An unexpected error occurred while retrieving weather data: {e}"
             )
-            sys.exit(1)
+            raise CollectionCycleError(str(e)) from e
         else:
             logger.info("Weather data retrieved successfully!")
 
+        if self.observation_index is not None:
+            dto_list = [
+                dto
+                for dto in dto_list
+                if self._is_new_observation(dto=dto, summary=summary)
+            ]
+
         try:
             logger.info("Converting data to domain model...")
-            weather_list = self.convert_data(data_list=dto_list)
+            weather_list = self.convert_data(
+                data_list=dto_list, summary=collected_summary
+            )
         except MappingError as e:
             logger.error(f"Error occurred while converting data to domain model: {e}")
-            sys.exit(1)
+            raise CollectionCycleError(str(e)) from e
         except Exception as e:
             logger.error(f"An unexpected error occurred while converting data: {e}")
-            sys.exit(1)
+            raise CollectionCycleError(str(e)) from e
         else:
             logger.info("Data converted to domain model successfully!")
 
+        summary.ok = len(weather_list)
+        if not weather_list and summary.failed and not summary.suppressed:
+            error_message = f"No city succeeded in this cycle: {summary}"
+            logger.error(error_message)
+            raise CollectionCycleError(error_message)
+        if not weather_list:
+            logger.info("No weather data to save.")
+            return
+
         try:
             logger.info("Saving data...")
             await self.save_data(data_weather_list=weather_list)
@@ -88,66 +361,164 @@ class MasterService:
                 f"Invalid designation for the save service. "
                 f"Check the designations and try again: {e}"
             )
-            sys.exit(1)
+            raise CollectionCycleError(str(e)) from e
         except Exception as e:
             logger.error(f"An unexpected error occurred while saving data: {e}")
-            sys.exit(1)
+            raise CollectionCycleError(str(e)) from e
         else:
             logger.info("Data saved successfully!")
 
-    @staticmethod
-    def get_top_cities() -> tuple[str]:
-        """Retrieves the top cities list."""
+    async def _run_streaming_stages(
+        self,
+        cities: Union[Iterable[str], AsyncIterable[str]],
+        summary: RunSummary,
+        collected_summary: Optional[RunSummary],
+    ) -> None:
+        """Streams the data of the cities through the fetch, convert and save
+        stages of the streaming pipeline, which run concurrently."""
+
         try:
-            module = importlib.import_module("top_cities")
-            return getattr(module, "cities_tuple")
-        except ImportError as e:
-            error_message = f"Error importing module: {e}"
-            logger.error(error_message)
-            raise CitiesRetrievalError(error_message)
-        except AttributeError as e:
-            error_message = f"Error accessing attribute 'cities_tuple': {e}"
-            logger.error(error_message)
-            raise CitiesRetrievalError(error_message)
-        except Exception as e:
-            error_message = (
-                f"An unexpected error occurred while retrieving top cities {e}"
+            logger.info("Streaming weather data through the pipeline...")
+            summary.ok = await self.streaming_pipeline.run(
+                cities=cities,
+                timestamp=datetime.utcnow(),
+                store=self.save_data,
+                summary=collected_summary,
+                accept=(
+                    None
+                    if self.observation_index is None
+                    else functools.partial(self._is_new_observation, summary=summary)
+                ),
+            )
+        except CitiesRetrievalError as e:
+            logger.error(f"Error retrieving the cities: {e}")
+            raise CollectionCycleError(str(e)) from e
+        except ApiClientError as e:
+            logger.error(f"An error occurred while retrieving weather data: {e}")
+            raise CollectionCycleError(str(e)) from e
+        except MappingError as e:
+            logger.error(f"Error occurred while converting data to domain model: {e}")
+            raise CollectionCycleError(str(e)) from e
+        except InvalidDesignationError as e:
+            logger.error(
+                f"Invalid designation for the save service. "
+                f"Check the designations and try again: {e}"
             )
+            raise CollectionCycleError(str(e)) from e
+        except Exception as e:
+            logger.error(f"An unexpected error occurred in the pipeline: {e}")
+            raise CollectionCycleError(str(e)) from e
+
+        if not summary.ok and summary.failed and not summary.suppressed:
+            error_message = f"No city succeeded in this cycle: {summary}"
             logger.error(error_message)
-            raise RuntimeError(error_message)
+            raise CollectionCycleError(error_message)
+        logger.info("Data streamed and saved successfully!")
+
+    async def iter_cities(self) -> AsyncIterator[str]:
+        """Streams the names of the cities this service collects from the city
+        source. With shard_count > 1 only the cities of shard shard_index are
+        streamed."""
+        async with aclosing(self.iter_city_records()) as records:
+            async for record in records:
+                yield record.name
+
+    async def iter_source_cities(self) -> AsyncIterator[str]:
+        """Streams the names of all the cities of the city source, whatever the
+        shard of this service."""
+        async with aclosing(self.city_source.iter_cities()) as records:
+            async for record in records:
+                yield record.name
+
+    async def iter_city_records(self) -> AsyncIterator[CityRecord]:
+        """Streams the records of the cities this service collects from the
+        city source, like iter_cities."""
+        async with aclosing(self.city_source.iter_cities()) as records:
+            async for record in self.select_shard(
+                cities=records,
+                shard_index=self.shard_index,
+                shard_count=self.shard_count,
+            ):
+                yield record
+
+    @staticmethod
+    async def select_shard(
+        cities: AsyncIterable[T], shard_index: int, shard_count: int
+    ) -> AsyncIterator[T]:
+        """Streams every shard_count-th city starting from shard_index."""
+        index = 0
+        async for city in cities:
+            if index % shard_count == shard_index:
+                yield city
+            index += 1
 
     async def get_weather_data(
-        self, cities: tuple[str]
+        self,
+        cities: Union[Iterable[str], AsyncIterable[str]],
+        summary: Optional[RunSummary] = None,
     ) -> list[JsonOpenweathermapResponseDTO]:
-        """Retrieves weather data for the specified cities."""
+        """Retrieves weather data for the specified cities.
+
+        Without a summary the first failed city raises its error. With a
+        summary the failures are recorded in it and the successful DTOs are
+        returned.
+        """
 
         timestamp = datetime.utcnow()
-        async with aiohttp.ClientSession() as session_http:
-            tasks = []
-            for city in cities:
-                task = asyncio.create_task(
-                    self.weather_client.get(
-                        session=session_http, city=city, timestamp=timestamp
-                    )
-                )
-                logger.debug(f"Task created for city: {city}")
-                tasks.append(task)
+        dto_list = []
+        total_latency = 0.0
+        max_latency = 0.0
 
-            logger.debug("Starting handling tasks concurrently...")
-            dto_list = await asyncio.gather(*tasks)
-            logger.debug("All tasks handled!")
-            return dto_list
+        logger.debug("Starting handling cities with the fetch engine...")
+        async with aclosing(
+            self.fetch_engine.fetch(cities=cities, timestamp=timestamp)
+        ) as results:
+            async for result in results:
+                if not result.ok:
+                    if summary is None:
+                        raise result.error
+                    summary.add_failure(city=result.city, error=result.error)
+                    continue
+                dto_list.append(result.dto)
+                total_latency += result.latency
+                max_latency = max(max_latency, result.latency)
+
+        if dto_list:
+            logger.info(
+                f"Fetched {len(dto_list)} cities, latency per city: "
+                f"avg {total_latency / len(dto_list) * 1000:.1f} ms, "
+                f"max {max_latency * 1000:.1f} ms"
+            )
+        metrics = self.weather_client.metrics()
+        if metrics:
+            logger.info(f"Weather client metrics: {metrics}")
+        logger.debug("All cities handled!")
+        return dto_list
 
     def convert_data(
-        self, data_list: list[JsonOpenweathermapResponseDTO]
-    ) -> list[WeatherDomain]:
-        """Converts data from DTO to the domain model."""
-        return [
-            self.client_storage_mapper.to_target(source_obj=data) for data in data_list
-        ]
+        self,
+        data_list: list[JsonOpenweathermapResponseDTO],
+        summary: Optional[RunSummary] = None,
+    ) -> WeatherBatch:
+        """Converts data from DTO to a batch of the domain model.
+
+        Without a summary the first mapping error is raised. With a summary the
+        DTOs that cannot be mapped are recorded in it and skipped.
+        """
+        if summary is None:
+            return self.client_storage_mapper.to_batch(source_objs=data_list)
+
+        return self.client_storage_mapper.to_batch(
+            source_objs=data_list,
+            on_error=lambda data, e: summary.add_failure(
+                city=data.get("name", "<unknown>"), error=e
+            ),
+        )
 
-    async def save_data(self, data_weather_list: list[WeatherDomain]) -> None:
-        """Saves the weather data to storage services."""
+    async def save_data(self, data_weather_list: WeatherBatch) -> None:
+        """Saves the weather data to storage services. When an observation
+        index is set, the observations of the objects all the services stored
+        are committed to it."""
 
         tasks = []
         for (
@@ -164,5 +535,38 @@ class MasterService:
             tasks.append(task)
 
         logger.debug("Starting handling tasks concurrently...")
-        await asyncio.gather(*tasks)
+        stored_counts = await asyncio.gather(*tasks)
         logger.debug("All tasks handled!")
+
+        if self.observation_index is not None:
+            # Only the objects stored by every service count as stored, so the
+            # observations of a failed write are collected again next time
+            stored = min(stored_counts, default=len(data_weather_list))
+            if stored < len(data_weather_list):
+                logger.warning(
+                    f"{len(data_weather_list) - stored} object(s) were not stored "
+                    f"by every storage service, their observations are kept new"
+                )
+            self.observation_index.commit(
+                cities=data_weather_list[:stored].iter_cities()
+            )
+
+    def _is_new_observation(
+        self, dto: JsonOpenweathermapResponseDTO, summary: RunSummary
+    ) -> bool:
+        """Tells whether the observation of the DTO was not stored yet, counting
+        it as suppressed in the summary otherwise. DTOs without a city name or
+        an observation time are always new."""
+
+        city = dto.get("name")
+        observed_at = dto.get("dt")
+        if (
+            city is None
+            or observed_at is None
+            or self.observation_index.is_new(city=city, observed_at=observed_at)
+        ):
+            return True
+
+        logger.debug(f"Observation of {city} at {observed_at} is unchanged")
+        summary.suppressed += 1
+        return False
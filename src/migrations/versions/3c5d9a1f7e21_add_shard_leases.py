@@ -0,0 +1,33 @@
+"""add shard leases
+
+Revision ID: 3c5d9a1f7e21
+Revises: b68112f6a787
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c5d9a1f7e21"
+down_revision: Union[str, None] = "b68112f6a787"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shard_leases",
+        sa.Column("shard_index", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("owner", sa.String(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("shard_index"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("shard_leases")
@@ -0,0 +1,27 @@
+"""add weather city timestamp index
+
+Revision ID: 5b9e13c8a4f0
+Revises: 8e2f47b0c6d3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b9e13c8a4f0"
+down_revision: Union[str, None] = "8e2f47b0c6d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_weather_table_city_timestamp", "weather_table", ["city", "timestamp"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weather_table_city_timestamp", table_name="weather_table")
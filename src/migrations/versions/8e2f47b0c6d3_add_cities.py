@@ -0,0 +1,39 @@
+"""add cities
+
+Revision ID: 8e2f47b0c6d3
+Revises: 3c5d9a1f7e21
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e2f47b0c6d3"
+down_revision: Union[str, None] = "3c5d9a1f7e21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cities",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("enabled", sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column("priority", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("poll_interval", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index(
+        "ix_cities_priority_id", "cities", [sa.text("priority DESC"), "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cities_priority_id", table_name="cities")
+    op.drop_table("cities")
@@ -0,0 +1,27 @@
+"""add weather timestamp id index
+
+Revision ID: d41a7c2e9b56
+Revises: 5b9e13c8a4f0
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d41a7c2e9b56"
+down_revision: Union[str, None] = "5b9e13c8a4f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_weather_table_timestamp_id", "weather_table", ["timestamp", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weather_table_timestamp_id", table_name="weather_table")
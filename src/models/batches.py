@@ -0,0 +1,266 @@
+from array import array
+from datetime import datetime, time, timedelta
+from typing import Iterable, Iterator, Sequence, Union, overload
+
+from models.domains import (
+    Celsius,
+    WeatherDomain,
+    WeatherRecord,
+    WeatherTypeOpenweathermap,
+)
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_WEATHER_TYPES = tuple(WeatherTypeOpenweathermap)
+_WEATHER_TYPE_CODES = {
+    weather_type: code for code, weather_type in enumerate(_WEATHER_TYPES)
+}
+
+_COLUMNS = (
+    "timestamps",
+    "city_ids",
+    "temperatures",
+    "weather_type_codes",
+    "sunrises",
+    "sunsets",
+)
+
+
+class WeatherBatch(Sequence[WeatherDomain]):
+    """
+    A batch of weather rows stored column by column in typed arrays.
+
+    The timestamps are kept as microseconds since 1970-01-01 and the sunrise
+    and sunset times as microseconds since midnight, so they must be naive, as
+    the collector keeps UTC times without a timezone. The cities are
+    dictionary-encoded: `city_ids` index `cities`. The weather types are
+    stored as the indexes of the WeatherTypeOpenweathermap members.
+
+    A row takes about 37 bytes. The WeatherDomain objects are only built when
+    the batch is indexed or iterated, and iter_rows reads the rows as
+    WeatherRecord tuples without building them. The columns support the buffer
+    protocol, so e.g. numpy.frombuffer can read them without a copy.
+    """
+
+    __slots__ = _COLUMNS + ("cities", "_city_ids")
+
+    def __init__(self, data_list: Iterable[Union[WeatherDomain, WeatherRecord]] = ()):
+        self.timestamps = array("q")
+        self.city_ids = array("I")
+        self.temperatures = array("i")
+        self.weather_type_codes = array("B")
+        self.sunrises = array("q")
+        self.sunsets = array("q")
+        self.cities: list[str] = []
+        self._city_ids: dict[str, int] = {}
+        self.extend(data_list)
+
+    @classmethod
+    def from_columns(
+        cls,
+        timestamps: Iterable[datetime],
+        cities: Iterable[str],
+        temperatures: Iterable[Celsius],
+        weather_types: Iterable[WeatherTypeOpenweathermap],
+        sunrises: Iterable[time],
+        sunsets: Iterable[time],
+    ) -> "WeatherBatch":
+        """Builds a batch from the columns of trusted, already validated
+        values, e.g. the ones a mapper converted in bulk."""
+
+        batch = cls()
+        batch.timestamps.extend(_encode(timestamps, _encode_timestamp))
+        batch.city_ids.extend(batch._get_city_id(city) for city in cities)
+        batch.temperatures.extend(temperatures)
+        batch.weather_type_codes.extend(
+            _WEATHER_TYPE_CODES[weather_type] for weather_type in weather_types
+        )
+        batch.sunrises.extend(_encode(sunrises, _encode_time))
+        batch.sunsets.extend(_encode(sunsets, _encode_time))
+
+        if len({len(getattr(batch, name)) for name in _COLUMNS}) > 1:
+            raise ValueError("The columns of a batch must have the same length")
+        return batch
+
+    def append(self, data: Union[WeatherDomain, WeatherRecord]) -> None:
+        self.timestamps.append(_encode_timestamp(data.timestamp))
+        self.city_ids.append(self._get_city_id(data.city))
+        self.temperatures.append(data.temperature)
+        self.weather_type_codes.append(_WEATHER_TYPE_CODES[data.weather_type])
+        self.sunrises.append(_encode_time(data.sunrise))
+        self.sunsets.append(_encode_time(data.sunset))
+
+    def extend(self, data_list: Iterable[Union[WeatherDomain, WeatherRecord]]) -> None:
+        if isinstance(data_list, WeatherBatch):
+            city_ids = [self._get_city_id(city) for city in data_list.cities]
+            self.timestamps.extend(data_list.timestamps)
+            self.city_ids.extend(city_ids[city_id] for city_id in data_list.city_ids)
+            self.temperatures.extend(data_list.temperatures)
+            self.weather_type_codes.extend(data_list.weather_type_codes)
+            self.sunrises.extend(data_list.sunrises)
+            self.sunsets.extend(data_list.sunsets)
+            return
+
+        for data in data_list:
+            self.append(data)
+
+    def take(self, indexes: Iterable[int]) -> "WeatherBatch":
+        """Returns a new batch of the rows at the indexes, in their order."""
+        indexes = list(indexes)
+        batch = self._empty_copy()
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            getattr(batch, name).extend(column[index] for index in indexes)
+        return batch
+
+    def iter_rows(self) -> Iterator[WeatherRecord]:
+        """Yields the rows as WeatherRecord tuples, without building
+        WeatherDomain objects."""
+
+        make_record = WeatherRecord._make
+        timestamps: dict[int, datetime] = {}
+        times: dict[int, time] = {}
+        for timestamp, city_id, temperature, code, sunrise, sunset in zip(
+            self.timestamps,
+            self.city_ids,
+            self.temperatures,
+            self.weather_type_codes,
+            self.sunrises,
+            self.sunsets,
+        ):
+            yield make_record(
+                (
+                    _decode(timestamp, timestamps, _decode_timestamp),
+                    self.cities[city_id],
+                    temperature,
+                    _WEATHER_TYPES[code],
+                    _decode(sunrise, times, _decode_time),
+                    _decode(sunset, times, _decode_time),
+                )
+            )
+
+    def iter_cities(self) -> Iterator[str]:
+        """Yields the city of every row."""
+        cities = self.cities
+        return (cities[city_id] for city_id in self.city_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the columns in bytes, without the city dictionary."""
+        return sum(
+            len(column) * column.itemsize
+            for column in (getattr(self, name) for name in _COLUMNS)
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> WeatherDomain:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "WeatherBatch":
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[WeatherDomain, "WeatherBatch"]:
+        if isinstance(index, slice):
+            batch = self._empty_copy()
+            for name in _COLUMNS:
+                setattr(batch, name, getattr(self, name)[index])
+            return batch
+
+        return WeatherDomain.model_construct(
+            timestamp=_decode_timestamp(self.timestamps[index]),
+            city=self.cities[self.city_ids[index]],
+            temperature=self.temperatures[index],
+            weather_type=_WEATHER_TYPES[self.weather_type_codes[index]],
+            sunrise=_decode_time(self.sunrises[index]),
+            sunset=_decode_time(self.sunsets[index]),
+        )
+
+    def __iter__(self) -> Iterator[WeatherDomain]:
+        construct = WeatherDomain.model_construct
+        for (
+            timestamp,
+            city,
+            temperature,
+            weather_type,
+            sunrise,
+            sunset,
+        ) in self.iter_rows():
+            yield construct(
+                timestamp=timestamp,
+                city=city,
+                temperature=temperature,
+                weather_type=weather_type,
+                sunrise=sunrise,
+                sunset=sunset,
+            )
+
+    def __repr__(self) -> str:
+        return f"WeatherBatch({len(self)} rows, {len(self.cities)} cities)"
+
+    def _empty_copy(self) -> "WeatherBatch":
+        """Returns an empty batch sharing no state with this one but its city
+        dictionary, copied so the city ids of the rows stay valid."""
+        batch = WeatherBatch()
+        batch.cities = self.cities.copy()
+        batch._city_ids = self._city_ids.copy()
+        return batch
+
+    def _get_city_id(self, city: str) -> int:
+        city_id = self._city_ids.get(city)
+        if city_id is None:
+            city_id = len(self.cities)
+            self._city_ids[city] = city_id
+            self.cities.append(city)
+        return city_id
+
+
+def _encode_timestamp(timestamp: datetime) -> int:
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def _decode_timestamp(microseconds: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=microseconds)
+
+
+def _encode_time(value: time) -> int:
+    seconds = (value.hour * 60 + value.minute) * 60 + value.second
+    return seconds * 1_000_000 + value.microsecond
+
+
+def _decode_time(microseconds: int) -> time:
+    seconds, microsecond = divmod(microseconds, 1_000_000)
+    minutes, second = divmod(seconds, 60)
+    return time(*divmod(minutes, 60), second, microsecond)
+
+
+def _encode(values: Iterable, encode) -> Iterator[int]:
+    """Encodes the values, once per distinct value."""
+    encoded = {}
+    for value in values:
+        code = encoded.get(value)
+        if code is None:
+            code = encoded[value] = encode(value)
+        yield code
+
+
+def _decode(code: int, decoded: dict, decode):
+    value = decoded.get(code)
+    if value is None:
+        value = decoded[code] = decode(code)
+    return value
+
+
+def iter_records(
+    data_list: Iterable[Union[WeatherDomain, WeatherRecord]]
+) -> Iterable[Union[WeatherDomain, WeatherRecord]]:
+    """Reads a WeatherBatch as WeatherRecord rows and any other data as it is,
+    for the consumers that only read the attributes of the rows."""
+    if isinstance(data_list, WeatherBatch):
+        return data_list.iter_rows()
+    return data_list
@@ -1,6 +1,6 @@
 from datetime import datetime, time
 from enum import Enum
-from typing import TypeAlias
+from typing import NamedTuple, Optional, TypeAlias
 
 from pydantic import BaseModel
 
@@ -33,3 +33,52 @@ class WeatherDomain(BaseModel):
     weather_type: WeatherTypeOpenweathermap
     sunrise: time
     sunset: time
+
+
+class WeatherRecord(NamedTuple):
+    """A lightweight, immutable weather row with the fields of WeatherDomain,
+    used on the hot paths between the collection stages. It is converted to
+    and from WeatherDomain only at the edges."""
+
+    timestamp: datetime
+    city: str
+    temperature: Celsius
+    weather_type: WeatherTypeOpenweathermap
+    sunrise: time
+    sunset: time
+
+    @classmethod
+    def from_domain(cls, domain: WeatherDomain) -> "WeatherRecord":
+        return cls(
+            domain.timestamp,
+            domain.city,
+            domain.temperature,
+            domain.weather_type,
+            domain.sunrise,
+            domain.sunset,
+        )
+
+    def to_domain(self) -> WeatherDomain:
+        """Builds the WeatherDomain without validating the values again."""
+        return WeatherDomain.model_construct(**self._asdict())
+
+
+class CityLocation(NamedTuple):
+    """Provider-side identity of a city, as resolved from an earlier response.
+    `name` is the city name the provider returned, under which the weather of
+    the city is stored."""
+
+    id: int
+    lat: float
+    lon: float
+    resolved_at: float
+    name: Optional[str] = None
+
+
+class CityRecord(NamedTuple):
+    """A city of the city list with its collection settings."""
+
+    name: str
+    enabled: bool = True
+    priority: int = 0
+    poll_interval: Optional[float] = None
@@ -1,11 +1,12 @@
 import os
 import sys
 from datetime import datetime, time
+from typing import Optional
 
 parent_directory = os.path.join(os.getcwd(), "..")
 sys.path.append(parent_directory)
 
-from sqlalchemy import UniqueConstraint  # noqa
+from sqlalchemy import DateTime, Index, UniqueConstraint, true  # noqa
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column  # noqa
 
 from database.db import Base  # noqa
@@ -24,7 +25,40 @@ class WeatherORMModel(Base):
     sunset: Mapped[time]
 
     # UniqueConstraint на комбинацию столбцов timestamp и city
-    __table_args__ = (UniqueConstraint("timestamp", "city", name="uq_timestamp_city"),)
+    __table_args__ = (
+        UniqueConstraint("timestamp", "city", name="uq_timestamp_city"),
+        Index("ix_weather_table_city_timestamp", "city", "timestamp"),
+        Index("ix_weather_table_timestamp_id", "timestamp", "id"),
+    )
+
+
+class CityORMModel(Base):
+    """A city of the city list and its collection settings."""
+
+    __tablename__ = "cities"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(unique=True)
+    enabled: Mapped[bool] = mapped_column(default=True, server_default=true())
+    priority: Mapped[int] = mapped_column(default=0, server_default="0")
+    poll_interval: Mapped[Optional[float]]
+
+    __table_args__ = (Index("ix_cities_priority_id", priority.desc(), id),)
+
+
+class ShardLeaseORMModel(Base):
+    """A shard of the city list and the lease of the node collecting it.
+
+    `owner` and `expires_at` are set while a node holds the lease, and
+    `completed_at` is the time the shard was last collected completely.
+    """
+
+    __tablename__ = "shard_leases"
+
+    shard_index: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    owner: Mapped[Optional[str]]
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
 
 class TextfileEntity(str):
@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from models.dto import JsonOpenweathermapResponseDTO
+
+
+@dataclass(slots=True)
+class FetchResult:
+    """
+    Outcome of fetching the weather data for a single city.
+
+    Exactly one of `dto` and `error` is set. `latency` is the wall-clock time
+    in seconds spent in the API client for this city.
+    """
+
+    city: str
+    dto: Optional[JsonOpenweathermapResponseDTO] = None
+    error: Optional[Exception] = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(slots=True)
+class RunSummary:
+    """
+    Summary of one collection run.
+
+    `ok` counts the cities whose data reached the storage stage, `failed` the
+    cities lost at the fetch or mapping stage, `suppressed` the cities skipped
+    because their observation was already stored, and `retried` the extra
+    requests made by the API client. `failures` maps every failed city to the
+    class name of its error. `failed_shards` counts the shards of a
+    coordinated run that failed and were released to be collected again.
+    """
+
+    ok: int = 0
+    failed: int = 0
+    suppressed: int = 0
+    retried: int = 0
+    failures: dict[str, str] = field(default_factory=dict)
+    failed_shards: int = 0
+
+    def add_failure(self, city: str, error: Exception) -> None:
+        self.failed += 1
+        self.failures[city] = type(error).__name__
+
+    def merge(self, other: "RunSummary") -> None:
+        """Adds the counters and the failures of another summary, e.g. of
+        another shard of the same run."""
+        self.ok += other.ok
+        self.failed += other.failed
+        self.suppressed += other.suppressed
+        self.retried += other.retried
+        self.failures.update(other.failures)
+        self.failed_shards += other.failed_shards
+
+    def __str__(self) -> str:
+        res = (
+            f"{self.ok} ok, {self.failed} failed, {self.suppressed} unchanged, "
+            f"{self.retried} retried"
+        )
+        if self.failed_shards:
+            res += f", {self.failed_shards} shard(s) failed"
+        return res
+
+
+@dataclass(slots=True)
+class IngestResult:
+    """
+    Outcome of adding a batch of rows to the database.
+
+    `inserted` counts the new rows, `updated` the existing rows overwritten by
+    the batch, and `skipped` the rows of the batch that were already stored.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+    def merge(self, other: "IngestResult") -> None:
+        """Adds the counters of another result, e.g. of another chunk."""
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+
+    def __str__(self) -> str:
+        return (
+            f"{self.inserted} inserted, {self.updated} updated, "
+            f"{self.skipped} skipped"
+        )
@@ -0,0 +1,67 @@
+"""Typed structs the msgspec decoder decodes OpenWeatherMap responses into.
+
+They hold only the fields the mappers and the API clients read, and support
+the item access of a dict, so they can be passed wherever a
+JsonOpenweathermapResponseDTO is expected. The module requires msgspec.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+import msgspec
+
+
+class DictLikeStruct(msgspec.Struct):
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__struct_fields__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> tuple:
+        return self.__struct_fields__
+
+    def items(self):
+        return msgspec.to_builtins(self).items()
+
+
+class CoordStruct(DictLikeStruct):
+    lon: float
+    lat: float
+
+
+class MainStruct(DictLikeStruct):
+    temp: float
+
+
+class WeatherTypeStruct(DictLikeStruct):
+    main: str
+
+
+class SysStruct(DictLikeStruct):
+    sunrise: int
+    sunset: int
+
+
+class OpenweathermapWeatherStruct(DictLikeStruct):
+    id: int
+    name: str
+    dt: int
+    coord: CoordStruct
+    main: MainStruct
+    weather: List[WeatherTypeStruct]
+    sys: SysStruct
+    timestamp: Optional[datetime] = None
+
+
+class OpenweathermapGroupStruct(DictLikeStruct):
+    list: List[OpenweathermapWeatherStruct]
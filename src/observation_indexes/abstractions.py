@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+
+class AbstractObservationIndex(ABC):
+    """AbstractObservationIndex is an abstract class providing a base interface
+    for indexes of the last provider observation time (`dt`) stored for each
+    city, used to skip the observations that were already stored."""
+
+    @abstractmethod
+    def is_new(self, city: str, observed_at: int) -> bool:
+        """Abstract method telling whether the observation is newer than the last
+        one stored for the city. A new observation is remembered as pending
+        until commit() is called for its city.
+
+        Args:
+            city (str): The city name as returned by the provider.
+            observed_at (int): The provider observation time, a Unix timestamp.
+        """
+        pass
+
+    @abstractmethod
+    def commit(self, cities: Iterable[str]) -> None:
+        """Abstract method marking the pending observations of the cities as
+        stored."""
+        pass
+
+    def save(self) -> None:
+        """Persists the index. Indexes that live in memory only don't need to
+        override it."""
+        pass
@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from exceptions import FileReadError  # noqa
+from exceptions import FileWriteError  # noqa
+from observation_indexes.abstractions import AbstractObservationIndex  # noqa
+
+logger = logging.getLogger("app.observation_indexes")
+
+
+class InMemoryObservationIndex(AbstractObservationIndex):
+    """
+    InMemoryObservationIndex keeps the last stored observation time of every
+    city for the lifetime of the process.
+
+    An observation only becomes the last stored one on commit(), so the
+    observations of a batch that failed to be saved are not skipped next time.
+    """
+
+    def __init__(self):
+        self._observed_at: Dict[str, int] = {}
+        self._pending: Dict[str, int] = {}
+
+    def is_new(self, city: str, observed_at: int) -> bool:
+        last_observed_at = self._observed_at.get(city)
+        if last_observed_at is not None and observed_at <= last_observed_at:
+            return False
+        self._pending[city] = observed_at
+        return True
+
+    def commit(self, cities: Iterable[str]) -> None:
+        for city in cities:
+            observed_at = self._pending.pop(city, None)
+            if observed_at is not None:
+                self._observed_at[city] = observed_at
+
+    def __len__(self) -> int:
+        return len(self._observed_at)
+
+
+class JsonFileObservationIndex(InMemoryObservationIndex):
+    """
+    JsonFileObservationIndex is an InMemoryObservationIndex persisted to a JSON
+    file, so observations stored before a restart are skipped as well.
+
+    The file is loaded on creation. Changes are written back at most once per
+    `save_interval` seconds on commit, and on save(). Observations saved
+    meanwhile by other processes are merged in, keeping the latest time of
+    each city.
+    """
+
+    def __init__(self, filepath: str, save_interval: float = 30.0):
+        super().__init__()
+        self.filepath = filepath
+        self.save_interval = save_interval
+
+        self._is_dirty = False
+        self._saved_at = time.monotonic()
+        self._observed_at = self._read()
+        logger.debug(
+            f"Loaded the observations of {len(self._observed_at)} cities "
+            f"from {self.filepath}"
+        )
+
+    def _read(self) -> Dict[str, int]:
+        if not os.path.exists(self.filepath):
+            return {}
+
+        try:
+            with open(self.filepath, mode="r", encoding="utf-8") as file:
+                payload = json.load(file)
+            return {city: int(observed_at) for city, observed_at in payload.items()}
+        except (
+            PermissionError,
+            IOError,
+            json.JSONDecodeError,
+            AttributeError,
+            TypeError,
+            ValueError,
+        ) as e:
+            error_message = (
+                f"An error occurred while reading the observation index: {e}"
+            )
+            logger.error(error_message)
+            raise FileReadError(error_message)
+
+    def commit(self, cities: Iterable[str]) -> None:
+        pending_count = len(self._pending)
+        super().commit(cities=cities)
+        if len(self._pending) == pending_count:
+            return
+
+        self._is_dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        if not self._is_dirty:
+            return
+
+        directory = os.path.dirname(self.filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        for city, observed_at in self._read().items():
+            if observed_at > self._observed_at.get(city, observed_at - 1):
+                self._observed_at[city] = observed_at
+
+        tmp_filepath = f"{self.filepath}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_filepath, mode="w", encoding="utf-8") as file:
+                json.dump(self._observed_at, file, ensure_ascii=False)
+            os.replace(tmp_filepath, self.filepath)
+        except (PermissionError, IOError) as e:
+            error_message = (
+                f"An error occurred while writing the observation index: {e}"
+            )
+            logger.error(error_message)
+            raise FileWriteError(error_message)
+
+        self._is_dirty = False
+        self._saved_at = time.monotonic()
+        logger.debug(
+            f"Saved the observations of {len(self._observed_at)} cities "
+            f"to {self.filepath}"
+        )
@@ -0,0 +1,44 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterable, Awaitable, Callable, Iterable, Optional, Union
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from models.batches import WeatherBatch  # noqa
+from models.dto import JsonOpenweathermapResponseDTO  # noqa
+from models.results import RunSummary  # noqa
+
+
+class AbstractPipeline(ABC):
+    """AbstractPipeline is an abstract class providing a base interface for
+    pipelines that carry the weather data of many cities from the API client
+    to the storage services."""
+
+    @abstractmethod
+    async def run(
+        self,
+        cities: Union[Iterable[str], AsyncIterable[str]],
+        timestamp: datetime,
+        store: Callable[[WeatherBatch], Awaitable[None]],
+        summary: Optional[RunSummary] = None,
+        accept: Optional[Callable[[JsonOpenweathermapResponseDTO], bool]] = None,
+    ) -> int:
+        """Abstract method for running the given cities through the pipeline.
+
+        Args:
+            cities: The cities to collect (sync or async iterable), consumed lazily.
+            timestamp (datetime): The timestamp of the current run.
+            store (Callable): Coroutine function storing a WeatherBatch in the
+            selected storage services.
+            summary (Optional[RunSummary]): When given, per-city failures are
+            recorded in it and skipped, otherwise the first failure is raised.
+            accept (Optional[Callable]): When given, only the DTOs it returns
+            True for are converted and stored.
+
+        Returns:
+            int: The number of domain objects passed to `store`.
+        """
+        pass
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import sys
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncIterable, Awaitable, Callable, Iterable, Optional, Union
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from exceptions import MappingError  # noqa
+from fetch_engines.abstractions import AbstractFetchEngine  # noqa
+from mappers.abstractions import AbstractWeatherDTOMapper  # noqa
+from models.batches import WeatherBatch  # noqa
+from models.dto import JsonOpenweathermapResponseDTO  # noqa
+from models.results import RunSummary  # noqa
+from pipelines.abstractions import AbstractPipeline  # noqa
+
+logger = logging.getLogger("app.pipelines")
+
+_STOP = object()
+
+
+class StreamingPipeline(AbstractPipeline):
+    """
+    StreamingPipeline runs the fetch, convert and store stages concurrently.
+
+    The fetch engine pushes DTOs into a bounded queue. `mapper_workers` mappers
+    take all the DTOs waiting in it, up to `batch_size`, map them in bulk into
+    a WeatherBatch and push it into a second bounded queue. A sink merges
+    those into WeatherBatch objects stored when `batch_size` rows are
+    collected or `flush_interval` seconds have passed since the first row of
+    the batch. A slow stage blocks the one before it on a full queue, so no
+    more than the queues and one batch are held in memory at a time.
+    """
+
+    def __init__(
+        self,
+        fetch_engine: AbstractFetchEngine,
+        client_storage_mapper: AbstractWeatherDTOMapper,
+        mapper_workers: int,
+        queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+    ):
+        self.fetch_engine = fetch_engine
+        self.client_storage_mapper = client_storage_mapper
+        self.mapper_workers = mapper_workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    async def run(
+        self,
+        cities: Union[Iterable[str], AsyncIterable[str]],
+        timestamp: datetime,
+        store: Callable[[WeatherBatch], Awaitable[None]],
+        summary: Optional[RunSummary] = None,
+        accept: Optional[Callable[[JsonOpenweathermapResponseDTO], bool]] = None,
+    ) -> int:
+        dto_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        domain_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stored = 0
+
+        async def fetch_stage() -> None:
+            async with aclosing(
+                self.fetch_engine.fetch(cities=cities, timestamp=timestamp)
+            ) as results:
+                async for result in results:
+                    if result.ok:
+                        if accept is None or accept(result.dto):
+                            await dto_queue.put(result.dto)
+                    elif summary is None:
+                        raise result.error
+                    else:
+                        summary.add_failure(city=result.city, error=result.error)
+
+            for _ in range(self.mapper_workers):
+                await dto_queue.put(_STOP)
+
+        def on_error(dto: JsonOpenweathermapResponseDTO, e: MappingError) -> None:
+            summary.add_failure(city=dto.get("name", "<unknown>"), error=e)
+
+        async def map_stage() -> None:
+            stopped = False
+            while not stopped:
+                dto_list = []
+                dto = await dto_queue.get()
+                while True:
+                    if dto is _STOP:
+                        stopped = True
+                        break
+                    dto_list.append(dto)
+                    if len(dto_list) >= self.batch_size or dto_queue.empty():
+                        break
+                    dto = dto_queue.get_nowait()
+
+                mapped = self.client_storage_mapper.to_batch(
+                    source_objs=dto_list,
+                    on_error=None if summary is None else on_error,
+                )
+                if mapped:
+                    await domain_queue.put(mapped)
+
+            await domain_queue.put(_STOP)
+
+        async def store_stage() -> None:
+            nonlocal stored
+            loop = asyncio.get_running_loop()
+            batch = WeatherBatch()
+            flush_at: Optional[float] = None
+            finished_mappers = 0
+
+            while finished_mappers < self.mapper_workers:
+                timeout = None if flush_at is None else max(flush_at - loop.time(), 0)
+                try:
+                    item = await asyncio.wait_for(domain_queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    item = None
+
+                if item is _STOP:
+                    finished_mappers += 1
+                elif item is not None:
+                    if not batch:
+                        flush_at = loop.time() + self.flush_interval
+                    batch.extend(item)
+
+                while len(batch) >= self.batch_size:
+                    logger.debug(f"Flushing a batch of {self.batch_size} objects")
+                    await store(batch[: self.batch_size])
+                    stored += self.batch_size
+                    batch = batch[self.batch_size :]
+                    flush_at = loop.time() + self.flush_interval if batch else None
+
+                if batch and loop.time() >= flush_at:
+                    logger.debug(f"Flushing a batch of {len(batch)} objects")
+                    await store(batch)
+                    stored += len(batch)
+                    batch = WeatherBatch()
+                    flush_at = None
+
+            if batch:
+                logger.debug(f"Flushing the last batch of {len(batch)} objects")
+                await store(batch)
+                stored += len(batch)
+
+        tasks = [asyncio.create_task(fetch_stage())]
+        tasks.extend(
+            asyncio.create_task(map_stage()) for _ in range(self.mapper_workers)
+        )
+        tasks.append(asyncio.create_task(store_stage()))
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return stored
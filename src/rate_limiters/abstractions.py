@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+
+
+class AbstractRateLimiter(ABC):
+    """AbstractRateLimiter is an abstract class providing a base interface for
+    limiters that pace the calls made to an external service."""
+
+    @abstractmethod
+    async def acquire(self) -> None:
+        """Abstract method that waits until one more call is allowed and
+        reserves it for the caller."""
+        pass
+
+    @abstractmethod
+    def refund(self) -> None:
+        """Abstract method giving back a call reserved by acquire() that was
+        not made, e.g. because the caller was cancelled."""
+        pass
+
+    @property
+    @abstractmethod
+    def fill_level(self) -> float:
+        """Abstract property returning how full the limiter is, from 0.0 (no
+        calls available right now) to 1.0 (a full burst is available)."""
+        pass
+
+    @abstractmethod
+    def metrics(self) -> dict:
+        """Abstract method returning the current state of the limiter as a flat
+        dictionary suitable for logging or exporting."""
+        pass
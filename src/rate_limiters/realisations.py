@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Callable, List
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from rate_limiters.abstractions import AbstractRateLimiter  # noqa
+
+logger = logging.getLogger("app.rate_limiters")
+
+
+class TokenBucketRateLimiter(AbstractRateLimiter):
+    """
+    TokenBucketRateLimiter paces the calls at `limit` calls per `period`
+    seconds on average.
+
+    The bucket holds up to `burst` tokens and is refilled continuously at
+    limit / period tokens per second, so the whole quota can be used. A full
+    burst plus one period of refill adds up to more than `limit`, so a hard
+    ceiling per period is enforced by combining the bucket with a
+    FixedWindowRateLimiter in a QuotaRateLimiter. Waiters are served in FIFO
+    order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        period: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= burst < limit:
+            raise ValueError(
+                f"Burst of the '{name}' bucket must be at least 1 and less than "
+                f"its limit {limit}, got {burst}"
+            )
+
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.capacity = burst
+        self.rate = limit / period
+
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                delay = (1 - self._tokens) / self.rate
+                logger.debug(f"Bucket '{self.name}' is empty, waiting {delay:.3f}s")
+                await asyncio.sleep(delay)
+
+    def refund(self) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+    @property
+    def fill_level(self) -> float:
+        self._refill()
+        return self._tokens / self.capacity
+
+    def metrics(self) -> dict:
+        return {
+            f"{self.name}_tokens": round(self._tokens, 3),
+            f"{self.name}_fill_level": round(self.fill_level, 3),
+        }
+
+
+class FixedWindowRateLimiter(AbstractRateLimiter):
+    """
+    FixedWindowRateLimiter allows at most `limit` calls in each window of
+    `period` seconds, the windows being aligned to multiples of `period` on the
+    clock, e.g. to UTC days for a period of 86400 seconds with the default wall
+    clock.
+
+    Unlike a token bucket, it lets the whole allowance of a window be spent at
+    any pace, so it suits long quotas like a daily one. When the allowance is
+    spent, the callers wait for the next window.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        period: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        if limit < 1:
+            raise ValueError(
+                f"Limit of the '{name}' window must be at least 1, got {limit}"
+            )
+
+        self.name = name
+        self.limit = limit
+        self.period = period
+
+        self._clock = clock
+        self._window = self._get_window()
+        self._calls = 0
+        self._lock = asyncio.Lock()
+
+    def _get_window(self) -> int:
+        return int(self._clock() // self.period)
+
+    def _roll(self) -> None:
+        window = self._get_window()
+        if window != self._window:
+            self._window = window
+            self._calls = 0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._roll()
+                if self._calls < self.limit:
+                    self._calls += 1
+                    return
+
+                delay = (self._window + 1) * self.period - self._clock()
+                logger.warning(
+                    f"Quota of the '{self.name}' window is spent, "
+                    f"waiting {delay:.0f}s for the next one"
+                )
+                await asyncio.sleep(max(delay, 0))
+
+    def refund(self) -> None:
+        self._roll()
+        self._calls = max(self._calls - 1, 0)
+
+    @property
+    def fill_level(self) -> float:
+        self._roll()
+        return (self.limit - self._calls) / self.limit
+
+    def metrics(self) -> dict:
+        return {
+            f"{self.name}_tokens": self.limit - self._calls,
+            f"{self.name}_fill_level": round(self.fill_level, 3),
+        }
+
+
+class QuotaRateLimiter(AbstractRateLimiter):
+    """
+    QuotaRateLimiter combines several buckets, e.g. a per-day and a per-minute
+    quota of one API key. A call is allowed only when every bucket allows it.
+
+    The buckets are acquired in order. When acquiring a bucket fails or is
+    cancelled, the calls already reserved in the previous buckets are refunded.
+    """
+
+    def __init__(self, buckets: List[AbstractRateLimiter]):
+        self.buckets = buckets
+
+    async def acquire(self) -> None:
+        acquired = []
+        try:
+            for bucket in self.buckets:
+                await bucket.acquire()
+                acquired.append(bucket)
+        except BaseException:
+            for bucket in acquired:
+                bucket.refund()
+            raise
+
+    def refund(self) -> None:
+        for bucket in self.buckets:
+            bucket.refund()
+
+    @property
+    def fill_level(self) -> float:
+        return min(bucket.fill_level for bucket in self.buckets)
+
+    def metrics(self) -> dict:
+        res = {}
+        for bucket in self.buckets:
+            res.update(bucket.metrics())
+        return res
+
+
+def create_quota_rate_limiter(
+    calls_per_minute: int, calls_per_day: int, burst: int
+) -> QuotaRateLimiter:
+    """Creates the rate limiter for one API key from its plan quotas.
+
+    The quotas are counted per UTC day and per minute, so all of them can be
+    spent, and the minute bucket paces the calls at the minute quota with
+    bursts of `burst` calls. The windows are checked first, so a call never
+    consumes a minute token while it still has to wait for a quota.
+    """
+
+    return QuotaRateLimiter(
+        buckets=[
+            FixedWindowRateLimiter(name="day", limit=calls_per_day, period=86400.0),
+            FixedWindowRateLimiter(
+                name="minute_window", limit=calls_per_minute, period=60.0
+            ),
+            TokenBucketRateLimiter(
+                name="minute", limit=calls_per_minute, period=60.0, burst=burst
+            ),
+        ]
+    )
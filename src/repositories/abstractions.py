@@ -1,7 +1,8 @@
 import os
 import sys
 from abc import ABC, abstractmethod
-from typing import Generic
+from datetime import datetime
+from typing import AsyncIterator, Generic, Iterable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,6 +10,7 @@ parent_directory = os.path.join(os.getcwd(), "..")
 sys.path.append(parent_directory)
 
 from app_types import DM  # noqa
+from models.results import IngestResult  # noqa
 
 
 class AbstractRepository(ABC, Generic[DM]):
@@ -60,11 +62,15 @@ class AbstractDatabaseRepository(AbstractRepository[DM]):
         pass
 
     @abstractmethod
-    async def add_all(self, data_list: list[DM]) -> None:
-        """Abstract method for adding a list of data objects to the database.
+    async def add_all(self, data_list: Iterable[DM]) -> IngestResult:
+        """Abstract method for adding data objects to the database.
 
         Args:
-            data_list (list[DM]): The list of data objects to be added to the database.
+            data_list (Iterable[DM]): The data objects to be added to the database,
+            consumed once.
+
+        Returns:
+            IngestResult: The numbers of inserted, updated and skipped rows.
         """
         pass
 
@@ -72,6 +78,20 @@ class AbstractDatabaseRepository(AbstractRepository[DM]):
     async def find_all(self, **filter_by: dict) -> list[DM]:
         pass
 
+    @abstractmethod
+    def stream_all(self, **filter_by: dict) -> AsyncIterator[DM]:
+        """Abstract method for reading the data objects matching the filters
+        from the database lazily, without loading the whole result at once.
+
+        Args:
+            **filter_by (dict): Keyword arguments representing filters
+            to apply during the search.
+
+        Returns:
+            AsyncIterator[DM]: The data objects matching the filters.
+        """
+        pass
+
 
 class AbstractFileRepository(AbstractRepository[DM]):
     """AbstractFileRepository is an abstract class that inherits from
@@ -89,6 +109,22 @@ class AbstractFileRepository(AbstractRepository[DM]):
         if not os.path.exists(directory):
             os.makedirs(directory)
 
+    @staticmethod
+    def _get_rotated_filepath(filepath: str) -> str:
+        """Static method to build a new filepath in the directory of the
+        specified filepath, named after the current time.
+
+        Used by long-running processes so that each stored batch gets its own
+        file instead of overwriting the previous one.
+
+        Args:
+            filepath (str): The filepath to rotate.
+        """
+        directory = os.path.dirname(filepath)
+        _, extension = os.path.splitext(filepath)
+        filename = f"meteo_{int(datetime.now().timestamp() * 1e6)}{extension}"
+        return os.path.join(directory, filename)
+
     @abstractmethod
     async def add_all(self, data_list: list[DM]) -> None:
         """Abstract method for adding a list of data objects to a file.
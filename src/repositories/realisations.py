@@ -1,10 +1,23 @@
+import asyncio
+import itertools
 import json
 import logging
 import os
 import sys
-from typing import Optional
+from typing import AsyncIterator, Iterable, Iterator, Literal, Optional, Sequence
 
-from sqlalchemy import insert, select
+from sqlalchemy import (
+    Boolean,
+    column,
+    delete,
+    func,
+    literal_column,
+    select,
+    table,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 parent_directory = os.path.join(os.getcwd(), "..")
@@ -14,12 +27,13 @@ from exceptions import DatabaseError  # noqa
 from exceptions import FileReadError  # noqa
 from exceptions import FileWriteError  # noqa
 from exceptions import MappingError  # noqa
-from exceptions import RepositoryError  # noqa
 from exceptions import SessionNotSetError  # noqa
 from mappers.abstractions import AbstractDomainEntityMapper  # noqa
 from mappers.realisations import WeatherDatabaseMapper  # noqa
+from models.batches import WeatherBatch, iter_records  # noqa
 from models.domains import WeatherDomain  # noqa
 from models.entities import WeatherORMModel  # noqa
+from models.results import IngestResult  # noqa
 from repositories.abstractions import AbstractDatabaseRepository  # noqa
 from repositories.abstractions import AbstractFileRepository  # noqa; noqa
 
@@ -30,6 +44,28 @@ class WeatherDatabaseRepository(AbstractDatabaseRepository[WeatherDomain]):
     """WeatherDatabaseRepository is a concrete implementation of
     AbstractDatabaseRepository for managing weather data in a database.
 
+    With `ingest_mode = "copy"` the rows are streamed to Postgres with the
+    binary COPY protocol of asyncpg straight from the domain objects, or the
+    columns of a WeatherBatch without building domain objects at all, instead
+    of INSERT statements. COPY runs on the
+    connection of the session, so it is committed or rolled back with it.
+
+    `conflict_policy` decides what happens to the rows of a batch that are
+    already stored, i.e. have the same timestamp and city: "error" fails the
+    whole batch, "nothing" skips them and "update" overwrites the stored
+    values, so a batch can be sent again safely.
+
+    In the insert mode the mapper turns the domain objects into plain rows,
+    without building ORM entities, and the rows are sent with Core inserts in
+    chunks of `chunk_size`, each one executemany call in the transaction of
+    the session, which keeps every statement below the bind parameter limit
+    of Postgres. The ORM entities are only built when reading.
+
+    stream_all reads the rows in pages of `page_size` with keyset pagination
+    on (timestamp, id), each page through a server-side cursor fetching
+    `fetch_size` rows at a time, which are mapped in bulk without building ORM
+    entities. find_all collects the stream.
+
     Attributes:
         model (Type[WeatherORMModel]): The ORM model representing
         weather data in the database.
@@ -37,9 +73,55 @@ class WeatherDatabaseRepository(AbstractDatabaseRepository[WeatherDomain]):
 
     model = WeatherORMModel
 
-    def __init__(self, mapper: AbstractDomainEntityMapper):
+    copy_columns = (
+        "timestamp",
+        "city",
+        "temperature",
+        "weather_type",
+        "sunrise",
+        "sunset",
+    )
+
+    update_columns = ("temperature", "weather_type", "sunrise", "sunset")
+
+    unique_constraint = "uq_timestamp_city"
+
+    # xmax is 0 only in the rows inserted by a statement, not the updated
+    _is_inserted = literal_column("xmax = 0", Boolean).label("is_inserted")
+
+    _staging_table = table(
+        "weather_table_staging", *(column(name) for name in copy_columns)
+    )
+
+    def __init__(
+        self,
+        mapper: WeatherDatabaseMapper,
+        ingest_mode: Literal["insert", "copy"] = "insert",
+        conflict_policy: Literal["error", "nothing", "update"] = "error",
+        chunk_size: int = 1000,
+        page_size: int = 10000,
+        fetch_size: int = 1000,
+    ):
+        if ingest_mode not in ("insert", "copy"):
+            raise ValueError(f"Unknown ingest mode: {ingest_mode}")
+        if conflict_policy not in ("error", "nothing", "update"):
+            raise ValueError(f"Unknown conflict policy: {conflict_policy}")
+        # Postgres accepts at most 32767 bind parameters in a statement
+        if not 0 < chunk_size * len(self.copy_columns) <= 32767:
+            raise ValueError(f"chunk_size out of range: {chunk_size}")
+        if page_size <= 0 or fetch_size <= 0:
+            raise ValueError(
+                f"page_size and fetch_size must be positive, "
+                f"got {page_size} and {fetch_size}"
+            )
+
         self._session: Optional[AsyncSession] = None
         self._mapper = mapper
+        self.ingest_mode = ingest_mode
+        self.conflict_policy = conflict_policy
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+        self.fetch_size = fetch_size
 
     def set_session(self, session: AsyncSession) -> None:
         if type(session) is not AsyncSession:
@@ -54,7 +136,7 @@ class WeatherDatabaseRepository(AbstractDatabaseRepository[WeatherDomain]):
     def clear_session(self) -> None:
         self._session = None
 
-    async def add_all(self, data_list: list[WeatherDomain]) -> None:
+    async def add_all(self, data_list: Iterable[WeatherDomain]) -> IngestResult:
         if self._session is None:
             error_message = (
                 "Session not set. Call set_session() before using the repository."
@@ -62,31 +144,93 @@ class WeatherDatabaseRepository(AbstractDatabaseRepository[WeatherDomain]):
             logger.error(error_message)
             raise SessionNotSetError(error_message)
 
+        if self.ingest_mode == "copy":
+            data_list, duplicates = self._drop_duplicates(data_list=data_list)
+            result = (
+                await self._copy_all(data_list=data_list)
+                if data_list
+                else IngestResult()
+            )
+            result.skipped += duplicates
+        else:
+            result = await self._insert_all(data_list=data_list)
+
+        logger.debug(f"Data added successfully into the database: {result}")
+        return result
+
+    async def _insert_all(self, data_list: Iterable[WeatherDomain]) -> IngestResult:
+        """Inserts the rows in chunks of `chunk_size`, one statement per chunk.
+        The next chunk is mapped in a worker thread while the current one is
+        being inserted."""
+
+        result = IngestResult()
+        chunks = self._iter_chunks(data_list=data_list)
+        rows, duplicates = self._to_rows(data_list=next(chunks, []))
+        while rows:
+            next_rows = asyncio.ensure_future(
+                asyncio.to_thread(self._to_rows, data_list=next(chunks, []))
+            )
+            try:
+                chunk_result = await self._insert_chunk(rows=rows)
+            except BaseException:
+                await asyncio.gather(next_rows, return_exceptions=True)
+                raise
+
+            result.merge(chunk_result)
+            result.skipped += duplicates
+            rows, duplicates = await next_rows
+
+        return result
+
+    def _iter_chunks(
+        self, data_list: Iterable[WeatherDomain]
+    ) -> Iterator[Sequence[WeatherDomain]]:
+        """Splits the data into chunks of `chunk_size`. A WeatherBatch is split
+        into WeatherBatch slices."""
+
+        if isinstance(data_list, WeatherBatch):
+            for start in range(0, len(data_list), self.chunk_size):
+                yield data_list[start : start + self.chunk_size]
+            return
+
+        data_iterator = iter(data_list)
+        while chunk := list(itertools.islice(data_iterator, self.chunk_size)):
+            yield chunk
+
+    def _to_rows(self, data_list: Sequence[WeatherDomain]) -> tuple[list[dict], int]:
+        """Maps a chunk to the plain rows to insert, and counts the duplicates
+        dropped from it."""
+
+        data_list, duplicates = self._drop_duplicates(data_list=data_list)
         try:
-            entity_list = [
-                self._mapper.to_entity(domain_obj=data) for data in data_list
-            ]
-            entity_dicts_list = [
-                {
-                    key: value
-                    for key, value in entity.__dict__.items()
-                    if key != "_sa_instance_state"
-                }
-                for entity in entity_list
+            rows = [
+                self._mapper.to_row(domain_obj=data) for data in iter_records(data_list)
             ]
         except MappingError as e:
-            error_message = f"Error mapping domain object to entity: {str(e)}"
+            error_message = f"Error mapping domain object to row: {str(e)}"
             logger.error(error_message)
             raise MappingError(error_message)
-        except Exception as e:
-            error_message = f"Error creating entity dictionary: {str(e)}"
-            logger.error(error_message)
-            raise RepositoryError(error_message)
+
+        return rows, duplicates
+
+    async def _insert_chunk(self, rows: list[dict]) -> IngestResult:
+        if not rows:
+            return IngestResult()
 
         try:
-            stmt = insert(self.model).values(entity_dicts_list)
-            await self._session.execute(stmt)
-            logger.debug("Data added successfully into the database!")
+            # The rows are passed as the parameters of one executemany call,
+            # which SQLAlchemy sends as multi-row INSERT statements compiled
+            # once, instead of a statement compiled with the values of each row
+            stmt = self._apply_conflict_policy(stmt=insert(self.model.__table__))
+            if self.conflict_policy == "error":
+                await self._session.execute(stmt, rows)
+                return IngestResult(inserted=len(rows))
+
+            is_inserted = (
+                (await self._session.execute(stmt.returning(self._is_inserted), rows))
+                .scalars()
+                .all()
+            )
         except Exception as e:
             error_message = (
                 f"An error occurred while adding data "
@@ -95,29 +239,201 @@ class WeatherDatabaseRepository(AbstractDatabaseRepository[WeatherDomain]):
             logger.error(error_message)
             raise DatabaseError(error_message)
 
-    async def find_all(self, **filter_by: dict) -> list[WeatherDomain]:
-        if self._session is None:
-            raise SessionNotSetError(
-                "Session not set. Call set_session() before using the repository."
-            )
+        inserted = sum(is_inserted)
+        return IngestResult(
+            inserted=inserted,
+            updated=len(is_inserted) - inserted,
+            skipped=len(rows) - len(is_inserted),
+        )
 
+    def _drop_duplicates(
+        self, data_list: Iterable[WeatherDomain]
+    ) -> tuple[Sequence[WeatherDomain], int]:
+        """With the update policy keeps the last of the objects with the same
+        timestamp and city, as a row cannot be updated twice by one statement.
+        Returns the objects and the number of the dropped ones."""
+
+        if not isinstance(data_list, WeatherBatch):
+            data_list = list(data_list)
+        if self.conflict_policy != "update":
+            return data_list, 0
+
+        if isinstance(data_list, WeatherBatch):
+            unique_indexes = {
+                key: index
+                for index, key in enumerate(
+                    zip(data_list.timestamps, data_list.city_ids)
+                )
+            }
+            duplicates = len(data_list) - len(unique_indexes)
+            if duplicates:
+                data_list = data_list.take(unique_indexes.values())
+            return data_list, duplicates
+
+        unique_data = {(data.timestamp, data.city): data for data in data_list}
+        return list(unique_data.values()), len(data_list) - len(unique_data)
+
+    async def _copy_all(self, data_list: Sequence[WeatherDomain]) -> IngestResult:
         try:
-            query = select(self.model).select_from(self.model).filter_by(**filter_by)
-            result_orm = await self._session.execute(query)
-            entity_list = result_orm.scalars().all()
+            connection = await self._session.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            if not driver_connection.is_in_transaction():
+                # The driver transaction of the session is begun lazily by its
+                # first statement, and COPY must not run outside of it
+                await self._session.execute(text("SELECT 1"))
+
+            if self.conflict_policy == "error":
+                await driver_connection.copy_records_to_table(
+                    self.model.__tablename__,
+                    records=self._to_records(data_list=data_list),
+                    columns=self.copy_columns,
+                )
+                return IngestResult(inserted=len(data_list))
+
+            # COPY has no ON CONFLICT clause, so the rows are copied into a
+            # temporary table first and moved by INSERT ... SELECT
+            await self._session.execute(
+                text(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {self._staging_table.name} "
+                    f"ON COMMIT DELETE ROWS AS "
+                    f"SELECT {', '.join(self.copy_columns)} "
+                    f"FROM {self.model.__tablename__} WITH NO DATA"
+                )
+            )
+            await driver_connection.copy_records_to_table(
+                self._staging_table.name,
+                records=self._to_records(data_list=data_list),
+                columns=self.copy_columns,
+            )
+            stmt = insert(self.model).from_select(
+                self.copy_columns, select(self._staging_table)
+            )
+            result = await self._execute_insert(stmt=stmt, total=len(data_list))
+            await self._session.execute(delete(self._staging_table))
+            return result
+        except MappingError:
+            raise
         except Exception as e:
             error_message = (
-                f"An error occurred while executing query to find data: {str(e)}"
+                f"An error occurred while copying data into the database: {str(e)}"
             )
             logger.error(error_message)
             raise DatabaseError(error_message)
 
-        try:
-            return [self._mapper.to_domain(enity_obj=entity) for entity in entity_list]
-        except MappingError as e:
-            error_message = f"Error mapping entity object to domain: {str(e)}"
+    async def _execute_insert(self, stmt: Insert, total: int) -> IngestResult:
+        """Executes the insert statement of `total` rows with the conflict
+        policy and counts the rows it inserted, updated and skipped."""
+
+        if self.conflict_policy == "error":
+            await self._session.execute(stmt)
+            return IngestResult(inserted=total)
+
+        written = (
+            self._apply_conflict_policy(stmt=stmt)
+            .returning(self._is_inserted)
+            .cte("written")
+        )
+        inserted, written_count = (
+            await self._session.execute(
+                select(
+                    func.count().filter(written.c.is_inserted), func.count()
+                ).select_from(written)
+            )
+        ).one()
+        return IngestResult(
+            inserted=inserted,
+            updated=written_count - inserted,
+            skipped=total - written_count,
+        )
+
+    def _apply_conflict_policy(self, stmt: Insert) -> Insert:
+        if self.conflict_policy == "nothing":
+            return stmt.on_conflict_do_nothing(constraint=self.unique_constraint)
+        if self.conflict_policy == "update":
+            return stmt.on_conflict_do_update(
+                constraint=self.unique_constraint,
+                set_={column: stmt.excluded[column] for column in self.update_columns},
+            )
+        return stmt
+
+    @staticmethod
+    def _to_records(data_list: Sequence[WeatherDomain]) -> Iterator[tuple]:
+        # The rows of a WeatherBatch are read straight from its columns
+        for data in iter_records(data_list):
+            try:
+                yield (
+                    data.timestamp,
+                    data.city,
+                    data.temperature,
+                    # Postgres stores the names of the enum members
+                    data.weather_type.name,
+                    data.sunrise,
+                    data.sunset,
+                )
+            except AttributeError as e:
+                error_message = f"Error mapping domain object to record: {str(e)}"
+                logger.error(error_message)
+                raise MappingError(error_message)
+
+    async def find_all(self, **filter_by: dict) -> list[WeatherDomain]:
+        return [data async for data in self.stream_all(**filter_by)]
+
+    async def stream_all(self, **filter_by: dict) -> AsyncIterator[WeatherDomain]:
+        if self._session is None:
+            error_message = (
+                "Session not set. Call set_session() before using the repository."
+            )
             logger.error(error_message)
-            raise MappingError(error_message)
+            raise SessionNotSetError(error_message)
+
+        columns = [getattr(self.model, column) for column in self._mapper.columns]
+        query = (
+            select(*columns, self.model.id)
+            .filter_by(**filter_by)
+            .order_by(self.model.timestamp, self.model.id)
+            .limit(self.page_size)
+            .execution_options(yield_per=self.fetch_size)
+        )
+        last_key = None
+        while True:
+            page_query = query
+            if last_key is not None:
+                page_query = query.where(
+                    tuple_(self.model.timestamp, self.model.id) > tuple_(*last_key)
+                )
+
+            page_count = 0
+            try:
+                result = await self._session.stream(page_query)
+            except Exception as e:
+                raise self._get_read_error(e=e)
+            try:
+                while True:
+                    try:
+                        rows = await result.fetchmany()
+                    except Exception as e:
+                        raise self._get_read_error(e=e)
+                    if not rows:
+                        break
+
+                    page_count += len(rows)
+                    last_key = (rows[-1].timestamp, rows[-1].id)
+                    for data in self._mapper.to_domain_many(rows=rows):
+                        yield data
+            finally:
+                await result.close()
+
+            if page_count < self.page_size:
+                return
+
+    @staticmethod
+    def _get_read_error(e: Exception) -> DatabaseError:
+        error_message = (
+            f"An error occurred while executing query to find data: {str(e)}"
+        )
+        logger.error(error_message)
+        return DatabaseError(error_message)
 
 
 class TextfileRepository(AbstractFileRepository[WeatherDomain]):
@@ -125,10 +441,14 @@ class TextfileRepository(AbstractFileRepository[WeatherDomain]):
         self.filepath = filepath
         self.mapper = mapper
         self._check_filepath_exists(filepath=filepath)
+        self._is_written = False
 
     async def add_all(self, data_list: list[WeatherDomain]) -> None:
         try:
-            entity_list = [self.mapper.to_entity(domain_obj=data) for data in data_list]
+            entity_list = [
+                self.mapper.to_entity(domain_obj=data)
+                for data in iter_records(data_list)
+            ]
         except (MappingError, TypeError) as e:
             error_message = f"Error mapping domain object to entity: {str(e)}"
             logger.error(error_message)
@@ -136,9 +456,13 @@ class TextfileRepository(AbstractFileRepository[WeatherDomain]):
 
         entity_str = "\n\n".join(entity_list)
 
+        if self._is_written:
+            self.filepath = self._get_rotated_filepath(filepath=self.filepath)
+
         try:
             with open(self.filepath, mode="w", encoding="utf-8") as file:
                 file.write(entity_str)
+            self._is_written = True
         except (FileNotFoundError, PermissionError, IOError, UnicodeEncodeError) as e:
             error_message = f"An error occurred while writing to the file: {str(e)}"
             logger.error(error_message)
@@ -167,13 +491,20 @@ class JsonRepository(AbstractFileRepository[WeatherDomain]):
         self.filepath = filepath
         self.mapper = mapper
         self._check_filepath_exists(filepath=filepath)
+        self._is_written = False
 
     async def add_all(self, data_list: list[WeatherDomain]) -> None:
-        entity_list = [self.mapper.to_entity(domain_obj=data) for data in data_list]
+        entity_list = [
+            self.mapper.to_entity(domain_obj=data) for data in iter_records(data_list)
+        ]
+
+        if self._is_written:
+            self.filepath = self._get_rotated_filepath(filepath=self.filepath)
 
         try:
             with open(self.filepath, mode="w", encoding="utf-8") as file:
                 json.dump(entity_list, file)
+            self._is_written = True
         except (FileNotFoundError, PermissionError, IOError) as e:
             error_message = f"An error occurred while writing to the file: {str(e)}"
             logger.error(error_message)
@@ -188,4 +519,4 @@ class JsonRepository(AbstractFileRepository[WeatherDomain]):
             logger.error(error_message)
             raise FileReadError(error_message)
 
-        return [self.mapper.to_domain(enity_obj=entity) for entity in entity_list]
+        return [self.mapper.to_domain(entity_obj=entity) for entity in entity_list]
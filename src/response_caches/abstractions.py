@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class AbstractResponseCache(ABC):
+    """AbstractResponseCache is an abstract class providing a base interface for
+    caches of API responses with a time-to-live and a size limit."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """Abstract method returning the cached response for the key, or None
+        when it is missing or has expired."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, payload: dict) -> None:
+        """Abstract method caching the response for the key, evicting the least
+        recently used entries when the cache is full."""
+        pass
+
+    @abstractmethod
+    def metrics(self) -> dict:
+        """Abstract method returning the hit, miss and eviction counters of the
+        cache as a flat dictionary."""
+        pass
+
+    def close(self) -> None:
+        """Releases the resources held by the cache. In-memory caches don't
+        need to override it."""
+        pass
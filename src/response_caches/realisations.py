@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from exceptions import RepositoryError  # noqa
+from response_caches.abstractions import AbstractResponseCache  # noqa
+
+logger = logging.getLogger("app.response_caches")
+
+
+class BaseResponseCache(AbstractResponseCache):
+    """BaseResponseCache holds the settings and the counters the response caches
+    share."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def metrics(self) -> dict:
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
+
+
+class InMemoryResponseCache(BaseResponseCache):
+    """
+    InMemoryResponseCache keeps the responses in an LRU-ordered dictionary for
+    the lifetime of the process.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10000, **kwargs):
+        super().__init__(ttl=ttl, max_size=max_size, **kwargs)
+        self._entries: OrderedDict[str, Tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or self._clock() - entry[0] > self.ttl:
+            self._entries.pop(key, None)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, key: str, payload: dict) -> None:
+        self._entries[key] = (self._clock(), payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteResponseCache(BaseResponseCache):
+    """
+    SqliteResponseCache keeps the responses in a local SQLite file, so they
+    survive between runs of the collector started by cron or by hand.
+
+    The least recently used entries are evicted once the file holds more than
+    `max_size` responses.
+    """
+
+    def __init__(self, filepath: str, ttl: float, max_size: int = 10000, **kwargs):
+        super().__init__(ttl=ttl, max_size=max_size, **kwargs)
+        self.filepath = filepath
+
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        try:
+            self._connection = sqlite3.connect(filepath)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_responses_used_at "
+                "ON responses (used_at)"
+            )
+            self._connection.commit()
+            self._size = self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()[0]
+        except sqlite3.Error as e:
+            error_message = f"An error occurred while opening the response cache: {e}"
+            logger.error(error_message)
+            raise RepositoryError(error_message)
+
+    def get(self, key: str) -> Optional[dict]:
+        now = self._clock()
+        try:
+            row = self._connection.execute(
+                "SELECT payload, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._connection.execute(
+                        "DELETE FROM responses WHERE key = ?", (key,)
+                    )
+                    self._connection.commit()
+                    self._size -= 1
+                self._misses += 1
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET used_at = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache lookup for {key} failed: {e}")
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, payload: dict) -> None:
+        now = self._clock()
+        try:
+            data = json.dumps(payload, default=str)
+            cursor = self._connection.execute(
+                "UPDATE responses SET payload = ?, stored_at = ?, used_at = ? "
+                "WHERE key = ?",
+                (data, now, now, key),
+            )
+            if cursor.rowcount == 0:
+                self._connection.execute(
+                    "INSERT INTO responses (key, payload, stored_at, used_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, data, now, now),
+                )
+                self._size += 1
+
+            if self._size > self.max_size:
+                cursor = self._connection.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY used_at LIMIT ?)",
+                    (self._size - self.max_size,),
+                )
+                self._evictions += cursor.rowcount
+                self._size -= cursor.rowcount
+            self._connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache update for {key} failed: {e}")
+
+    def close(self) -> None:
+        self._connection.close()
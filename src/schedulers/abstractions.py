@@ -0,0 +1,55 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import AsyncIterable
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from models.domains import CityRecord  # noqa
+
+
+class AbstractChangeHistory(ABC):
+    """
+    AbstractChangeHistory is an abstract class providing a base interface for
+    reading how often the weather of the cities changed recently.
+    """
+
+    @abstractmethod
+    async def get_change_rates(self, cities: list[str]) -> dict[str, float]:
+        """Abstract method returning, for each city, the share of its recent
+        consecutive observations in which the weather changed, from 0 to 1.
+        Cities without enough history are left out.
+
+        Raises:
+            SchedulingError: If the history cannot be read.
+        """
+        pass
+
+
+class AbstractPollingScheduler(ABC):
+    """
+    AbstractPollingScheduler is an abstract class providing a base interface for
+    deciding when each city is polled next.
+    """
+
+    tick: float = 30.0
+
+    @abstractmethod
+    async def sync(self, records: AsyncIterable[CityRecord]) -> None:
+        """Abstract method updating the scheduled cities from the city list. New
+        cities are due immediately and the cities missing from the list are
+        no longer scheduled."""
+        pass
+
+    @abstractmethod
+    def pop_due(self) -> list[str]:
+        """Abstract method removing the cities that are due from the schedule
+        and returning them."""
+        pass
+
+    @abstractmethod
+    async def reschedule(self, cities: list[str]) -> None:
+        """Abstract method scheduling the next poll of the cities that were just
+        polled."""
+        pass
@@ -0,0 +1,220 @@
+import heapq
+import itertools
+import logging
+import os
+import sys
+import time
+from typing import AsyncIterable, Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+parent_directory = os.path.join(os.getcwd(), "..")
+sys.path.append(parent_directory)
+
+from city_resolvers.abstractions import AbstractCityResolutionCache  # noqa
+from exceptions import SchedulingError  # noqa
+from models.domains import CityRecord  # noqa
+from models.entities import WeatherORMModel  # noqa
+from schedulers.abstractions import AbstractChangeHistory  # noqa
+from schedulers.abstractions import AbstractPollingScheduler  # noqa
+
+logger = logging.getLogger("app.schedulers")
+
+
+class DatabaseChangeHistory(AbstractChangeHistory):
+    """
+    DatabaseChangeHistory reads the last `history_size` rows of each city from
+    weather_table and counts the consecutive rows in which the temperature or
+    the weather type changed.
+
+    The cities are queried `chunk_size` at a time, with a window function
+    ranking the rows of each city by timestamp. The rows are stored under the
+    city name the provider returned, e.g. "Moskva" for "Moscow", so with a
+    `city_resolver` the cities are queried by the names it resolved them to.
+    """
+
+    def __init__(
+        self,
+        async_session_factory: async_sessionmaker,
+        history_size: int = 6,
+        chunk_size: int = 1000,
+        city_resolver: Optional[AbstractCityResolutionCache] = None,
+    ):
+        if history_size < 2:
+            raise ValueError(f"history_size must be at least 2, got {history_size}")
+
+        self.async_session_factory = async_session_factory
+        self.history_size = history_size
+        self.chunk_size = chunk_size
+        self.city_resolver = city_resolver
+
+    async def get_change_rates(self, cities: list[str]) -> dict[str, float]:
+        stored_names = {city: self._get_stored_name(city) for city in cities}
+        names = list(dict.fromkeys(stored_names.values()))
+
+        stored_change_rates = {}
+        for start in range(0, len(names), self.chunk_size):
+            chunk = names[start : start + self.chunk_size]
+            try:
+                async with self.async_session_factory() as session:
+                    rows = (await session.execute(self._build_query(chunk))).all()
+            except SQLAlchemyError as e:
+                error_message = (
+                    f"An error occurred while reading the weather history: {e}"
+                )
+                logger.error(error_message)
+                raise SchedulingError(error_message)
+
+            for city, observations in itertools.groupby(rows, key=lambda row: row.city):
+                observations = [
+                    (row.temperature, row.weather_type) for row in observations
+                ]
+                if len(observations) < 2:
+                    continue
+                changes = sum(
+                    previous != current
+                    for previous, current in zip(observations, observations[1:])
+                )
+                stored_change_rates[city] = changes / (len(observations) - 1)
+
+        return {
+            city: stored_change_rates[stored_name]
+            for city, stored_name in stored_names.items()
+            if stored_name in stored_change_rates
+        }
+
+    def _get_stored_name(self, city: str) -> str:
+        """Returns the name the rows of the city are stored under, which is the
+        city name itself while the city is not resolved."""
+        if self.city_resolver is None:
+            return city
+        location = self.city_resolver.get(city)
+        if location is None or location.name is None:
+            return city
+        return location.name
+
+    def _build_query(self, cities: list[str]):
+        ranked = (
+            select(
+                WeatherORMModel.city,
+                WeatherORMModel.temperature,
+                WeatherORMModel.weather_type,
+                func.row_number()
+                .over(
+                    partition_by=WeatherORMModel.city,
+                    order_by=WeatherORMModel.timestamp.desc(),
+                )
+                .label("row_number"),
+            )
+            .where(WeatherORMModel.city.in_(cities))
+            .subquery()
+        )
+        return (
+            select(ranked.c.city, ranked.c.temperature, ranked.c.weather_type)
+            .where(ranked.c.row_number <= self.history_size)
+            .order_by(ranked.c.city, ranked.c.row_number)
+        )
+
+
+class AdaptivePollingScheduler(AbstractPollingScheduler):
+    """
+    AdaptivePollingScheduler keeps the next due time of every city in a heap
+    and adapts the poll interval of each city to how often its weather changed
+    recently.
+
+    A city whose weather changed between every pair of its recent observations
+    is polled every `min_interval` seconds, one whose weather did not change at
+    all every `max_interval` seconds, and the interval is interpolated linearly
+    in between. Cities without enough history are polled every `min_interval`
+    seconds until they have it. A city with its own poll_interval in the city
+    list is always polled on that interval.
+    """
+
+    def __init__(
+        self,
+        change_history: AbstractChangeHistory,
+        min_interval: float = 300.0,
+        max_interval: float = 3600.0,
+        tick: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(
+                f"Expected 0 < min_interval <= max_interval, "
+                f"got {min_interval} and {max_interval}"
+            )
+
+        self.change_history = change_history
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.tick = tick
+
+        self._clock = clock
+        self._heap: list[tuple[float, str]] = []
+        self._due_at: dict[str, float] = {}
+        self._intervals: dict[str, float] = {}
+        self._fixed_intervals: dict[str, float] = {}
+
+    async def sync(self, records: AsyncIterable[CityRecord]) -> None:
+        now = self._clock()
+        fixed_intervals = {}
+        cities = set()
+        async for record in records:
+            cities.add(record.name)
+            if record.poll_interval is not None:
+                fixed_intervals[record.name] = record.poll_interval
+            if record.name not in self._due_at:
+                self._push(city=record.name, due_at=now)
+        self._fixed_intervals = fixed_intervals
+
+        # The heap entries of the removed cities are dropped when popped
+        for city in set(self._due_at) - cities:
+            del self._due_at[city]
+            self._intervals.pop(city, None)
+
+        logger.debug(f"{len(self._due_at)} cities are scheduled")
+
+    def pop_due(self) -> list[str]:
+        now = self._clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, city = heapq.heappop(self._heap)
+            if self._due_at.get(city) == due_at:
+                del self._due_at[city]
+                due.append(city)
+        return due
+
+    async def reschedule(self, cities: list[str]) -> None:
+        adaptive_cities = [city for city in cities if city not in self._fixed_intervals]
+        try:
+            change_rates = await self.change_history.get_change_rates(adaptive_cities)
+        except SchedulingError as e:
+            logger.warning(f"Keeping the previous poll intervals: {e}")
+            change_rates = None
+
+        now = self._clock()
+        for city in cities:
+            if city in self._fixed_intervals:
+                interval = self._fixed_intervals[city]
+            elif change_rates is None:
+                interval = self._intervals.get(city, self.min_interval)
+            else:
+                interval = self._get_interval(change_rates.get(city))
+            self._intervals[city] = interval
+            self._push(city=city, due_at=now + interval)
+
+    def get_interval(self, city: str) -> Optional[float]:
+        """Returns the current poll interval of the city, or None before its
+        first poll."""
+        return self._intervals.get(city)
+
+    def _get_interval(self, change_rate: Optional[float]) -> float:
+        if change_rate is None:
+            return self.min_interval
+        return self.max_interval - change_rate * (self.max_interval - self.min_interval)
+
+    def _push(self, city: str, due_at: float) -> None:
+        self._due_at[city] = due_at
+        heapq.heappush(self._heap, (due_at, city))
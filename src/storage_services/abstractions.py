@@ -1,7 +1,7 @@
 import os
 import sys
 from abc import ABC, abstractmethod
-from typing import Generic, List
+from typing import Generic, Sequence
 
 parent_directory = os.path.join(os.getcwd(), "..")
 sys.path.append(parent_directory)
@@ -14,11 +14,16 @@ class AbstractStorageService(ABC, Generic[DM]):
     interface for data storage services."""
 
     @abstractmethod
-    async def bulk_store_data(self, data_lst: List[DM]) -> None:
+    async def bulk_store_data(self, data_lst: Sequence[DM]) -> int:
         """Abstract method for bulk storing data.
 
         Parameters:
-            data_lst (List[DM]): The list of data objects to be bulk stored.
+            data_lst (Sequence[DM]): The data objects to be bulk stored, e.g. a
+            list or a columnar WeatherBatch.
+
+        Returns:
+            int: The number of objects stored, counted from the start of
+            `data_lst`. It is less than its length when the storage failed.
 
         Raises:
             Any exceptions that might occur during the data storage process.
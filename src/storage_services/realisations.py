@@ -1,7 +1,7 @@
 import logging
 import os
 import sys
-from typing import List
+from typing import Optional, Sequence
 
 parent_directory = os.path.join(os.getcwd(), "..")
 sys.path.append(parent_directory)
@@ -13,6 +13,7 @@ from exceptions import MappingError  # noqa
 from exceptions import RepositoryNotFoundError  # noqa
 from exceptions import RepositoryValidationError  # noqa
 from models.domains import WeatherDomain  # noqa
+from models.results import IngestResult  # noqa
 from repositories.abstractions import AbstractFileRepository  # noqa
 from storage_services.abstractions import AbstractStorageService  # noqa
 from units_of_work.realisations import WeatherUnitOfWork  # noqa
@@ -21,24 +22,43 @@ logger = logging.getLogger("app.storage_services")
 
 
 class DatabaseService(AbstractStorageService[WeatherDomain]):
-    """DatabaseService is a storage service for WeatherDomain instances."""
+    """DatabaseService is a storage service for WeatherDomain instances.
 
-    def __init__(self, uow: WeatherUnitOfWork, service_designation: str):
+    With a `transaction_size` the data is stored in consecutive transactions of
+    at most that many objects, so a large run does not hold one long
+    transaction. The transactions committed before a failed one are kept, and
+    bulk_store_data returns the number of objects they stored.
+    """
+
+    def __init__(
+        self,
+        uow: WeatherUnitOfWork,
+        service_designation: str,
+        transaction_size: Optional[int] = None,
+    ):
         self.uow = uow
         self.service_designation = service_designation
+        self.transaction_size = transaction_size or None
 
-    async def bulk_store_data(self, data_lst: List[WeatherDomain]) -> None:
+    async def bulk_store_data(self, data_lst: Sequence[WeatherDomain]) -> int:
+        stored = 0
         try:
             logger.info(f"{self.service_designation.upper()} saving started...")
-            async with self.uow:
-                """
-                The context operates with the Repositories Manager
-                and the repositories themselves, so exceptions at these levels
-                occur within the context and are handled by the context manager
-                in __aexit__ method.
-                """
-                await self.uow.weather_database_repository.add_all(data_list=data_lst)
-                await self.uow.commit()
+            result = IngestResult()
+            step = self.transaction_size or max(len(data_lst), 1)
+            for start in range(0, len(data_lst), step):
+                transaction_data = data_lst[start : start + step]
+                transaction_result = await self._store_in_transaction(
+                    data_lst=transaction_data
+                )
+                if transaction_result is None:
+                    logger.error(
+                        f"{self.service_designation.upper()} saving failed, "
+                        f"stored before the failure: {result}"
+                    )
+                    return stored
+                result.merge(transaction_result)
+                stored += len(transaction_data)
         except RepositoryValidationError:
             logger.error(
                 "Repositories do not match the allowed repositories "
@@ -61,19 +81,42 @@ class DatabaseService(AbstractStorageService[WeatherDomain]):
             logger.error("An error occurred at the level of the Unit of Work.")
         else:
             logger.info(
-                f"{self.service_designation.upper()} saving finished successfully!"
+                f"{self.service_designation.upper()} saving finished successfully: "
+                f"{result}"
+            )
+        return stored
+
+    async def _store_in_transaction(
+        self, data_lst: Sequence[WeatherDomain]
+    ) -> Optional[IngestResult]:
+        """Stores the data in one transaction. Returns None when the transaction
+        was rolled back."""
+
+        result = None
+        async with self.uow:
+            """
+            The context operates with the Repositories Manager
+            and the repositories themselves, so exceptions at these levels
+            occur within the context and are handled by the context manager
+            in __aexit__ method.
+            """
+            transaction_result = await self.uow.weather_database_repository.add_all(
+                data_list=data_lst
             )
+            await self.uow.commit()
+            result = transaction_result
+        return result
 
 
 class FileService(AbstractStorageService[WeatherDomain]):
     """FileService is a storage service for WeatherDomain instances using a
-    file repository."""
+    file repository. A failed write stores none of the objects."""
 
     def __init__(self, repository: AbstractFileRepository, service_designation: str):
         self.repository = repository
         self.service_designation = service_designation
 
-    async def bulk_store_data(self, data_lst: List[WeatherDomain]) -> None:
+    async def bulk_store_data(self, data_lst: Sequence[WeatherDomain]) -> int:
         try:
             logger.info(f"{self.service_designation.upper()} saving started...")
             await self.repository.add_all(data_list=data_lst)
@@ -89,3 +132,5 @@ class FileService(AbstractStorageService[WeatherDomain]):
             logger.info(
                 f"{self.service_designation.upper()} saving finished successfully!"
             )
+            return len(data_lst)
+        return 0
@@ -4,6 +4,30 @@ import pytest
 
 from src.database.db import Database
 from src.main import create_app_container, get_config_dict
+from src.models.domains import CityRecord
+from src.repositories.realisations import WeatherORMModel
+
+
+class FakeClock:
+    """A clock for the components taking a `clock`, which only moves when its
+    `now` is set."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StaticCitySource:
+    """A city source streaming the records of a fixed list of city names."""
+
+    def __init__(self, cities):
+        self.cities = cities
+
+    async def iter_cities(self):
+        for city in self.cities:
+            yield CityRecord(name=city)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -26,6 +50,38 @@ def container(settings_dict):
     return app_container
 
 
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_city_source():
+    return StaticCitySource
+
+
+@pytest.fixture
+def tables():
+    """The tables session_factory creates and empties. A test module working
+    with other tables overrides this fixture."""
+    return [WeatherORMModel.__table__]
+
+
+@pytest.fixture
+async def session_factory(container, tables):
+    async_session_factory = container.database.database_provider().get_session_factory
+    async with async_session_factory() as session:
+        async with session.begin():
+            for table in tables:
+                await session.run_sync(
+                    lambda sync_session, table=table: table.create(
+                        bind=sync_session.connection(), checkfirst=True
+                    )
+                )
+                await session.execute(table.delete())
+    return async_session_factory
+
+
 @pytest.fixture(scope="session")
 def event_loop(request):
     """Create an instance of the default event loop for each test case."""
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from contextlib import nullcontext as does_not_raise
 from datetime import datetime
@@ -7,7 +8,13 @@ import aiohttp
 import pytest
 from payloads import city_payload_1, city_payload_2, response_data
 
-from src.apiclients.realisations import OpenweathermapByCityAPIClient
+from src.apiclients.realisations import (
+    OpenweathermapByCityAPIClient,
+    OpenweathermapGroupAPIClient,
+)
+from src.apiclients.retry import RetryPolicy
+from src.circuit_breakers.realisations import SlidingWindowCircuitBreaker
+from src.city_resolvers.realisations import InMemoryCityResolutionCache
 from src.exceptions import (
     ApiClientError,
     WeatherDataError,
@@ -15,6 +22,7 @@ from src.exceptions import (
     WeatherParsingError,
 )
 from src.models.dto import JsonOpenweathermapResponseDTO
+from src.models.results import RunSummary
 
 
 @pytest.mark.parametrize(
@@ -40,7 +48,7 @@ async def test_get_weather_data_integration(
     weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
 
     def func_process(
-        session: aiohttp.ClientSession, city: str, timestamp: datetime
+        city: str, timestamp: datetime, session: aiohttp.ClientSession = None
     ) -> JsonOpenweathermapResponseDTO:
         d = {
             city_name_1: JsonOpenweathermapResponseDTO(**payload_1),
@@ -108,17 +116,46 @@ async def test_get_weather_data_integration_errors(
             await master_service.get_weather_data(cities=(city_name_1, city_name_2))
 
 
+async def test_get_weather_data_integration_partial_success(container):
+    city_name_1 = city_payload_1.get("name")
+    city_name_2 = city_payload_2.get("name")
+
+    weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
+
+    def func_process(
+        city: str, timestamp: datetime, session: aiohttp.ClientSession = None
+    ) -> JsonOpenweathermapResponseDTO:
+        if city == city_name_2:
+            raise WeatherFetchingError()
+        return JsonOpenweathermapResponseDTO(**city_payload_1)
+
+    weather_client_mock.get.side_effect = func_process
+
+    with container.api_clients.weather_client_provider.override(weather_client_mock):
+        master_service = container.master.master_service_provider()
+        summary = RunSummary()
+        dto_list = await master_service.get_weather_data(
+            cities=(city_name_1, city_name_2), summary=summary
+        )
+        weather_list = master_service.convert_data(data_list=dto_list, summary=summary)
+
+    assert dto_list == [JsonOpenweathermapResponseDTO(**city_payload_1)]
+    assert [weather.city for weather in weather_list] == [city_name_1]
+    assert summary.failed == 1
+    assert summary.failures == {city_name_2: "WeatherFetchingError"}
+
+
 async def test_get_weather_data_success(container):
     api_client = container.api_clients.weather_client_provider()
     http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
 
     city = response_data.get("name")
     timestamp = datetime.now()
-    http_session_mock.get.return_value.__aenter__.return_value.text.return_value = (
-        json.dumps(response_data)
+    http_session_mock.get.return_value.__aenter__.return_value.read.return_value = (
+        json.dumps(response_data).encode()
     )
 
-    result = await api_client.get(http_session_mock, city, timestamp)
+    result = await api_client.get(city, timestamp, session=http_session_mock)
 
     try:
         dto = JsonOpenweathermapResponseDTO(**result)
@@ -166,10 +203,10 @@ async def test_get_weather_data_weather_fetching_error(exception, container):
     # http_session_mock.get.side_effect = aiohttp.ClientError()
 
     # with exception:
-    #     await api_client.get(http_session_mock, city, timestamp)
+    #     await api_client.get(city, timestamp, session=http_session_mock)
 
     try:
-        await api_client.get(http_session_mock, city, timestamp)
+        await api_client.get(city, timestamp, session=http_session_mock)
         # await my_func()
         # raise WeatherFetchingError()
     except WeatherFetchingError as e:
@@ -198,9 +235,209 @@ async def test_get_weather_data_weather_data_error(container):
 
     city = response_data.get("name")
     timestamp = 1
-    http_session_mock.get.return_value.__aenter__.return_value.text.return_value = (
-        json.dumps(response_data)
+    http_session_mock.get.return_value.__aenter__.return_value.read.return_value = (
+        json.dumps(response_data).encode()
     )
 
     with pytest.raises(WeatherDataError):
-        await api_client.get(http_session_mock, city, timestamp)
+        await api_client.get(city, timestamp, session=http_session_mock)
+
+
+async def test_client_session_is_reused_until_closed():
+    api_client = OpenweathermapByCityAPIClient(
+        api_key="key", pool_size=10, pool_size_per_host=5
+    )
+
+    session = api_client._get_session()
+    assert api_client._get_session() is session
+    assert session.connector.limit == 10
+    assert session.connector.limit_per_host == 5
+
+    await api_client.close()
+    assert session.closed
+    assert api_client._get_session() is not session
+
+    await api_client.close()
+
+
+def make_response_mock(status: int, body: dict = None, headers: dict = None):
+    response = mock.MagicMock()
+    response.status = status
+    response.ok = status < 400
+    response.headers = headers or {}
+    response.read = mock.AsyncMock(return_value=json.dumps(body or {}).encode())
+    return response
+
+
+async def test_get_weather_data_retries_transient_errors():
+    api_client = OpenweathermapByCityAPIClient(
+        api_key="key",
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001),
+    )
+    http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
+    http_session_mock.get.return_value.__aenter__.side_effect = [
+        aiohttp.ClientConnectionError(),
+        make_response_mock(status=503),
+        make_response_mock(status=200, body=response_data),
+    ]
+
+    result = await api_client.get(
+        response_data.get("name"), datetime.now(), session=http_session_mock
+    )
+
+    assert result.get("name") == response_data.get("name")
+    assert api_client.metrics()["requests_total"] == 3
+    assert api_client.metrics()["retries_total"] == 2
+
+
+async def test_get_weather_data_honours_retry_after():
+    retry_policy = RetryPolicy(max_attempts=2, base_delay=5, max_delay=5)
+    api_client = OpenweathermapByCityAPIClient(api_key="key", retry_policy=retry_policy)
+    http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
+    http_session_mock.get.return_value.__aenter__.side_effect = [
+        make_response_mock(status=429, headers={"Retry-After": "0.01"}),
+        make_response_mock(status=200, body=response_data),
+    ]
+
+    with mock.patch.object(
+        retry_policy, "get_delay", wraps=retry_policy.get_delay
+    ) as get_delay:
+        await api_client.get(
+            response_data.get("name"), datetime.now(), session=http_session_mock
+        )
+
+    get_delay.assert_called_once_with(attempt=1, retry_after=0.01)
+
+
+async def test_get_weather_data_gives_up_after_max_attempts():
+    api_client = OpenweathermapByCityAPIClient(
+        api_key="key",
+        retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001, max_delay=0.001),
+    )
+    http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
+    http_session_mock.get.return_value.__aenter__.side_effect = [
+        make_response_mock(status=502),
+        make_response_mock(status=502),
+        make_response_mock(status=200, body=response_data),
+    ]
+
+    with pytest.raises(Exception) as exc_info:
+        await api_client.get(
+            response_data.get("name"), datetime.now(), session=http_session_mock
+        )
+
+    assert type(exc_info.value).__name__ == "WeatherFetchingError"
+    assert api_client.metrics()["requests_total"] == 2
+
+
+async def test_get_weather_data_does_not_retry_client_errors():
+    api_client = OpenweathermapByCityAPIClient(
+        api_key="key",
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001),
+    )
+    http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
+    http_session_mock.get.return_value.__aenter__.side_effect = [
+        make_response_mock(status=404, body={"cod": "404"}),
+    ]
+
+    with pytest.raises(Exception) as exc_info:
+        await api_client.get("Atlantis", datetime.now(), session=http_session_mock)
+
+    assert type(exc_info.value).__name__ == "WeatherDataError"
+    assert api_client.metrics()["retries_total"] == 0
+
+
+async def test_group_client_batches_known_cities():
+    payloads = {
+        "City1": {**city_payload_1, "id": 1, "name": "City1"},
+        "City2": {**city_payload_2, "id": 2, "name": "City2"},
+    }
+    for payload in payloads.values():
+        payload.pop("timestamp")
+
+    requested_urls = []
+
+    def session_get(url):
+        requested_urls.append(url)
+        if "/group?" in url:
+            body = {"cnt": 2, "list": list(payloads.values())}
+        else:
+            body = payloads[url.split("q=")[1].split("&")[0]]
+        context = mock.MagicMock()
+        context.__aenter__.return_value = make_response_mock(status=200, body=body)
+        return context
+
+    http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
+    http_session_mock.get.side_effect = session_get
+    api_client = OpenweathermapGroupAPIClient(api_key="key", batch_window=0.01)
+
+    for _ in range(2):
+        timestamp = datetime.now()
+        dto_list = await asyncio.gather(
+            *(
+                api_client.get(city, timestamp, session=http_session_mock)
+                for city in payloads
+            )
+        )
+        assert [dto.get("name") for dto in dto_list] == ["City1", "City2"]
+        assert all(dto.get("timestamp") == timestamp for dto in dto_list)
+
+    assert len(requested_urls) == 3
+    assert "/group?id=1,2&" in requested_urls[-1]
+
+
+async def test_by_city_client_queries_resolved_cities_by_id():
+    requested_urls = []
+
+    def session_get(url):
+        requested_urls.append(url)
+        status = 404 if "?id=1&" in url else 200
+        context = mock.MagicMock()
+        context.__aenter__.return_value = make_response_mock(
+            status=status, body=response_data
+        )
+        return context
+
+    http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
+    http_session_mock.get.side_effect = session_get
+    city_resolver = InMemoryCityResolutionCache()
+    api_client = OpenweathermapByCityAPIClient(
+        api_key="key", city_resolver=city_resolver
+    )
+    city = response_data.get("name")
+
+    await api_client.get(city, datetime.now(), session=http_session_mock)
+    assert city_resolver.get(city).id == response_data.get("id")
+
+    await api_client.get(city, datetime.now(), session=http_session_mock)
+    assert f"?id={response_data.get('id')}&" in requested_urls[-1]
+
+    # A rejected cached ID is dropped and the city is resolved by name again
+    city_resolver.put(city, city_resolver.get(city)._replace(id=1))
+    await api_client.get(city, datetime.now(), session=http_session_mock)
+    assert "?q=" in requested_urls[-1]
+    assert city_resolver.get(city).id == response_data.get("id")
+
+
+async def test_get_weather_data_fails_fast_while_circuit_is_open():
+    circuit_breaker = SlidingWindowCircuitBreaker(
+        name="test", window_size=2, min_calls=2, open_timeout=60
+    )
+    api_client = OpenweathermapByCityAPIClient(
+        api_key="key",
+        retry_policy=RetryPolicy(max_attempts=5, base_delay=0.001, max_delay=0.001),
+        circuit_breaker=circuit_breaker,
+    )
+    http_session_mock = mock.MagicMock(spec=aiohttp.ClientSession)
+    http_session_mock.get.return_value.__aenter__.side_effect = (
+        aiohttp.ClientConnectionError()
+    )
+
+    with pytest.raises(Exception) as exc_info:
+        await api_client.get(
+            response_data.get("name"), datetime.now(), session=http_session_mock
+        )
+
+    assert type(exc_info.value).__name__ == "CircuitOpenError"
+    assert api_client.metrics()["requests_total"] == 2
+    assert not api_client.is_available()
@@ -0,0 +1,64 @@
+import pytest
+
+from src.circuit_breakers.realisations import SlidingWindowCircuitBreaker
+
+
+def make_breaker(clock, **kwargs):
+    params = dict(
+        name="test",
+        window_size=4,
+        min_calls=4,
+        failure_rate_threshold=0.5,
+        slow_call_duration=1.0,
+        slow_call_rate_threshold=1.0,
+        open_timeout=10,
+        half_open_probes=2,
+        clock=clock,
+    )
+    params.update(kwargs)
+    return SlidingWindowCircuitBreaker(**params)
+
+
+def test_circuit_breaker_opens_and_closes_after_probes(clock):
+    breaker = make_breaker(clock)
+
+    for failed in (False, True, False, True):
+        breaker.acquire()
+        if failed:
+            breaker.record_failure(duration=0.1)
+        else:
+            breaker.record_success(duration=0.1)
+
+    assert breaker.state.value == "open"
+    assert not breaker.is_available()
+    with pytest.raises(Exception) as exc_info:
+        breaker.acquire()
+    assert type(exc_info.value).__name__ == "CircuitOpenError"
+
+    clock.now = 10
+    assert breaker.state.value == "half_open"
+    breaker.acquire()
+    breaker.acquire()
+    # Only half_open_probes calls are let through while half-open
+    with pytest.raises(Exception):
+        breaker.acquire()
+
+    breaker.record_success(duration=0.1)
+    breaker.record_success(duration=0.1)
+    assert breaker.state.value == "closed"
+    assert breaker.metrics()["rejected_total"] == 2
+
+
+def test_circuit_breaker_opens_on_slow_calls_and_reopens_on_failed_probe(clock):
+    breaker = make_breaker(clock)
+
+    for _ in range(4):
+        breaker.acquire()
+        breaker.record_success(duration=5.0)
+    assert breaker.state.value == "open"
+
+    clock.now = 10
+    breaker.acquire()
+    breaker.record_failure(duration=0.1)
+    assert breaker.state.value == "open"
+    assert breaker.metrics()["opened_total"] == 2
@@ -0,0 +1,54 @@
+import json
+import time
+
+from src.city_resolvers.realisations import (
+    InMemoryCityResolutionCache,
+    JsonFileCityResolutionCache,
+)
+from src.models.domains import CityLocation
+
+
+def test_json_city_cache_persists_locations(tmp_path):
+    filepath = str(tmp_path / "cache" / "city_locations.json")
+    location = CityLocation(id=1792947, lat=39.1422, lon=117.1767, resolved_at=1.0)
+
+    city_cache = JsonFileCityResolutionCache(filepath=filepath, save_interval=3600)
+    city_cache.put("Tianjin", location)
+    city_cache.save()
+
+    with open(filepath, encoding="utf-8") as file:
+        assert json.load(file)["Tianjin"]["id"] == 1792947
+    assert JsonFileCityResolutionCache(filepath=filepath).get("Tianjin") == location
+
+
+def test_city_cache_expires_and_invalidates_locations():
+    city_cache = InMemoryCityResolutionCache(ttl=60)
+    city_cache.put("Osaka", CityLocation(id=1, lat=0.0, lon=0.0, resolved_at=0.0))
+    city_cache.put(
+        "Tokyo", CityLocation(id=2, lat=0.0, lon=0.0, resolved_at=time.time())
+    )
+
+    assert city_cache.get("Osaka") is None
+    assert city_cache.get("Tokyo").id == 2
+
+    city_cache.invalidate("Tokyo")
+    assert city_cache.get("Tokyo") is None
+
+    city_cache.put("Tokyo", CityLocation(id=2, lat=0.0, lon=0.0, resolved_at=0.0))
+    city_cache.invalidate()
+    assert len(city_cache) == 0
+
+
+def test_json_city_cache_merges_cities_saved_by_other_processes(tmp_path):
+    filepath = str(tmp_path / "city_locations.json")
+    first = JsonFileCityResolutionCache(filepath=filepath, save_interval=3600)
+    second = JsonFileCityResolutionCache(filepath=filepath, save_interval=3600)
+
+    first.put("Osaka", CityLocation(id=1, lat=0.0, lon=0.0, resolved_at=time.time()))
+    first.save()
+    second.put("Tokyo", CityLocation(id=2, lat=0.0, lon=0.0, resolved_at=time.time()))
+    second.save()
+
+    city_cache = JsonFileCityResolutionCache(filepath=filepath)
+    assert city_cache.get("Osaka").id == 1
+    assert city_cache.get("Tokyo").id == 2
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from sqlalchemy import insert
+
+from src.city_sources.realisations import (
+    CityORMModel,
+    CsvFileCitySource,
+    DatabaseCitySource,
+    JsonlFileCitySource,
+)
+
+
+@pytest.fixture
+def tables():
+    return [CityORMModel.__table__]
+
+
+async def collect(city_source):
+    return [record async for record in city_source.iter_cities()]
+
+
+async def test_csv_source_streams_enabled_cities_in_chunks(tmp_path):
+    filepath = tmp_path / "cities.csv"
+    filepath.write_text(
+        "name,enabled,priority,poll_interval\n"
+        "Tokyo,yes,5,300\n"
+        "Delhi,no,,\n"
+        "Osaka,,,\n"
+        "Paris,yes,1,\n",
+        encoding="utf-8",
+    )
+
+    records = await collect(CsvFileCitySource(filepath=str(filepath), chunk_size=2))
+
+    assert [record.name for record in records] == ["Tokyo", "Osaka", "Paris"]
+    assert records[0].priority == 5
+    assert records[0].poll_interval == 300.0
+    assert records[1].poll_interval is None
+
+
+async def test_jsonl_source_skips_blank_lines(tmp_path):
+    filepath = tmp_path / "cities.jsonl"
+    filepath.write_text(
+        json.dumps({"name": "Tokyo"})
+        + "\n\n"
+        + json.dumps({"name": "Delhi", "enabled": False})
+        + "\n"
+        + json.dumps({"name": "Osaka", "priority": 3})
+        + "\n",
+        encoding="utf-8",
+    )
+
+    records = await collect(JsonlFileCitySource(filepath=str(filepath)))
+
+    assert [(record.name, record.priority) for record in records] == [
+        ("Tokyo", 0),
+        ("Osaka", 3),
+    ]
+
+
+async def test_file_source_reports_malformed_records(tmp_path):
+    filepath = tmp_path / "cities.jsonl"
+    filepath.write_text('{"name": "Tokyo"}\n{"priority": 1}\n', encoding="utf-8")
+
+    with pytest.raises(Exception) as exc_info:
+        await collect(JsonlFileCitySource(filepath=str(filepath)))
+
+    assert type(exc_info.value).__name__ == "CitiesRetrievalError"
+    assert "line 2" in str(exc_info.value)
+
+
+async def test_database_source_pages_by_priority(session_factory):
+    async with session_factory() as session:
+        async with session.begin():
+            await session.execute(
+                insert(CityORMModel),
+                [
+                    {"name": "Tokyo", "priority": 1},
+                    {"name": "Delhi", "priority": 5},
+                    {"name": "Osaka", "priority": 1, "enabled": False},
+                    {"name": "Paris", "priority": 1},
+                    {"name": "Cairo", "priority": 0},
+                ],
+            )
+
+    records = await collect(
+        DatabaseCitySource(async_session_factory=session_factory, chunk_size=2)
+    )
+
+    assert [record.name for record in records] == ["Delhi", "Tokyo", "Paris", "Cairo"]
@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from payloads import city_payload_1
+
+from src.apiclients.realisations import OpenweathermapByCityAPIClient
+from src.coordinators.realisations import PostgresLeaseCoordinator, ShardLeaseORMModel
+from src.fetch_engines.realisations import QueueFetchEngine
+from src.mappers.realisations import OpenweathermapWeatherMapper
+from src.master import MasterService, WeatherDataError
+
+
+@pytest.fixture
+def tables():
+    return [ShardLeaseORMModel.__table__]
+
+
+def make_coordinator(session_factory, node_id, **kwargs):
+    params = dict(shard_count=3, lease_ttl=60, recollect_after=3600)
+    params.update(kwargs)
+    return PostgresLeaseCoordinator(
+        async_session_factory=session_factory, node_id=node_id, **params
+    )
+
+
+async def test_nodes_claim_distinct_shards(session_factory):
+    node_a = make_coordinator(session_factory, "a")
+    node_b = make_coordinator(session_factory, "b")
+
+    claimed = [
+        await node_a.claim(),
+        await node_b.claim(),
+        await node_a.claim(),
+        await node_b.claim(),
+    ]
+
+    assert claimed == [0, 1, 2, None]
+
+
+async def test_collected_shards_are_not_claimed_until_due(session_factory):
+    node = make_coordinator(session_factory, "a", shard_count=2)
+
+    shard_index = await node.claim()
+    async with node.lease(shard_index):
+        pass
+    with pytest.raises(RuntimeError):
+        async with node.lease(await node.claim()):
+            raise RuntimeError("collection failed")
+
+    # The failed shard was released, the collected one is not due yet
+    assert await node.claim() == 1
+    assert await node.claim() is None
+
+
+async def test_expired_lease_of_dead_node_is_claimed_again(session_factory):
+    dead_node = make_coordinator(session_factory, "dead", lease_ttl=0.05)
+    node = make_coordinator(session_factory, "alive", shard_count=1)
+
+    assert await dead_node.claim() == 0
+    assert await node.claim() is None
+
+    await asyncio.sleep(0.1)
+    assert await node.claim() == 0
+
+
+def make_master_service(coordinator, city_source, stored, failing=(), **kwargs):
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        if city in failing:
+            raise WeatherDataError("Service is unavailable")
+        return {**city_payload_1, "name": city, "timestamp": timestamp}
+
+    weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
+    weather_client_mock.get.side_effect = func_process
+    weather_client_mock.is_available.return_value = True
+    weather_client_mock.metrics.return_value = {}
+
+    async def bulk_store_data(data_lst) -> int:
+        stored.extend(weather.city for weather in data_lst)
+        return len(data_lst)
+
+    storage_service_mock = mock.Mock()
+    storage_service_mock.bulk_store_data = mock.AsyncMock(side_effect=bulk_store_data)
+    storage_services_manager_mock = mock.Mock()
+    storage_services_manager_mock.get_selected_storage_services.return_value = [
+        storage_service_mock
+    ]
+
+    return MasterService(
+        weather_client=weather_client_mock,
+        fetch_engine=QueueFetchEngine(
+            weather_client=weather_client_mock, workers=1, queue_size=1
+        ),
+        client_storage_mapper=OpenweathermapWeatherMapper(),
+        storage_services_manager=storage_services_manager_mock,
+        coordinator=coordinator,
+        city_source=city_source,
+        **kwargs,
+    )
+
+
+async def test_failed_shard_does_not_stop_the_other_shards(
+    session_factory, make_city_source
+):
+    stored = []
+    master_service = make_master_service(
+        coordinator=make_coordinator(session_factory, "a"),
+        city_source=make_city_source(["Tokyo", "Delhi", "Osaka"]),
+        stored=stored,
+        failing={"Delhi"},
+    )
+
+    summary = await master_service.run_cycle()
+
+    assert sorted(stored) == ["Osaka", "Tokyo"]
+    assert (summary.ok, summary.failed_shards) == (2, 1)
+    # The failed shard was released for the other nodes
+    assert await make_coordinator(session_factory, "b").claim() == 1
+
+
+async def test_worker_processes_collect_whole_claimed_shards(
+    session_factory, make_city_source
+):
+    cities = [f"City{i}" for i in range(12)]
+    stored = []
+    # Two worker processes of a node, both coordinated through the leases
+    workers = [
+        make_master_service(
+            coordinator=make_coordinator(session_factory, f"worker{shard_index}"),
+            city_source=make_city_source(cities),
+            stored=stored,
+            shard_index=shard_index,
+            shard_count=2,
+        )
+        for shard_index in range(2)
+    ]
+
+    summaries = await asyncio.gather(*(worker.run_cycle() for worker in workers))
+
+    assert sorted(stored) == sorted(cities)
+    assert sum(summary.ok for summary in summaries) == len(cities)
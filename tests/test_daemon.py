@@ -0,0 +1,65 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.master import MasterService
+from src.models.results import RunSummary
+
+
+def make_master_service(interval: float) -> MasterService:
+    return MasterService(
+        weather_client=mock.Mock(),
+        fetch_engine=mock.Mock(),
+        client_storage_mapper=mock.Mock(),
+        storage_services_manager=mock.Mock(),
+        interval=interval,
+        city_source=mock.Mock(),
+    )
+
+
+async def test_missed_ticks_are_skipped_instead_of_queued():
+    master_service = make_master_service(interval=0.05)
+    loop = asyncio.get_running_loop()
+    started = []
+
+    async def slow_cycle():
+        started.append(loop.time())
+        if len(started) == 3:
+            master_service.stop()
+        # Every cycle overruns two ticks
+        await asyncio.sleep(0.12)
+        return RunSummary()
+
+    with mock.patch.object(master_service, "run_cycle", side_effect=slow_cycle):
+        await asyncio.wait_for(master_service.run_forever(), timeout=2)
+
+    assert len(started) == 3
+    for previous, current in zip(started, started[1:]):
+        # The next cycle waits for the next tick at 0.15s instead of starting
+        # right away to catch up with the missed ones
+        assert current - previous == pytest.approx(0.15, abs=0.02)
+
+
+async def test_stop_ends_the_loop_after_the_current_cycle():
+    master_service = make_master_service(interval=600)
+    cycle_started = asyncio.Event()
+    finished = []
+
+    async def slow_cycle():
+        cycle_started.set()
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        return RunSummary()
+
+    with mock.patch.object(
+        master_service, "run_cycle", side_effect=slow_cycle
+    ) as run_cycle:
+        daemon = asyncio.create_task(master_service.run_forever())
+        await cycle_started.wait()
+        master_service.stop()
+        # The loop neither waits for the next tick nor starts another cycle
+        await asyncio.wait_for(daemon, timeout=1)
+
+    assert run_cycle.call_count == 1
+    assert finished == [True]
@@ -0,0 +1,259 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from src.mappers.realisations import WeatherDatabaseMapper
+from src.models.domains import WeatherDomain
+from src.repositories.realisations import (
+    WeatherBatch,
+    WeatherDatabaseRepository,
+    WeatherORMModel,
+)
+
+
+def make_weather_list(count: int) -> list[WeatherDomain]:
+    start = datetime(2026, 1, 1)
+    return [
+        WeatherDomain(
+            timestamp=start + timedelta(minutes=i),
+            city=f"City{i % 3}",
+            temperature=i - 10,
+            weather_type="Ясно" if i % 2 else "Снег",
+            sunrise=time(6, 30),
+            sunset=time(18, 45),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("ingest_mode", ["insert", "copy"])
+async def test_weather_rows_are_added(session_factory, ingest_mode):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(), ingest_mode=ingest_mode
+    )
+    weather_list = make_weather_list(10)
+
+    async with session_factory() as session:
+        repository.set_session(session)
+        await repository.add_all(data_list=weather_list)
+        await session.commit()
+        repository.clear_session()
+
+    async with session_factory() as session:
+        rows = (
+            await session.execute(
+                select(
+                    WeatherORMModel.city,
+                    WeatherORMModel.temperature,
+                    WeatherORMModel.weather_type,
+                ).order_by(WeatherORMModel.timestamp)
+            )
+        ).all()
+
+    assert [(row.city, row.temperature, row.weather_type.value) for row in rows] == [
+        (weather.city, weather.temperature, weather.weather_type.value)
+        for weather in weather_list
+    ]
+
+
+async def test_copied_rows_are_rolled_back_with_the_session(session_factory):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(), ingest_mode="copy"
+    )
+
+    async with session_factory() as session:
+        repository.set_session(session)
+        await repository.add_all(data_list=make_weather_list(5))
+        await session.rollback()
+        repository.clear_session()
+
+    async with session_factory() as session:
+        count = await session.scalar(select(func.count()).select_from(WeatherORMModel))
+
+    assert count == 0
+
+
+async def add_all(session_factory, repository, weather_list):
+    async with session_factory() as session:
+        repository.set_session(session)
+        try:
+            result = await repository.add_all(data_list=weather_list)
+            await session.commit()
+        finally:
+            repository.clear_session()
+    return result
+
+
+@pytest.mark.parametrize("ingest_mode", ["insert", "copy"])
+@pytest.mark.parametrize(
+    "conflict_policy, expected, temperature",
+    [("nothing", (1, 0, 4), -10), ("update", (1, 4, 0), 30)],
+)
+async def test_batches_can_be_sent_again(
+    session_factory, ingest_mode, conflict_policy, expected, temperature
+):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(),
+        ingest_mode=ingest_mode,
+        conflict_policy=conflict_policy,
+    )
+    weather_list = make_weather_list(5)
+    first_result = await add_all(session_factory, repository, weather_list[:4])
+
+    weather_list[0] = weather_list[0].model_copy(update={"temperature": 30})
+    second_result = await add_all(session_factory, repository, weather_list)
+
+    assert (first_result.inserted, first_result.skipped) == (4, 0)
+    assert (
+        second_result.inserted,
+        second_result.updated,
+        second_result.skipped,
+    ) == expected
+    async with session_factory() as session:
+        stored_temperature = await session.scalar(
+            select(WeatherORMModel.temperature).where(
+                WeatherORMModel.timestamp == weather_list[0].timestamp,
+                WeatherORMModel.city == weather_list[0].city,
+            )
+        )
+    assert stored_temperature == temperature
+
+
+@pytest.mark.parametrize("ingest_mode", ["insert", "copy"])
+async def test_duplicate_rows_fail_the_batch_by_default(session_factory, ingest_mode):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(), ingest_mode=ingest_mode
+    )
+    weather_list = make_weather_list(3)
+    await add_all(session_factory, repository, weather_list)
+
+    with pytest.raises(Exception) as exc_info:
+        await add_all(session_factory, repository, weather_list)
+
+    assert type(exc_info.value).__name__ == "DatabaseError"
+
+
+async def test_duplicates_within_a_batch_are_updated_once(session_factory):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(), conflict_policy="update"
+    )
+    weather = make_weather_list(1)[0]
+
+    result = await add_all(
+        session_factory,
+        repository,
+        [weather, weather.model_copy(update={"temperature": 25})],
+    )
+
+    assert (result.inserted, result.updated, result.skipped) == (1, 0, 1)
+    async with session_factory() as session:
+        stored_temperature = await session.scalar(select(WeatherORMModel.temperature))
+    # The last of the duplicates wins
+    assert stored_temperature == 25
+
+
+@pytest.mark.parametrize("ingest_mode", ["insert", "copy"])
+async def test_weather_batches_are_added(session_factory, ingest_mode):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(),
+        ingest_mode=ingest_mode,
+        conflict_policy="update",
+        chunk_size=2,
+    )
+    weather_list = make_weather_list(5)
+    duplicate = weather_list[0].model_copy(update={"temperature": 30})
+
+    result = await add_all(
+        session_factory,
+        repository,
+        WeatherBatch([weather_list[0], duplicate] + weather_list[1:]),
+    )
+
+    assert (result.inserted, result.updated, result.skipped) == (5, 0, 1)
+    async with session_factory() as session:
+        rows = (
+            await session.execute(
+                select(WeatherORMModel.city, WeatherORMModel.temperature).order_by(
+                    WeatherORMModel.timestamp
+                )
+            )
+        ).all()
+    assert [tuple(row) for row in rows] == [("City0", 30)] + [
+        (weather.city, weather.temperature) for weather in weather_list[1:]
+    ]
+
+
+async def test_rows_are_inserted_in_chunks(session_factory):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(), conflict_policy="nothing", chunk_size=2
+    )
+    weather_list = make_weather_list(7)
+    await add_all(session_factory, repository, weather_list[:3])
+
+    result = await add_all(
+        session_factory, repository, (weather for weather in weather_list)
+    )
+
+    assert (result.inserted, result.skipped) == (4, 3)
+    async with session_factory() as session:
+        count = await session.scalar(select(func.count()).select_from(WeatherORMModel))
+    assert count == 7
+
+
+async def test_service_commits_each_transaction(container, session_factory):
+    database_service = container.storage_services.storage_services_list_provider()[0]
+    repository = container.repositories.database_repositories_list_provider()[0]
+    conflict_policy = repository.conflict_policy
+    weather_list = make_weather_list(6)
+    await add_all(session_factory, repository, weather_list[3:4])
+
+    repository.conflict_policy = "error"
+    database_service.transaction_size = 2
+    try:
+        # The second transaction fails on the row stored above
+        stored = await database_service.bulk_store_data(data_lst=weather_list)
+    finally:
+        repository.conflict_policy = conflict_policy
+        database_service.transaction_size = None
+
+    async with session_factory() as session:
+        timestamps = (
+            await session.scalars(
+                select(WeatherORMModel.timestamp).order_by(WeatherORMModel.timestamp)
+            )
+        ).all()
+    assert stored == 2
+    assert timestamps == [weather.timestamp for weather in weather_list[:2]] + [
+        weather_list[3].timestamp
+    ]
+
+
+async def test_rows_are_streamed_in_pages(session_factory):
+    repository = WeatherDatabaseRepository(
+        mapper=WeatherDatabaseMapper(), page_size=3, fetch_size=2
+    )
+    # Three cities share each timestamp, so the pages are split between them
+    weather_list = [
+        weather.model_copy(
+            update={"timestamp": datetime(2026, 1, 1) + timedelta(minutes=i // 3)}
+        )
+        for i, weather in enumerate(make_weather_list(8))
+    ]
+    await add_all(session_factory, repository, weather_list)
+
+    async with session_factory() as session:
+        repository.set_session(session)
+        streamed = [weather async for weather in repository.stream_all()]
+        found = await repository.find_all(city="City1")
+        async for first in repository.stream_all(city="City2"):
+            break
+        repository.clear_session()
+
+    assert [weather.model_dump() for weather in streamed] == [
+        weather.model_dump() for weather in weather_list
+    ]
+    assert [weather.model_dump() for weather in found] == [
+        weather.model_dump() for weather in weather_list if weather.city == "City1"
+    ]
+    assert first.model_dump() == weather_list[2].model_dump()
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+
+import pytest
+from payloads import response_data
+
+from src.apiclients.decoders import JSON_DECODERS, create_json_decoder
+from src.mappers.realisations import OpenweathermapWeatherMapper
+
+
+@pytest.mark.parametrize("backend", list(JSON_DECODERS))
+def test_json_decoders_decode_response_bytes(backend):
+    try:
+        json_decoder = create_json_decoder(backend=backend)
+    except ImportError:
+        pytest.skip(f"{backend} is not installed")
+
+    body = json.dumps(response_data).encode()
+
+    assert json_decoder.decode_weather(body) == response_data
+    with pytest.raises(Exception) as exc_info:
+        json_decoder.decode(b"{not json")
+    assert type(exc_info.value).__name__ == "WeatherParsingError"
+
+
+def test_typed_msgspec_decoder_feeds_the_mapper():
+    pytest.importorskip("msgspec")
+    json_decoder = create_json_decoder(backend="msgspec", typed=True)
+    timestamp = datetime(2024, 2, 6, 21, 11, 30)
+
+    struct = json_decoder.decode_weather(json.dumps(response_data).encode())
+    struct["timestamp"] = timestamp
+    weather = OpenweathermapWeatherMapper().to_target(struct)
+
+    expected = dict(response_data, timestamp=timestamp)
+    assert weather == OpenweathermapWeatherMapper().to_target(expected)
+    assert struct.get("coord")["lat"] == response_data["coord"]["lat"]
+
+    group = json_decoder.decode_group(
+        json.dumps({"cnt": 1, "list": [response_data]}).encode()
+    )
+    assert group["list"][0]["id"] == response_data["id"]
@@ -0,0 +1,54 @@
+import asyncio
+from datetime import datetime
+from unittest import mock
+
+from src.apiclients.realisations import OpenweathermapByCityAPIClient
+from src.exceptions import WeatherFetchingError
+from src.fetch_engines.realisations import QueueFetchEngine
+
+
+async def test_fetch_engine_bounds_concurrency():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return {"name": city, "timestamp": timestamp}
+
+    weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
+    weather_client_mock.get.side_effect = func_process
+
+    engine = QueueFetchEngine(
+        weather_client=weather_client_mock, workers=3, queue_size=2
+    )
+    cities = (f"City{i}" for i in range(50))
+    results = [result async for result in engine.fetch(cities, datetime.now())]
+
+    assert sorted(result.city for result in results) == sorted(
+        f"City{i}" for i in range(50)
+    )
+    assert all(result.ok and result.latency >= 0 for result in results)
+    assert max_in_flight == 3
+
+
+async def test_fetch_engine_reports_errors_per_city():
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        if city == "Bad":
+            raise WeatherFetchingError("boom")
+        return {"name": city, "timestamp": timestamp}
+
+    weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
+    weather_client_mock.get.side_effect = func_process
+
+    engine = QueueFetchEngine(
+        weather_client=weather_client_mock, workers=2, queue_size=4
+    )
+    results = [result async for result in engine.fetch(("Good", "Bad"), datetime.now())]
+
+    by_city = {result.city: result for result in results}
+    assert by_city["Good"].ok
+    assert isinstance(by_city["Bad"].error, WeatherFetchingError)
@@ -0,0 +1,233 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from payloads import city_payload_1, city_payload_2, response_data
+from sqlalchemy import event
+
+from src.mappers.realisations import (
+    JsonMapper,
+    OpenweathermapWeatherMapper,
+    TextfileMapper,
+    WeatherDatabaseMapper,
+    WeatherDomain,
+    WeatherRecord,
+)
+from src.repositories.realisations import (
+    TextfileRepository,
+    WeatherBatch,
+    WeatherDatabaseRepository,
+    WeatherORMModel,
+)
+
+
+def make_dto_list(count: int) -> list[dict]:
+    payloads = [city_payload_1, city_payload_2, response_data]
+    timestamp = city_payload_1["timestamp"]
+    dto_list = []
+    for i in range(count):
+        payload = payloads[i % len(payloads)]
+        dto_list.append(
+            {
+                **payload,
+                "name": f"City{i}",
+                "main": {**payload["main"], "temp": payload["main"]["temp"] + i / 7},
+                "sys": {
+                    **payload["sys"],
+                    "sunrise": payload["sys"]["sunrise"] + 61 * i,
+                    "sunset": payload["sys"]["sunset"] - 59 * i,
+                },
+                "timestamp": timestamp + timedelta(seconds=i % 2),
+            }
+        )
+    return dto_list
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_batch_matches_the_per_row_mapping(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    mapper = OpenweathermapWeatherMapper(use_numpy=use_numpy)
+    dto_list = make_dto_list(50)
+
+    weather_list = mapper.to_target_many(dto_list)
+
+    assert weather_list == [mapper.to_target(dto) for dto in dto_list]
+    assert all(type(weather.temperature) is int for weather in weather_list)
+
+
+def test_sunrise_far_apart_is_mapped_per_row():
+    mapper = OpenweathermapWeatherMapper(use_numpy=False)
+    dto_list = make_dto_list(3)
+    dto_list[2]["sys"] = {**dto_list[2]["sys"], "sunrise": 1720000000}
+
+    assert mapper.to_target_many(dto_list) == [
+        mapper.to_target(dto) for dto in dto_list
+    ]
+
+
+@pytest.mark.parametrize("broken_index", [0, 2])
+def test_broken_dtos_are_reported_and_skipped(broken_index):
+    mapper = OpenweathermapWeatherMapper()
+    dto_list = make_dto_list(4)
+    del dto_list[broken_index]["main"]
+    failures = []
+
+    weather_list = mapper.to_target_many(
+        dto_list, on_error=lambda dto, e: failures.append((dto["name"], e))
+    )
+
+    assert [weather.city for weather in weather_list] == [
+        dto["name"] for i, dto in enumerate(dto_list) if i != broken_index
+    ]
+    assert [name for name, _ in failures] == [f"City{broken_index}"]
+    assert type(failures[0][1]).__name__ == "MappingError"
+
+    with pytest.raises(Exception) as exc_info:
+        mapper.to_target_many(dto_list)
+    assert type(exc_info.value).__name__ == "MappingError"
+
+
+def test_unknown_weather_type_in_the_first_dto_is_reported():
+    mapper = OpenweathermapWeatherMapper()
+    dto_list = make_dto_list(3)
+    dto_list[0]["weather"] = [{"main": "Meteors"}]
+    failures = []
+
+    weather_list = mapper.to_target_many(
+        dto_list, on_error=lambda dto, e: failures.append(dto["name"])
+    )
+
+    assert [weather.city for weather in weather_list] == ["City1", "City2"]
+    assert failures == ["City0"]
+
+
+def test_every_broken_dto_is_reported_once():
+    mapper = OpenweathermapWeatherMapper()
+    dto_list = make_dto_list(5)
+    del dto_list[0]["main"]
+    del dto_list[1]["sys"]
+    dto_list[2]["name"] = None
+    failures = []
+
+    weather_list = mapper.to_target_many(
+        dto_list, on_error=lambda dto, e: failures.append(dto["name"])
+    )
+
+    assert failures == ["City0", "City1", None]
+    assert weather_list == [mapper.to_target(dto) for dto in dto_list[3:]]
+
+
+@pytest.mark.parametrize(
+    "field, value, is_valid",
+    [
+        ("name", None, False),
+        ("name", 12345, False),
+        ("timestamp", "2024-02-06", False),
+        ("main", {"temp": "266.5"}, False),
+        ("main", {"temp": float("nan")}, False),
+        ("sys", {"sunrise": 1707261198.5, "sunset": 1707298648}, True),
+    ],
+)
+def test_values_of_unexpected_types_are_validated(field, value, is_valid):
+    mapper = OpenweathermapWeatherMapper()
+    dto_list = make_dto_list(3)
+    dto_list[1][field] = value
+    failures = []
+
+    batch = mapper.to_batch(
+        dto_list, on_error=lambda dto, e: failures.append(type(e).__name__)
+    )
+
+    expected = dto_list if is_valid else [dto_list[0], dto_list[2]]
+    assert list(batch) == [mapper.to_target(dto) for dto in expected]
+    assert failures == ([] if is_valid else ["MappingError"])
+
+
+def test_batch_is_mapped_into_columns():
+    mapper = OpenweathermapWeatherMapper()
+    dto_list = make_dto_list(10)
+    del dto_list[3]["name"]
+    failures = []
+
+    batch = mapper.to_batch(
+        dto_list, on_error=lambda dto, e: failures.append(type(e).__name__)
+    )
+
+    assert type(batch).__name__ == "WeatherBatch"
+    assert list(batch) == mapper.to_target_many(dto_list[:3] + dto_list[4:])
+    assert failures == ["MappingError"]
+
+
+@pytest.mark.parametrize(
+    "mapper", [TextfileMapper(), JsonMapper()], ids=lambda mapper: type(mapper).__name__
+)
+def test_records_are_mapped_like_domain_objects(mapper):
+    weather = WeatherDomain(
+        timestamp=datetime(2024, 2, 6, 21, 11, 30),
+        city="Tokyo",
+        temperature=-3,
+        weather_type="Снег",
+        sunrise=time(6, 33, 18),
+        sunset=time(17, 17, 28),
+    )
+    record = WeatherRecord.from_domain(weather)
+
+    assert record.to_domain() == weather
+    assert mapper.to_entity(record) == mapper.to_entity(weather)
+
+
+def test_database_rows_are_built_without_entities():
+    mapper = WeatherDatabaseMapper()
+    weather = OpenweathermapWeatherMapper().to_target(city_payload_1)
+    record = WeatherRecord.from_domain(weather)
+
+    entity = mapper.to_entity(record)
+    row = mapper.to_row(record)
+
+    assert row == weather.model_dump()
+    assert row == {column: getattr(entity, column) for column in row}
+    assert set(row) == set(entity.__table__.c.keys()) - {"id"}
+
+
+async def test_database_rows_round_trip_without_entities(session_factory):
+    weather_list = OpenweathermapWeatherMapper().to_target_many(make_dto_list(5))
+    repository = WeatherDatabaseRepository(mapper=WeatherDatabaseMapper())
+    entities = []
+
+    def on_entity(target, *args):
+        entities.append(target)
+
+    # "init" is fired for the entities built by the mappers, "load" for the
+    # ones built by the queries
+    event.listen(WeatherORMModel, "init", on_entity)
+    event.listen(WeatherORMModel, "load", on_entity)
+    try:
+        async with session_factory() as session:
+            repository.set_session(session)
+            await repository.add_all(data_list=WeatherBatch(weather_list))
+            found = await repository.find_all()
+            repository.clear_session()
+    finally:
+        event.remove(WeatherORMModel, "init", on_entity)
+        event.remove(WeatherORMModel, "load", on_entity)
+
+    assert entities == []
+    assert sorted(found, key=lambda weather: weather.city) == sorted(
+        weather_list, key=lambda weather: weather.city
+    )
+
+
+async def test_file_repository_writes_a_batch_like_a_list(tmp_path):
+    weather_list = OpenweathermapWeatherMapper().to_target_many(make_dto_list(3))
+    contents = []
+    for name, data_list in (
+        ("list", weather_list),
+        ("batch", WeatherBatch(weather_list)),
+    ):
+        filepath = tmp_path / name / "meteo.txt"
+        repository = TextfileRepository(filepath=str(filepath), mapper=TextfileMapper())
+        await repository.add_all(data_list=data_list)
+        contents.append(filepath.read_text(encoding="utf-8"))
+
+    assert contents[0] == contents[1]
+    assert contents[0].count("City: ") == 3
@@ -0,0 +1,161 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from payloads import city_payload_1
+
+from src.apiclients.realisations import OpenweathermapByCityAPIClient
+from src.exceptions import FileWriteError
+from src.fetch_engines.realisations import QueueFetchEngine
+from src.mappers.realisations import OpenweathermapWeatherMapper
+from src.master import MasterService
+from src.observation_indexes.realisations import (
+    InMemoryObservationIndex,
+    JsonFileObservationIndex,
+)
+from src.pipelines.realisations import StreamingPipeline
+from src.storage_services.realisations import FileService
+
+
+def test_observations_are_skipped_once_committed():
+    observation_index = InMemoryObservationIndex()
+
+    assert observation_index.is_new(city="Tokyo", observed_at=100)
+    # Not stored yet, so the same observation is still new
+    assert observation_index.is_new(city="Tokyo", observed_at=100)
+
+    observation_index.commit(cities=["Tokyo"])
+
+    assert not observation_index.is_new(city="Tokyo", observed_at=100)
+    assert not observation_index.is_new(city="Tokyo", observed_at=90)
+    assert observation_index.is_new(city="Tokyo", observed_at=110)
+
+
+def test_file_index_is_merged_with_other_processes(tmp_path):
+    filepath = tmp_path / "observations.json"
+    first = JsonFileObservationIndex(filepath=str(filepath), save_interval=3600)
+    second = JsonFileObservationIndex(filepath=str(filepath), save_interval=3600)
+
+    first.is_new(city="Tokyo", observed_at=100)
+    first.commit(cities=["Tokyo"])
+    first.save()
+    second.is_new(city="Tokyo", observed_at=50)
+    second.is_new(city="Delhi", observed_at=200)
+    second.commit(cities=["Tokyo", "Delhi"])
+    second.save()
+
+    assert json.loads(filepath.read_text()) == {"Tokyo": 100, "Delhi": 200}
+    reloaded = JsonFileObservationIndex(filepath=str(filepath))
+    assert not reloaded.is_new(city="Tokyo", observed_at=100)
+
+
+@pytest.mark.parametrize("mode", ["sequential", "streaming"])
+async def test_unchanged_observations_are_not_stored(mode, make_city_source):
+    observed_at = {"Tokyo": 100, "Delhi": 100, "Osaka": 100}
+
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        return {
+            **city_payload_1,
+            "name": city,
+            "dt": observed_at[city],
+            "timestamp": timestamp,
+        }
+
+    weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
+    weather_client_mock.get.side_effect = func_process
+    weather_client_mock.is_available.return_value = True
+    weather_client_mock.metrics.return_value = {}
+
+    stored = []
+
+    async def bulk_store_data(data_lst) -> int:
+        stored.append(sorted(weather.city for weather in data_lst))
+        return len(data_lst)
+
+    storage_service_mock = mock.Mock()
+    storage_service_mock.bulk_store_data = mock.AsyncMock(side_effect=bulk_store_data)
+    storage_services_manager_mock = mock.Mock()
+    storage_services_manager_mock.get_selected_storage_services.return_value = [
+        storage_service_mock
+    ]
+
+    fetch_engine = QueueFetchEngine(
+        weather_client=weather_client_mock, workers=2, queue_size=2
+    )
+    master_service = MasterService(
+        weather_client=weather_client_mock,
+        fetch_engine=fetch_engine,
+        client_storage_mapper=OpenweathermapWeatherMapper(),
+        storage_services_manager=storage_services_manager_mock,
+        partial_success=True,
+        streaming_pipeline=(
+            StreamingPipeline(
+                fetch_engine=fetch_engine,
+                client_storage_mapper=OpenweathermapWeatherMapper(),
+                mapper_workers=2,
+                queue_size=2,
+                batch_size=10,
+                flush_interval=60,
+            )
+            if mode == "streaming"
+            else None
+        ),
+        city_source=make_city_source(list(observed_at)),
+        observation_index=InMemoryObservationIndex(),
+    )
+
+    first_summary = await master_service.run_cycle()
+    second_summary = await master_service.run_cycle()
+    observed_at["Osaka"] = 200
+    third_summary = await master_service.run_cycle()
+
+    assert stored == [["Delhi", "Osaka", "Tokyo"], ["Osaka"]]
+    assert (first_summary.ok, first_summary.suppressed) == (3, 0)
+    assert (second_summary.ok, second_summary.suppressed) == (0, 3)
+    assert (third_summary.ok, third_summary.suppressed) == (1, 2)
+
+
+async def test_observations_of_a_failed_write_are_stored_again(make_city_source):
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        return {**city_payload_1, "name": city, "dt": 100, "timestamp": timestamp}
+
+    weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
+    weather_client_mock.get.side_effect = func_process
+    weather_client_mock.is_available.return_value = True
+    weather_client_mock.metrics.return_value = {}
+
+    stored = []
+
+    async def add_all(data_list) -> None:
+        if not stored:
+            stored.append(None)
+            raise FileWriteError("Disk is full")
+        stored.append(sorted(weather.city for weather in data_list))
+
+    repository_mock = mock.Mock()
+    repository_mock.add_all = mock.AsyncMock(side_effect=add_all)
+    storage_services_manager_mock = mock.Mock()
+    storage_services_manager_mock.get_selected_storage_services.return_value = [
+        FileService(repository=repository_mock, service_designation="txt")
+    ]
+
+    master_service = MasterService(
+        weather_client=weather_client_mock,
+        fetch_engine=QueueFetchEngine(
+            weather_client=weather_client_mock, workers=2, queue_size=2
+        ),
+        client_storage_mapper=OpenweathermapWeatherMapper(),
+        storage_services_manager=storage_services_manager_mock,
+        partial_success=True,
+        city_source=make_city_source(["Tokyo", "Delhi"]),
+        observation_index=InMemoryObservationIndex(),
+    )
+
+    await master_service.run_cycle()
+    second_summary = await master_service.run_cycle()
+    third_summary = await master_service.run_cycle()
+
+    assert stored == [None, ["Delhi", "Tokyo"]]
+    assert (second_summary.ok, second_summary.suppressed) == (2, 0)
+    assert (third_summary.ok, third_summary.suppressed) == (0, 2)
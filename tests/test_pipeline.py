@@ -0,0 +1,96 @@
+from datetime import datetime
+from unittest import mock
+
+from payloads import city_payload_1
+
+from src.apiclients.realisations import OpenweathermapByCityAPIClient
+from src.exceptions import WeatherFetchingError
+from src.fetch_engines.realisations import QueueFetchEngine
+from src.mappers.realisations import OpenweathermapWeatherMapper
+from src.models.results import RunSummary
+from src.pipelines.realisations import StreamingPipeline
+
+
+def make_pipeline(func_process, batch_size: int) -> StreamingPipeline:
+    weather_client_mock = mock.Mock(spec=OpenweathermapByCityAPIClient)
+    weather_client_mock.get.side_effect = func_process
+
+    return StreamingPipeline(
+        fetch_engine=QueueFetchEngine(
+            weather_client=weather_client_mock, workers=2, queue_size=2
+        ),
+        client_storage_mapper=OpenweathermapWeatherMapper(),
+        mapper_workers=2,
+        queue_size=2,
+        batch_size=batch_size,
+        flush_interval=60,
+    )
+
+
+async def test_streaming_pipeline_stores_in_batches():
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        return {**city_payload_1, "name": city, "timestamp": timestamp}
+
+    batches = []
+
+    async def store(batch):
+        batches.append([weather.city for weather in batch])
+
+    pipeline = make_pipeline(func_process, batch_size=2)
+    cities = [f"City{i}" for i in range(5)]
+    stored = await pipeline.run(cities=cities, timestamp=datetime.now(), store=store)
+
+    assert stored == 5
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert sorted(city for batch in batches for city in batch) == cities
+
+
+async def test_streaming_pipeline_records_failures():
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        if city == "Bad":
+            raise WeatherFetchingError()
+        if city == "Broken":
+            return {"name": city, "timestamp": timestamp}
+        return {**city_payload_1, "name": city, "timestamp": timestamp}
+
+    batches = []
+
+    async def store(batch):
+        batches.append(batch)
+
+    pipeline = make_pipeline(func_process, batch_size=10)
+    summary = RunSummary()
+    stored = await pipeline.run(
+        cities=["Good", "Bad", "Broken"],
+        timestamp=datetime.now(),
+        store=store,
+        summary=summary,
+    )
+
+    assert stored == 1
+    assert summary.failures == {
+        "Bad": "WeatherFetchingError",
+        "Broken": "MappingError",
+    }
+
+
+async def test_streaming_pipeline_maps_in_bulk():
+    async def func_process(city: str, timestamp: datetime, session=None) -> dict:
+        return {**city_payload_1, "name": city, "timestamp": timestamp}
+
+    async def store(batch):
+        pass
+
+    pipeline = make_pipeline(func_process, batch_size=4)
+    mapper = pipeline.client_storage_mapper
+    cities = [f"City{i}" for i in range(8)]
+    with mock.patch.object(
+        mapper, "to_batch", wraps=mapper.to_batch
+    ) as to_batch, mock.patch.object(mapper, "to_target") as to_target:
+        stored = await pipeline.run(
+            cities=cities, timestamp=datetime.now(), store=store
+        )
+
+    assert stored == 8
+    to_target.assert_not_called()
+    assert sum(len(call.kwargs["source_objs"]) for call in to_batch.call_args_list) == 8
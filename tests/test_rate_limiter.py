@@ -0,0 +1,111 @@
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+from src.rate_limiters.realisations import (
+    FixedWindowRateLimiter,
+    QuotaRateLimiter,
+    TokenBucketRateLimiter,
+    create_quota_rate_limiter,
+)
+
+
+async def test_quota_is_reached_without_exceeding_the_window_limit():
+    window = FixedWindowRateLimiter(
+        name="window", limit=20, period=0.5, clock=time.monotonic
+    )
+    bucket = TokenBucketRateLimiter(name="bucket", limit=20, period=0.5, burst=5)
+    limiter = QuotaRateLimiter(buckets=[window, bucket])
+
+    calls = []
+    started = time.monotonic()
+    while time.monotonic() - started < 1.0:
+        await limiter.acquire()
+        calls.append(time.monotonic())
+
+    # The steady state reaches the quota of 20 calls per 0.5s...
+    assert len(calls) >= 38
+    # ...but no window ever gets more than 20 calls
+    per_window = Counter(int(moment // 0.5) for moment in calls)
+    assert max(per_window.values()) <= 20
+
+
+async def test_token_bucket_serves_burst_immediately():
+    bucket = TokenBucketRateLimiter(name="test", limit=100, period=60.0, burst=5)
+    assert bucket.fill_level == pytest.approx(1.0)
+
+    started = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+
+    assert time.monotonic() - started < 0.05
+    assert bucket.metrics()["test_fill_level"] == pytest.approx(0.0, abs=0.01)
+
+
+def test_token_bucket_rejects_invalid_burst():
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(name="test", limit=10, period=60.0, burst=10)
+
+
+def test_quota_rate_limiter_reports_every_bucket():
+    limiter = create_quota_rate_limiter(
+        calls_per_minute=60, calls_per_day=1000, burst=10
+    )
+
+    assert set(limiter.metrics()) == {
+        "day_tokens",
+        "day_fill_level",
+        "minute_window_tokens",
+        "minute_window_fill_level",
+        "minute_tokens",
+        "minute_fill_level",
+    }
+    assert limiter.fill_level == pytest.approx(1.0)
+
+
+async def test_fixed_window_is_reset_in_the_next_window(clock):
+    clock.now = 1005.0
+    window = FixedWindowRateLimiter(name="test", limit=3, period=10.0, clock=clock)
+
+    for _ in range(3):
+        await window.acquire()
+    assert window.fill_level == 0.0
+
+    clock.now += 5.0
+    await window.acquire()
+    assert window.metrics() == {"test_tokens": 2, "test_fill_level": 0.667}
+
+
+async def test_cycle_below_both_quotas_is_not_throttled():
+    limiter = create_quota_rate_limiter(
+        calls_per_minute=60000, calls_per_day=100000, burst=10
+    )
+
+    started = time.monotonic()
+    for _ in range(30):
+        await limiter.acquire()
+
+    # The minute bucket refills 30 calls in 0.03s, the day quota is far away
+    assert time.monotonic() - started < 0.5
+    assert limiter.metrics()["day_tokens"] == 100000 - 30
+
+
+async def test_cancelled_call_gives_back_the_day_quota():
+    limiter = create_quota_rate_limiter(
+        calls_per_minute=60, calls_per_day=1000, burst=2
+    )
+    for _ in range(2):
+        await limiter.acquire()
+
+    # The minute bucket is empty, so the call waits after reserving the day quota
+    task = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    metrics = limiter.metrics()
+    assert metrics["day_tokens"] == 1000 - 2
+    assert metrics["minute_window_tokens"] == 60 - 2
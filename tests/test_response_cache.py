@@ -0,0 +1,75 @@
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from payloads import response_data
+
+from src.apiclients.realisations import CachingAPIClient
+from src.models.dto import JsonOpenweathermapResponseDTO
+from src.response_caches.realisations import InMemoryResponseCache, SqliteResponseCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def factory(**kwargs):
+        if request.param == "memory":
+            return InMemoryResponseCache(**kwargs)
+        return SqliteResponseCache(
+            filepath=str(tmp_path / "responses.sqlite3"), **kwargs
+        )
+
+    return factory
+
+
+def test_response_cache_expires_and_evicts_entries(make_cache, clock):
+    cache = make_cache(ttl=10, max_size=2, clock=clock)
+
+    cache.put("Tokyo", {"id": 1})
+    clock.now = 1
+    cache.put("Osaka", {"id": 2})
+    clock.now = 2
+    assert cache.get("Tokyo") == {"id": 1}
+
+    # Osaka is the least recently used entry now
+    clock.now = 3
+    cache.put("Tianjin", {"id": 3})
+    assert cache.get("Osaka") is None
+
+    clock.now = 11
+    assert cache.get("Tokyo") is None
+
+    assert cache.metrics() == {"hits": 1, "misses": 2, "evictions": 1}
+    cache.close()
+
+
+def test_sqlite_response_cache_survives_reopening(tmp_path):
+    filepath = str(tmp_path / "responses.sqlite3")
+    cache = SqliteResponseCache(filepath=filepath, ttl=60)
+    cache.put("Tokyo", {"id": 1})
+    cache.close()
+
+    cache = SqliteResponseCache(filepath=filepath, ttl=60)
+    assert cache.get("Tokyo") == {"id": 1}
+    cache.close()
+
+
+async def test_caching_client_returns_cached_dto_with_run_timestamp():
+    client = mock.MagicMock()
+    client.get = mock.AsyncMock(
+        side_effect=lambda city, timestamp, **kwargs: JsonOpenweathermapResponseDTO(
+            **response_data, timestamp=timestamp
+        )
+    )
+    client.metrics.return_value = {}
+    caching_client = CachingAPIClient(
+        client=client, cache=InMemoryResponseCache(ttl=60)
+    )
+    city = response_data.get("name")
+
+    first = await caching_client.get(city, datetime(2024, 1, 1, 12, 0))
+    second = await caching_client.get(city, datetime(2024, 1, 1, 12, 5))
+
+    assert client.get.await_count == 1
+    assert second.get("timestamp") == datetime(2024, 1, 1, 12, 5)
+    assert {**second, "timestamp": None} == {**first, "timestamp": None}
+    assert caching_client.metrics()["cache_hits"] == 1
@@ -0,0 +1,154 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import insert
+
+from src.city_resolvers.realisations import InMemoryCityResolutionCache
+from src.models.domains import CityLocation, CityRecord
+from src.schedulers.abstractions import AbstractChangeHistory
+from src.schedulers.realisations import (
+    AdaptivePollingScheduler,
+    DatabaseChangeHistory,
+    WeatherORMModel,
+)
+
+
+class FakeChangeHistory(AbstractChangeHistory):
+    def __init__(self, change_rates):
+        self.change_rates = change_rates
+
+    async def get_change_rates(self, cities):
+        return {
+            city: rate for city, rate in self.change_rates.items() if city in cities
+        }
+
+
+async def stream(records):
+    for record in records:
+        yield record
+
+
+async def test_intervals_follow_the_change_rate(clock):
+    scheduler = AdaptivePollingScheduler(
+        change_history=FakeChangeHistory({"Tokyo": 1.0, "Delhi": 0.0, "Osaka": 0.5}),
+        min_interval=100,
+        max_interval=1000,
+        clock=clock,
+    )
+    await scheduler.sync(
+        stream(
+            [
+                CityRecord(name="Tokyo"),
+                CityRecord(name="Delhi"),
+                CityRecord(name="Osaka"),
+                CityRecord(name="Paris"),
+                CityRecord(name="Cairo", poll_interval=50),
+            ]
+        )
+    )
+
+    cities = scheduler.pop_due()
+    assert sorted(cities) == ["Cairo", "Delhi", "Osaka", "Paris", "Tokyo"]
+    assert scheduler.pop_due() == []
+
+    await scheduler.reschedule(cities)
+
+    assert scheduler.get_interval("Tokyo") == 100
+    assert scheduler.get_interval("Delhi") == 1000
+    assert scheduler.get_interval("Osaka") == 550
+    # No history yet, so the city is polled as often as allowed
+    assert scheduler.get_interval("Paris") == 100
+    assert scheduler.get_interval("Cairo") == 50
+
+    clock.now = 100
+    assert sorted(scheduler.pop_due()) == ["Cairo", "Paris", "Tokyo"]
+    clock.now = 1000
+    assert sorted(scheduler.pop_due()) == ["Delhi", "Osaka"]
+
+
+async def test_removed_cities_are_no_longer_due(clock):
+    scheduler = AdaptivePollingScheduler(
+        change_history=FakeChangeHistory({}), min_interval=100, clock=clock
+    )
+    await scheduler.sync(stream([CityRecord(name="Tokyo"), CityRecord(name="Delhi")]))
+    await scheduler.reschedule(scheduler.pop_due())
+
+    await scheduler.sync(stream([CityRecord(name="Tokyo"), CityRecord(name="Osaka")]))
+
+    assert scheduler.pop_due() == ["Osaka"]
+    clock.now = 100
+    assert scheduler.pop_due() == ["Tokyo"]
+
+
+async def test_change_rates_are_read_from_recent_rows(session_factory):
+    start = datetime(2026, 1, 1)
+    # Tokyo changes every time, Delhi never, Osaka only in older rows
+    observations = {
+        "Tokyo": [(10, "Ясно"), (11, "Ясно"), (11, "Дождь"), (12, "Ясно")],
+        "Delhi": [(30, "Ясно"), (30, "Ясно"), (30, "Ясно"), (30, "Ясно")],
+        "Osaka": [(5, "Снег"), (8, "Ясно"), (9, "Ясно"), (9, "Ясно"), (9, "Ясно")],
+        "Paris": [(15, "Облачно")],
+    }
+    async with session_factory() as session:
+        async with session.begin():
+            await session.execute(
+                insert(WeatherORMModel),
+                [
+                    {
+                        "timestamp": start + timedelta(minutes=10 * i),
+                        "city": city,
+                        "temperature": temperature,
+                        "weather_type": weather_type,
+                        "sunrise": time(6),
+                        "sunset": time(18),
+                    }
+                    for city, rows in observations.items()
+                    for i, (temperature, weather_type) in enumerate(rows)
+                ],
+            )
+
+    change_history = DatabaseChangeHistory(
+        async_session_factory=session_factory, history_size=4, chunk_size=2
+    )
+    change_rates = await change_history.get_change_rates(list(observations))
+
+    assert change_rates == {"Tokyo": 1.0, "Delhi": 0.0, "Osaka": 1 / 3}
+
+
+async def test_change_rates_are_read_under_the_provider_names(session_factory):
+    start = datetime(2026, 1, 1)
+    async with session_factory() as session:
+        async with session.begin():
+            await session.execute(
+                insert(WeatherORMModel),
+                [
+                    {
+                        "timestamp": start + timedelta(minutes=10 * i),
+                        "city": city,
+                        "temperature": temperature,
+                        "weather_type": "Ясно",
+                        "sunrise": time(6),
+                        "sunset": time(18),
+                    }
+                    for city, temperatures in (
+                        ("Sao Paulo", [20, 21, 22]),
+                        ("Moskva", [-5, -5, -5]),
+                    )
+                    for i, temperature in enumerate(temperatures)
+                ],
+            )
+
+    city_resolver = InMemoryCityResolutionCache()
+    city_resolver.put(
+        "São Paulo",
+        CityLocation(id=1, lat=0.0, lon=0.0, resolved_at=0.0, name="Sao Paulo"),
+    )
+    city_resolver.put(
+        "Moscow", CityLocation(id=2, lat=0.0, lon=0.0, resolved_at=0.0, name="Moskva")
+    )
+    change_history = DatabaseChangeHistory(
+        async_session_factory=session_factory, city_resolver=city_resolver
+    )
+
+    change_rates = await change_history.get_change_rates(["São Paulo", "Moscow"])
+
+    assert change_rates == {"São Paulo": 1.0, "Moscow": 0.0}
@@ -0,0 +1,96 @@
+import copy
+
+import pytest
+
+from src.main import get_shard_config_dict
+from src.master import MasterService
+from src.models.results import RunSummary
+from src.top_cities import cities_tuple
+
+
+async def stream(cities):
+    for city in cities:
+        yield city
+
+
+async def test_shards_cover_every_city_once():
+    cities = tuple(f"City{i}" for i in range(10))
+    shards = [
+        [
+            city
+            async for city in MasterService.select_shard(
+                cities=stream(cities), shard_index=shard_index, shard_count=3
+            )
+        ]
+        for shard_index in range(3)
+    ]
+
+    assert sorted(city for shard in shards for city in shard) == sorted(cities)
+    assert [len(shard) for shard in shards] == [4, 3, 3]
+
+
+async def test_single_shard_streams_every_city(container):
+    master_service = container.master.master_service_provider()
+
+    cities = [city async for city in master_service.iter_cities()]
+
+    assert tuple(cities) == cities_tuple
+
+
+def test_shard_config_splits_quotas(settings_dict):
+    weather_client = settings_dict["api_clients"]["weather_client"]
+
+    shard_config = get_shard_config_dict(
+        config_dict=settings_dict, shard_index=1, shard_count=4
+    )
+    shard_weather_client = shard_config["api_clients"]["weather_client"]
+
+    assert 4 * int(shard_weather_client["calls_per_minute"]) <= int(
+        weather_client["calls_per_minute"]
+    )
+    assert 4 * int(shard_weather_client["calls_per_day"]) <= int(
+        weather_client["calls_per_day"]
+    )
+    assert shard_config["repositories"]["json_repo"]["filepath"].endswith("_1.json")
+    # The settings of the parent process are left untouched
+    assert weather_client is settings_dict["api_clients"]["weather_client"]
+    assert shard_weather_client is not weather_client
+
+
+@pytest.mark.parametrize("shard_count", [16, 29])
+def test_shard_burst_stays_below_the_shard_quota(settings_dict, shard_count):
+    settings_dict = copy.deepcopy(settings_dict)
+    weather_client = settings_dict["api_clients"]["weather_client"]
+    weather_client.update(calls_per_minute="60", calls_per_day="30000", burst="50")
+
+    shard_config = get_shard_config_dict(
+        config_dict=settings_dict, shard_index=0, shard_count=shard_count
+    )
+    shard_weather_client = shard_config["api_clients"]["weather_client"]
+
+    assert (
+        1
+        <= int(shard_weather_client["burst"])
+        < int(shard_weather_client["calls_per_minute"])
+    )
+
+
+def test_too_many_shards_for_the_quota_are_rejected(settings_dict):
+    settings_dict = copy.deepcopy(settings_dict)
+    weather_client = settings_dict["api_clients"]["weather_client"]
+    weather_client.update(calls_per_minute="60", calls_per_day="30000", burst="10")
+
+    with pytest.raises(ValueError, match="64 workers"):
+        get_shard_config_dict(config_dict=settings_dict, shard_index=0, shard_count=64)
+
+
+def test_run_summaries_are_merged():
+    summary = RunSummary(
+        ok=3, failed=1, retried=2, failures={"Osaka": "WeatherDataError"}
+    )
+    summary.merge(
+        RunSummary(ok=4, failed=1, retried=0, failures={"Tokyo": "MappingError"})
+    )
+
+    assert str(summary) == "7 ok, 2 failed, 0 unchanged, 2 retried"
+    assert summary.failures == {"Osaka": "WeatherDataError", "Tokyo": "MappingError"}
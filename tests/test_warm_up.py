@@ -0,0 +1,50 @@
+import copy
+import json
+from unittest import mock
+
+from dependency_injector import providers
+from payloads import city_payload_1
+
+from src.di_container import OpenweathermapByCityAPIClient
+from src.main import create_app_container, warm_up_cities
+from src.master import WeatherDataError
+
+
+async def test_warm_up_resolves_and_saves_the_missing_cities(
+    settings_dict, make_city_source, tmp_path
+):
+    config_dict = copy.deepcopy(settings_dict)
+    config_dict["api_clients"]["city_resolver"]["filepath"] = str(
+        tmp_path / "city_locations.json"
+    )
+    config_dict["api_clients"]["weather_client"]["endpoint"] = "city"
+    app_container = create_app_container(config_dict=config_dict)
+    app_container.city_sources.city_source_provider.override(
+        providers.Object(make_city_source(["Tokyo", "Delhi", "Atlantis"]))
+    )
+
+    ids = {"Tokyo": 1850147, "Delhi": 1273294}
+
+    async def get_json(url, subject, session=None, decode=None):
+        for city, city_id in ids.items():
+            if f"q={city}&" in url:
+                return {**city_payload_1, "id": city_id, "name": city}
+        raise WeatherDataError(f"Weather data for {subject} is unavailable")
+
+    with mock.patch.object(
+        OpenweathermapByCityAPIClient, "_get_json", side_effect=get_json
+    ), mock.patch("src.main.logger") as logger:
+        await warm_up_cities(app_container=app_container)
+
+    city_resolver = app_container.api_clients.city_resolver_provider()
+    assert city_resolver.get("Tokyo").id == 1850147
+    assert city_resolver.get("Delhi").id == 1273294
+    assert city_resolver.get("Atlantis") is None
+
+    with open(tmp_path / "city_locations.json", encoding="utf-8") as file:
+        saved = json.load(file)
+    assert {city: location["id"] for city, location in saved.items()} == ids
+
+    logger.warning.assert_called_once_with(
+        "City Atlantis was not resolved: WeatherDataError"
+    )
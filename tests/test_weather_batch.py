@@ -0,0 +1,57 @@
+from datetime import datetime, time, timedelta
+
+from src.models.batches import WeatherBatch, WeatherDomain
+
+
+def make_weather_list(count: int) -> list[WeatherDomain]:
+    start = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    return [
+        WeatherDomain(
+            timestamp=start + timedelta(minutes=i),
+            city=f"City{i % 3}",
+            temperature=i - 10,
+            weather_type="Ясно" if i % 2 else "Снег",
+            sunrise=time(6, 30, i),
+            sunset=time(18, 45),
+        )
+        for i in range(count)
+    ]
+
+
+def test_rows_are_stored_by_column():
+    weather_list = make_weather_list(10)
+
+    batch = WeatherBatch(weather_list)
+
+    assert len(batch) == 10
+    assert batch.cities == ["City0", "City1", "City2"]
+    assert list(batch) == weather_list
+    assert batch[-1] == weather_list[-1]
+    assert [row[1:3] for row in batch.iter_rows()] == [
+        (weather.city, weather.temperature) for weather in weather_list
+    ]
+    assert list(batch.iter_cities()) == [weather.city for weather in weather_list]
+    assert batch.nbytes < 40 * len(batch)
+
+
+def test_batches_are_sliced_and_merged():
+    weather_list = make_weather_list(10)
+    batch = WeatherBatch(weather_list)
+
+    assert list(batch[2:5]) == weather_list[2:5]
+    assert list(batch.take([7, 1])) == [weather_list[7], weather_list[1]]
+
+    merged = WeatherBatch(weather_list[:1])
+    merged.extend(batch[4:6])
+    assert list(merged) == [weather_list[0], weather_list[4], weather_list[5]]
+    assert merged.cities == ["City0", "City1", "City2"]
+
+
+def test_batch_is_built_from_columns():
+    weather_list = make_weather_list(4)
+
+    batch = WeatherBatch.from_columns(
+        *zip(*(weather.model_dump().values() for weather in weather_list))
+    )
+
+    assert list(batch) == weather_list